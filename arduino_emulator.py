@@ -0,0 +1,411 @@
+import io
+import os
+import sys
+import tty
+import time
+import random
+import select
+import argparse
+import threading
+import contextlib
+from collections import deque
+
+from fakeservers import Latency
+
+# ─── Arduino Display Emulator ─────────────────────────────────────────────────
+# Stands in for arduino_display.ino on a pseudo-terminal, so the serial code in
+# display.py, siri.py and bluetooth_sender.py can be exercised without
+# hardware. Point a script at the printed slave path:
+#
+#   python arduino_emulator.py --baud 9600 --drop 0.02 --delay lognormal:20,0.5
+#   ARDUINO_PORT=/dev/pts/7 python display.py
+#
+# What is reproduced from the sketch and the board:
+#   - "Ready" after boot, "ACK:<line>" after every non-empty trimmed line,
+#     the same T:/R:/LANG:/CONV:/TEST/A: display state
+#   - the wire: bytes move at baud/10 per second in each direction, through
+#     the 64-byte hardware RX buffer (overflow is lost, as on the AVR) and the
+#     64-byte TX buffer that blocks Serial.print when full
+#   - Serial.readStringUntil's 1 s timeout, which hands a partial line to the
+#     sketch when the newline is late
+#   - the SSD1306 redraw after every line, during which nothing is read
+#
+# Injected faults, per received line: --drop loses the line (no ACK),
+# --corrupt flips a bit in it (the ACK echoes the damaged text), --delay adds
+# a latency (fakeservers.py spec, ms) before the ACK.
+#
+# `--bench` drives the emulator with pyserial using the scripts' own
+# protocols and reports throughput, retransmissions and loss.
+
+RX_BUFFER = 64
+TX_BUFFER = 64
+READ_TIMEOUT = 1.0   # Stream::setTimeout default
+REDRAW_MS = 25.0     # 1 KB frame over 400 kHz I2C
+
+
+class ArduinoEmulator:
+    """arduino_display.ino behind a pty, with a paced wire and fault injection"""
+
+    def __init__(self, baud=9600, drop=0.0, corrupt=0.0, delay="fixed:0", redraw_ms=REDRAW_MS,
+                 boot_ms=0.0, seed=None):
+        self.baud = baud
+        self.byte_time = 10.0 / baud  # start + 8 data + stop bits
+        self.drop = drop
+        self.corrupt = corrupt
+        self.delay = Latency(delay, seed)
+        self.redraw = redraw_ms / 1000.0
+        self.boot = boot_ms / 1000.0
+        self._rng = random.Random(seed)
+
+        self._master, self._slave = os.openpty()
+        tty.setraw(self._slave)
+        os.set_blocking(self._master, False)
+        self.port = os.ttyname(self._slave)
+
+        self._rx = deque()
+        self._tx = deque()
+        self._cond = threading.Condition()
+        self._running = False
+        self._threads = []
+
+        # display state, as in the sketch
+        self.transcript = ""
+        self.translation = ""
+
+        self.lines = 0
+        self.acks = 0
+        self.dropped = 0
+        self.corrupted = 0
+        self.partial = 0
+        self.overflow_bytes = 0
+        self.rx_bytes = 0
+        self.tx_bytes = 0
+
+    # ── lifecycle ──
+    def start(self):
+        self._running = True
+        for target in (self._wire, self._sketch):
+            thread = threading.Thread(target=target, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def stop(self):
+        self._running = False
+        with self._cond:
+            self._cond.notify_all()
+        for thread in self._threads:
+            thread.join(timeout=1.0)
+        os.close(self._master)
+        os.close(self._slave)
+
+    # ── the wire ──
+    def _wire(self):
+        """Moves bytes between the pty and the UART buffers at the baud rate"""
+        last = time.perf_counter()
+        rx_budget = tx_budget = 0.0
+        while self._running:
+            select.select([self._master], [], [], 0.001)
+            now = time.perf_counter()
+            earned = (now - last) / self.byte_time
+            last = now
+            # an idle line cannot bank transmit time for a later burst
+            rx_budget = min(rx_budget + earned, RX_BUFFER)
+            tx_budget = min(tx_budget + earned, TX_BUFFER)
+
+            if rx_budget >= 1:
+                try:
+                    data = os.read(self._master, int(rx_budget))
+                except (BlockingIOError, OSError):
+                    data = b""
+                rx_budget = rx_budget - len(data) if data else 0.0
+                if data:
+                    with self._cond:
+                        self.rx_bytes += len(data)
+                        room = RX_BUFFER - len(self._rx)
+                        self._rx.extend(data[:room])
+                        self.overflow_bytes += max(0, len(data) - room)
+                        self._cond.notify_all()
+
+            if tx_budget >= 1:
+                with self._cond:
+                    n = min(int(tx_budget), len(self._tx))
+                    out = bytes(self._tx.popleft() for _ in range(n))
+                    if n:
+                        self._cond.notify_all()
+                if out:
+                    os.write(self._master, out)
+                    self.tx_bytes += len(out)
+                    tx_budget -= len(out)
+                else:
+                    tx_budget = 0.0
+
+    # ── the sketch ──
+    def _serial_print(self, text):
+        """Serial.print: blocks while the TX buffer is full"""
+        data = text.encode()
+        with self._cond:
+            for byte in data:
+                while len(self._tx) >= TX_BUFFER and self._running:
+                    self._cond.wait(0.05)
+                self._tx.append(byte)
+
+    def _read_string_until(self):
+        """Serial.readStringUntil('\\n') with the per-byte read timeout"""
+        line = bytearray()
+        with self._cond:
+            while self._running:
+                if not self._rx:
+                    if not self._cond.wait_for(lambda: self._rx or not self._running, READ_TIMEOUT):
+                        self.partial += 1
+                        break
+                    continue
+                byte = self._rx.popleft()
+                if byte == 0x0A:
+                    break
+                line.append(byte)
+        return line.decode("latin-1")
+
+    def _sketch(self):
+        time.sleep(self.boot)
+        self.transcript, self.translation = "Ready", ""
+        time.sleep(self.redraw)
+        self._serial_print("Ready\r\n")
+        while self._running:
+            with self._cond:
+                if not self._cond.wait_for(lambda: self._rx or not self._running, 0.1) or not self._running:
+                    continue
+            line = self._read_string_until().strip()
+            if not line:
+                continue
+            self.lines += 1
+            if self._rng.random() < self.drop:
+                self.dropped += 1
+                continue
+            if self._rng.random() < self.corrupt:
+                self.corrupted += 1
+                i = self._rng.randrange(len(line))
+                line = line[:i] + chr(ord(line[i]) ^ (1 << self._rng.randrange(7))) + line[i + 1:]
+            self._handle(line)
+            time.sleep(self.redraw + self.delay.sample())
+            self._serial_print(f"ACK:{line}\r\n")
+            self.acks += 1
+
+    def _handle(self, line):
+        if line.startswith("T:"):
+            self.transcript = line[2:]
+        elif line.startswith("R:"):
+            self.translation = line[2:]
+        elif line.startswith("LANG:"):
+            self.transcript, self.translation = "Lang: " + line[5:], ""
+        elif line.startswith("CONV:START"):
+            self.transcript, self.translation = "Conversation", "started"
+        elif line.startswith("CONV:END"):
+            self.transcript, self.translation = "Conversation", "ended"
+        elif line == "TEST":
+            self.transcript, self.translation = "TEST OK", ""
+        elif line.startswith("A:"):
+            self.translation = "(AI) " + line[2:]
+
+    def report(self):
+        return (f"[ARDUINO] {self.lines} lines, {self.acks} ACKs, {self.dropped} dropped, "
+                f"{self.corrupted} corrupted, {self.partial} read timeouts, "
+                f"{self.overflow_bytes} bytes lost to RX overflow, {self.rx_bytes}/{self.tx_bytes} bytes in/out")
+
+
+# ─── Link Benchmarks ──────────────────────────────────────────────────────────
+# The same send paths as the scripts: display.py's stop-and-wait with ACK
+# retries, bluetooth_sender.py's fire-and-forget, and a coalescing sender
+# that only ever transmits the newest pending caption.
+
+ACK_TIMEOUT = 1.0  # display.py
+ACK_RETRIES = 3
+
+CAPTIONS = [
+    "T:hello there how are you doing today",
+    "R:hola como estas hoy",
+    "T:can you tell me where the engineering research center is",
+    "R:puedes decirme donde esta el centro de investigacion de ingenieria",
+    "A:The ERC is on the east side of campus next to the library.",
+]
+
+
+def _percentile(values, q):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q / 100 * len(values)))]
+
+
+def _open(port, baud):
+    import serial
+    return serial.Serial(port, baud, timeout=0.1)
+
+
+def _send_and_wait(ser, msg, stats):
+    """display.py's _send_and_wait, counting attempts and mismatched ACKs"""
+    for attempt in range(ACK_RETRIES):
+        ser.write((msg + "\n").encode())
+        stats["writes"] += 1
+        if attempt:
+            stats["retransmissions"] += 1
+        deadline = time.time() + ACK_TIMEOUT
+        while time.time() < deadline:
+            line = ser.readline().decode(errors="ignore").strip()
+            if line.startswith("ACK:"):
+                if line[4:] != msg:
+                    # display.py takes any ACK, so a late one answers the wrong message
+                    stats["wrong_acks"] += 1
+                return True
+    return False
+
+
+def bench_stop_and_wait(port, baud, messages):
+    ser = _open(port, baud)
+    stats = {"writes": 0, "retransmissions": 0, "wrong_acks": 0, "failed": 0}
+    ser.reset_input_buffer()
+    latencies, sent_bytes = [], 0
+    start = time.perf_counter()
+    for i in range(messages):
+        msg = CAPTIONS[i % len(CAPTIONS)][:95]
+        t0 = time.perf_counter()
+        if not _send_and_wait(ser, msg, stats):
+            stats["failed"] += 1
+        latencies.append(time.perf_counter() - t0)
+        sent_bytes += len(msg) + 1
+    elapsed = time.perf_counter() - start
+    ser.close()
+    return {"mode": "stop-and-wait", "messages": messages, "seconds": elapsed, "bytes": sent_bytes,
+            "p50": _percentile(latencies, 50), "p95": _percentile(latencies, 95), **stats}
+
+
+def bench_fire_and_forget(port, baud, messages, drain=2.0):
+    import bluetooth_sender
+
+    ser = _open(port, baud)
+    ser.reset_input_buffer()
+    sent_bytes = 0
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        for i in range(messages):
+            text = CAPTIONS[i % len(CAPTIONS)]
+            bluetooth_sender.send_to_arduino(ser, text)
+            sent_bytes += len(text) + 1
+    ser.flush()
+    acks, idle_since = [], time.perf_counter()
+    while len(acks) < messages and time.perf_counter() - idle_since < drain:
+        line = ser.readline().decode(errors="ignore").strip()
+        if line.startswith("ACK:"):
+            acks.append(line[4:])
+            idle_since = time.perf_counter()
+    elapsed = idle_since - start
+    ser.close()
+    # RX overflow cuts bytes out of lines, so an ACK may echo a damaged or merged line
+    intact = sum(1 for text in acks if text in CAPTIONS)
+    return {"mode": "fire-and-forget", "messages": messages, "seconds": elapsed, "bytes": sent_bytes,
+            "intact": intact, "damaged": len(acks) - intact, "lost": max(0, messages - len(acks))}
+
+
+def bench_coalesced(port, baud, messages, interval=0.1):
+    """Captions arrive every interval; the sender skips any that were superseded"""
+    ser = _open(port, baud)
+    ser.reset_input_buffer()
+    stats = {"writes": 0, "retransmissions": 0, "wrong_acks": 0, "failed": 0}
+    pending = {}
+    cond = threading.Condition()
+    done = False
+
+    def produce():
+        nonlocal done
+        for i in range(messages):
+            text = CAPTIONS[i % len(CAPTIONS)]
+            with cond:
+                pending[text[:2]] = (text, time.perf_counter())
+                cond.notify()
+            time.sleep(interval)
+        with cond:
+            done = True
+            cond.notify()
+
+    producer = threading.Thread(target=produce, daemon=True)
+    start = time.perf_counter()
+    producer.start()
+    staleness, delivered = [], 0
+    while True:
+        with cond:
+            cond.wait_for(lambda: pending or done)
+            if not pending:
+                break
+            prefix = next(iter(pending))
+            text, produced = pending.pop(prefix)
+        if _send_and_wait(ser, text[:95], stats):
+            delivered += 1
+            staleness.append(time.perf_counter() - produced)
+        else:
+            stats["failed"] += 1
+    elapsed = time.perf_counter() - start
+    ser.close()
+    return {"mode": "coalesced", "messages": messages, "seconds": elapsed, "delivered": delivered,
+            "superseded": messages - delivered - stats["failed"],
+            "p50": _percentile(staleness, 50), "p95": _percentile(staleness, 95), **stats}
+
+
+def bench(baud=9600, messages=100, **faults):
+    results = []
+    for run in (bench_stop_and_wait, bench_fire_and_forget, bench_coalesced):
+        emulator = ArduinoEmulator(baud=baud, **faults).start()
+        try:
+            result = run(emulator.port, baud, messages)
+        finally:
+            emulator.stop()
+        result["emulator"] = emulator.report()
+        results.append(result)
+
+    print(f"\n=== Serial link @ {baud} baud, {messages} captions ===")
+    for r in results:
+        rate = r["messages"] / r["seconds"] if r["seconds"] else 0.0
+        line = f"{r['mode']:<16} {r['seconds']:6.2f}s  {rate:6.1f} msg/s"
+        if r["mode"] == "stop-and-wait":
+            line += (f"  {r['bytes'] / r['seconds']:6.0f} B/s  p50 {r['p50'] * 1000:.0f}ms "
+                     f"p95 {r['p95'] * 1000:.0f}ms  {r['retransmissions']} retransmits, "
+                     f"{r['wrong_acks']} mismatched ACKs, {r['failed']} failed")
+        elif r["mode"] == "fire-and-forget":
+            line += (f"  {r['bytes'] / r['seconds']:6.0f} B/s  {r['intact']} intact, "
+                     f"{r['damaged']} damaged, {r['lost']} lost")
+        else:
+            line += (f"  {r['delivered']} sent, {r['superseded']} superseded, staleness "
+                     f"p50 {r['p50'] * 1000:.0f}ms p95 {r['p95'] * 1000:.0f}ms, "
+                     f"{r['retransmissions']} retransmits, {r['failed']} failed")
+        print(line)
+        print(f"  {r['emulator']}")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="arduino_display.ino emulator on a pseudo-terminal")
+    parser.add_argument("--baud", type=int, default=9600)
+    parser.add_argument("--drop", type=float, default=0.0, help="probability a received line is lost")
+    parser.add_argument("--corrupt", type=float, default=0.0, help="probability a received line has a bit flipped")
+    parser.add_argument("--delay", default="fixed:0", help="extra delay before each ACK, e.g. lognormal:20,0.5")
+    parser.add_argument("--redraw-ms", type=float, default=REDRAW_MS)
+    parser.add_argument("--boot-ms", type=float, default=0.0, help="delay before the 'Ready' banner")
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--bench", action="store_true", help="benchmark the scripts' send paths and exit")
+    parser.add_argument("--messages", type=int, default=100)
+    args = parser.parse_args()
+
+    faults = dict(drop=args.drop, corrupt=args.corrupt, delay=args.delay, redraw_ms=args.redraw_ms,
+                  boot_ms=args.boot_ms, seed=args.seed)
+    if args.bench:
+        bench(args.baud, args.messages, **faults)
+        sys.exit(0)
+
+    emulator = ArduinoEmulator(args.baud, **faults).start()
+    print(f"Emulating arduino_display.ino at {args.baud} baud on {emulator.port}")
+    print(f"  export ARDUINO_PORT={emulator.port}")
+    try:
+        while True:
+            time.sleep(10)
+            print(emulator.report())
+    except KeyboardInterrupt:
+        emulator.stop()
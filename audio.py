@@ -0,0 +1,145 @@
+import os
+import time
+import threading
+import dsp
+import metrics
+from ring import AudioRing
+
+# ─── Microphone Capture ───────────────────────────────────────────────────────
+# The device is opened once and read on its own thread into a shared-memory
+# AudioRing, so recognition sessions can start and stop (mode switches, VAD
+# idle) without reopening PyAudio or dropping audio between sessions. The
+# Google streaming path reads the ring through the microphone's own cursor;
+# other consumers (a recorder, a wake-word detector, a second recognizer, or
+# another process attached by mic.ring.name) take their own with mic.reader().
+#
+# PyAudio is read in short device periods and re-buffered into chunks of
+# CHUNK_MS (20-250 ms, default 100). Shorter chunks reach the recognizer
+# sooner but cost more requests per second; recognition.report() and
+# `python recognition.py --chunks <wav>` show that tradeoff.
+#
+# The device is opened at 16 kHz mono when it supports that, otherwise at its
+# native rate and channel count, and dsp.CaptureConverter brings each period
+# to 16 kHz mono. MIC_DEVICE selects a PyAudio input device index.
+
+RATE = 16000
+PERIOD_MS = 20
+CHUNK_MS = int(os.getenv("CHUNK_MS", "100"))
+MIC_DEVICE = os.getenv("MIC_DEVICE")
+RING_SECONDS = float(os.getenv("RING_SECONDS", "10"))
+MIN_CHUNK_MS, MAX_CHUNK_MS = 20, 250
+
+
+class Microphone:
+    """Mono 16 kHz int16 capture shared by every recognition session"""
+
+    def __init__(self, rate=RATE, chunk_ms=CHUNK_MS, device=MIC_DEVICE):
+        if not MIN_CHUNK_MS <= chunk_ms <= MAX_CHUNK_MS:
+            raise ValueError(f"chunk_ms must be between {MIN_CHUNK_MS} and {MAX_CHUNK_MS}, got {chunk_ms}")
+        self.rate = rate
+        self.device = device  # PyAudio input device index; None for the default
+        self.chunk_ms = chunk_ms
+        self.chunk_frames = rate * chunk_ms // 1000
+        self.device_rate = rate
+        self.device_channels = 1
+        self.period_frames = rate * PERIOD_MS // 1000
+        self._converter = None
+        self.active = False
+        self.ring = None
+        self._reader = None
+        self._interface = None
+        self._stream = None
+        self._thread = None
+        self.chunks_read = 0
+        self.backlog = 0.0  # total seconds of audio still unread after each chunk
+        self.max_backlog = 0.0
+
+    def _ensure_ring(self):
+        if self.ring is None:
+            self.ring = AudioRing(seconds=RING_SECONDS, rate=self.rate)
+        return self.ring
+
+    def reader(self, from_start=False):
+        """A new independent cursor into the captured audio"""
+        return self._ensure_ring().reader(from_start=from_start)
+
+    def open(self):
+        if self.active:
+            return self
+        import pyaudio
+
+        self._interface = pyaudio.PyAudio()
+        if self.device is not None:
+            device = self._interface.get_device_info_by_index(int(self.device))
+        else:
+            device = self._interface.get_default_input_device_info()
+        self.device_rate, self.device_channels = self._native_format(pyaudio, device)
+        self.period_frames = self.device_rate * PERIOD_MS // 1000
+        self._converter = dsp.CaptureConverter(self.device_rate, self.device_channels, self.rate)
+        self._stream = self._interface.open(
+            format=pyaudio.paInt16,
+            channels=self.device_channels,
+            rate=self.device_rate,
+            input=True,
+            input_device_index=device["index"],
+            frames_per_buffer=self.period_frames,
+            stream_callback=None
+        )
+        if self.device_rate != self.rate or self.device_channels != 1:
+            print(f"[MIC] {device['name']}: capturing {self.device_rate} Hz x{self.device_channels}, "
+                  f"converting to {self.rate} Hz mono")
+        time.sleep(0.5)
+        self._reader = self._ensure_ring().reader()
+        metrics.register("audio_overruns_total", lambda: self._reader.overruns if self._reader else 0)
+        metrics.register("audio_backlog_seconds", lambda: self._reader.lag() / self.rate if self.active else 0)
+        self.active = True
+        self._thread = threading.Thread(target=self._capture, daemon=True)
+        self._thread.start()
+        return self
+
+    def _native_format(self, pyaudio, device):
+        """(rate, channels) to open the device with, preferring 16 kHz mono"""
+        candidates = [(self.rate, 1), (int(device["defaultSampleRate"]), 1),
+                      (int(device["defaultSampleRate"]), min(2, int(device["maxInputChannels"])))]
+        for rate, channels in candidates:
+            try:
+                self._interface.is_format_supported(rate, input_device=device["index"],
+                                                    input_channels=channels, input_format=pyaudio.paInt16)
+                return rate, channels
+            except ValueError:
+                continue
+        return candidates[-1]
+
+    def _capture(self):
+        while self.active:
+            period = self._stream.read(self.period_frames, exception_on_overflow=False)
+            self.ring.write(self._converter.process(period))
+
+    def chunks(self, is_open=lambda: True):
+        """Yield captured chunks while the mic and the caller's session are open"""
+        self.open()
+        for chunk in self._reader.chunks(self.chunk_frames, lambda: self.active and is_open()):
+            backlog = self._reader.lag() / self.rate
+            self.chunks_read += 1
+            self.backlog += backlog
+            self.max_backlog = max(self.max_backlog, backlog)
+            yield chunk
+
+    def close(self):
+        if not self.active:
+            return
+        self.active = False
+        self._thread.join(timeout=1.0)
+        self._stream.stop_stream()
+        self._stream.close()
+        self._interface.terminate()
+        self._reader.release()
+        self.ring.close()
+        self.ring = None
+
+    def report(self):
+        mean = self.backlog / self.chunks_read if self.chunks_read else 0.0
+        return (f"Mic: {self.device_rate} Hz x{self.device_channels} -> {self.rate} Hz mono, "
+                f"{self.chunk_ms}ms chunks ({self.chunk_frames} frames, {self.period_frames}-frame reads), "
+                f"{self.chunks_read} chunks, backlog mean {mean * 1000:.1f}ms "
+                f"max {self.max_backlog * 1000:.1f}ms, {self._reader.overruns if self._reader else 0} overruns")
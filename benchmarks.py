@@ -0,0 +1,182 @@
+import os
+import sys
+import json
+import random
+import timeit
+import argparse
+import platform
+
+# ─── Hot-path Benchmarks ──────────────────────────────────────────────────────
+# Times the pure-Python paths every utterance goes through and compares them
+# with the tracked baseline in BENCH_BASELINE. A run exits non-zero when any
+# path got slower than the baseline by more than BENCH_THRESHOLD (a fraction):
+#
+#   python benchmarks.py                   compare against the baseline
+#   python benchmarks.py --save            record a new baseline
+#   python benchmarks.py --filter display  only matching benchmarks
+#
+# The scripts are imported under replay.offline(), so their module-level
+# setup talks to the fake services and time.sleep() (the pauses in
+# handle_rps_move) only moves a virtual clock. Timings are the best of
+# --repeat runs, in microseconds per call, and a slow result is re-measured
+# before it counts; baselines only compare on the machine that recorded them.
+#
+# The modules' self-checks (randomized invariants kept next to the code, as
+# there is no test suite) run first, and a failing one fails the run too.
+
+BENCH_BASELINE = os.getenv("BENCH_BASELINE", os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                                          "benchmarks_baseline.json"))
+BENCH_THRESHOLD = float(os.getenv("BENCH_THRESHOLD", "0.25"))
+
+TRANSCRIPTS = [
+    "Play wordle!",
+    "hey, Sentient, what's the weather like in Boulder today?",
+    "I think the answer is forty two.",
+    "can you tell me where the engineering research center is",
+    "Stop.",
+]
+NUMBER_PHRASES = ["forty two", "I guess seventy three", "one hundred", "no number here", "is it 57",
+                  "twenty one or twenty two"]
+OUTPUT_LINES = ["Translation: Hola, ¿cómo estás hoy?", "Sentient: The ERC is next to the library.",
+                "Transcription: hello there", "Translation:   ", "[DEBUG] Transcript: 'hi' | final=True"]
+CAPTION = "hello there, how are you doing today? I was wondering whether the demo is running " * 2
+
+
+def self_checks():
+    """Each module's self-check; an AssertionError says which invariant broke"""
+    import normalize
+    import phonetic
+
+    normalize.self_check(samples=1000)
+    phonetic.self_check()
+
+
+def _cases(display, bluetooth_sender, serial):
+    """name -> zero-argument callable"""
+    import commands
+    import normalize
+
+    def wordle():
+        display.wordle_active = True
+        display.wordle_word = "ENGINEERING"
+        display.wordle_guessed = []
+        display.wordle_strikes = 0
+        display.wordle_display = ["_"] * len(display.wordle_word)
+        for letter in "EXNGQI":
+            display.handle_wordle_guess(letter)
+
+    def rps():
+        display.rps_active = True
+        display.rps_user_score = display.rps_computer_score = 0
+        display.handle_rps_move(random.choice(["rock", "paper", "scissors"]))
+
+    link = serial.Serial("bench", 9600, timeout=0)
+
+    def bluetooth():
+        for line in OUTPUT_LINES:
+            text = bluetooth_sender.parse_output_line(line)
+            if text:
+                bluetooth_sender.send_to_arduino(link, text)
+
+    return {
+        "normalize.extract_number x6": lambda: [normalize.extract_number(p) for p in NUMBER_PHRASES],
+        "commands.route idle x5": lambda: [commands.route("idle", t) for t in TRANSCRIPTS],
+        "commands.route per mode x5": lambda: [commands.route(m, TRANSCRIPTS[2])
+                                               for m in ("wordle", "rps", "number", "conversation", "idle")],
+        "transcript cleaning x5": lambda: [commands._PUNCT.sub('', t).lower().strip() for t in TRANSCRIPTS],
+        "display.handle_wordle_guess x6": wordle,
+        "display.handle_rps_move": rps,
+        "display.send_to_arduino": lambda: display.send_to_arduino("T:", CAPTION),
+        "bluetooth_sender parse+send x5": bluetooth,
+    }
+
+
+def measure(fn, repeat=7):
+    """Best time per call in microseconds"""
+    timer = timeit.Timer(fn)
+    timer.autorange()  # warm-up: caches, lazily compiled regexes, CPU clock
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat, number)) / number * 1e6
+
+
+def run(name_filter="", repeat=7, names=None):
+    import replay
+
+    random.seed(0)
+    report = replay.Report(replay.VirtualClock())
+    results = {}
+    with replay.offline(report):
+        display = replay.attach(replay.load_script("display.py"), None)
+        display.establish_connection()
+        import bluetooth_sender
+        cases = _cases(display, bluetooth_sender, sys.modules["serial"])
+        for name, fn in cases.items():
+            if name_filter in name and (names is None or name in names):
+                results[name] = measure(fn, repeat)
+                # the fake serial log grows with every send; keep it from skewing later cases
+                report.lines.clear()
+    return results
+
+
+def _machine():
+    return {"python": platform.python_version(), "machine": platform.machine(), "node": platform.node()}
+
+
+def load_baseline(path=BENCH_BASELINE):
+    if not os.path.exists(path):
+        return {"machine": None, "results": {}}
+    with open(path) as f:
+        return json.load(f)
+
+
+def compare(results, baseline, threshold=BENCH_THRESHOLD):
+    """Print the table; returns the names that regressed past the threshold"""
+    regressed = []
+    print(f"{'benchmark':<34} {'baseline':>10} {'now':>10} {'change':>8}")
+    for name, now in results.items():
+        base = baseline["results"].get(name)
+        if base is None:
+            print(f"{name:<34} {'-':>10} {now:>8.2f}us {'new':>8}")
+            continue
+        change = now / base - 1.0
+        flag = ""
+        if change > threshold:
+            regressed.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:<34} {base:>8.2f}us {now:>8.2f}us {change * 100:>+7.1f}%{flag}")
+    return regressed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmarks for the per-utterance Python hot paths")
+    parser.add_argument("--save", action="store_true", help="write the results as the new baseline")
+    parser.add_argument("--threshold", type=float, default=BENCH_THRESHOLD,
+                        help="allowed slowdown as a fraction (default %(default)s)")
+    parser.add_argument("--filter", default="", help="only run benchmarks whose name contains this")
+    parser.add_argument("--repeat", type=int, default=7)
+    parser.add_argument("--baseline", default=BENCH_BASELINE)
+    args = parser.parse_args()
+
+    self_checks()
+    results = run(args.filter, args.repeat)
+    baseline = load_baseline(args.baseline)
+    if baseline["machine"] and baseline["machine"] != _machine():
+        print(f"[BENCH] baseline was recorded on {baseline['machine']}, this is {_machine()}")
+    slow = [name for name, now in results.items()
+            if name in baseline["results"] and now > baseline["results"][name] * (1 + args.threshold)]
+    if slow and not args.save:
+        # a regression has to reproduce, so one noisy run does not fail the build
+        again = run(args.filter, args.repeat, slow)
+        results.update({name: min(results[name], again[name]) for name in slow})
+    regressed = compare(results, baseline, args.threshold)
+
+    if args.save:
+        saved = {"machine": _machine(), "results": {**baseline["results"], **results}}
+        with open(args.baseline, "w") as f:
+            json.dump(saved, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"[BENCH] baseline saved to {args.baseline}")
+    elif regressed:
+        print(f"[BENCH] {len(regressed)} benchmark(s) regressed by more than {args.threshold * 100:.0f}%: "
+              f"{', '.join(regressed)}")
+        sys.exit(1)
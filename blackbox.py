@@ -0,0 +1,159 @@
+import os
+import sys
+import json
+import time
+import struct
+import signal
+import itertools
+import threading
+import numpy as np
+
+# ─── Black-box Recorder ───────────────────────────────────────────────────────
+# Always keeps the last BLACKBOX_MINUTES of mic audio and pipeline events
+# (recognizer results, translations, serial sends) in memory allocated once at
+# start-up. The audio comes from its own cursor on the microphone ring, so
+# the live pipeline never waits on it. A dump is written by a separate thread:
+# a WAV whose samples are copied straight into a memory-mapped file, and a
+# JSON-lines event log whose "at" field is the offset into that WAV.
+#
+#   kill -USR1 <pid>   dump from outside
+#   Ctrl+\             dump from the terminal (SIGQUIT)
+#
+#   BLACKBOX_MINUTES=5      how much history to keep
+#   BLACKBOX_EVENTS=20000   event slots
+#   BLACKBOX_DIR=blackbox   where dumps go
+
+SAMPLE_RATE = 16000
+BLACKBOX_MINUTES = float(os.getenv("BLACKBOX_MINUTES", "5"))
+BLACKBOX_EVENTS = int(os.getenv("BLACKBOX_EVENTS", "20000"))
+BLACKBOX_DIR = os.getenv("BLACKBOX_DIR", "blackbox")
+WAV_HEADER_BYTES = 44
+
+
+def _wav_header(samples, rate):
+    """Canonical 44-byte header for 16-bit mono PCM"""
+    data = samples * 2
+    return struct.pack("<4sI4s4sIHHIIHH4sI", b"RIFF", 36 + data, b"WAVE", b"fmt ", 16, 1, 1,
+                       rate, rate * 2, 2, 16, b"data", data)
+
+
+class BlackBox:
+    """Bounded in-memory audio + event history with on-demand dumps"""
+
+    def __init__(self, minutes=BLACKBOX_MINUTES, max_events=BLACKBOX_EVENTS, rate=SAMPLE_RATE,
+                 out_dir=BLACKBOX_DIR):
+        self.rate = rate
+        self.capacity = int(minutes * 60 * rate)
+        self.out_dir = out_dir
+        self._audio = np.zeros(self.capacity, dtype=np.int16)
+        self._written = 0        # samples recorded since start
+        self._start_time = None  # wall clock of sample 0
+        self._events = [None] * max_events
+        self._event_ids = itertools.count()  # atomic under the GIL, so any thread may record
+        self._reader = None
+        self._thread = None
+        self._running = False
+        self._dumping = threading.Lock()
+
+    # ── recording ──
+    def start(self, mic):
+        self._reader = mic.reader()
+        self._start_time = time.time()
+        self._running = True
+        self._thread = threading.Thread(target=self._record_audio, daemon=True)
+        self._thread.start()
+        return self
+
+    def _record_audio(self):
+        while self._running:
+            views = self._reader.read(self.rate)
+            if not views:
+                time.sleep(0.02)
+                continue
+            for view in views:
+                start = self._written % self.capacity
+                first = min(len(view), self.capacity - start)
+                self._audio[start:start + first] = view[:first]
+                self._audio[:len(view) - first] = view[first:]
+                self._written += len(view)
+
+    def record(self, kind, **data):
+        i = next(self._event_ids)
+        self._events[i % len(self._events)] = (i, time.time(), kind, data)
+
+    def stop(self):
+        if not self._running:
+            return
+        self._running = False
+        self._thread.join(timeout=1.0)
+        self._reader.release()
+
+    # ── dumping ──
+    def dump(self):
+        """Write the current history to BLACKBOX_DIR; returns (wav_path, log_path)"""
+        with self._dumping:
+            end = self._written
+            # leave the writer two seconds of slack so it cannot lap the copy
+            count = max(0, min(end, self.capacity - 2 * self.rate))
+            first_sample = end - count
+            stamp = time.strftime("%Y%m%d_%H%M%S")
+            os.makedirs(self.out_dir, exist_ok=True)
+            wav_path = os.path.join(self.out_dir, f"blackbox_{stamp}.wav")
+            log_path = os.path.join(self.out_dir, f"blackbox_{stamp}.jsonl")
+
+            with open(wav_path, "wb") as f:
+                f.write(_wav_header(count, self.rate))
+                f.truncate(WAV_HEADER_BYTES + count * 2)
+            if count:
+                out = np.memmap(wav_path, dtype=np.int16, mode="r+", offset=WAV_HEADER_BYTES, shape=(count,))
+                start = first_sample % self.capacity
+                head = min(count, self.capacity - start)
+                out[:head] = self._audio[start:start + head]
+                out[head:] = self._audio[:count - head]
+                out.flush()
+                del out
+
+            audio_start = self._start_time + first_sample / self.rate
+            events = sorted(e for e in list(self._events) if e is not None)
+            with open(log_path, "w") as log:
+                for i, t, kind, data in events:
+                    log.write(json.dumps({"seq": i, "time": t, "at": round(t - audio_start, 3),
+                                          "kind": kind, **data}, default=str) + "\n")
+        print(f"[BLACKBOX] dumped {count / self.rate:.1f}s of audio and {len(events)} events to {wav_path}")
+        return wav_path, log_path
+
+    def dump_async(self, *_):
+        """Signal-safe: hand the dump to a thread and return immediately"""
+        threading.Thread(target=self.dump, daemon=True).start()
+
+
+# ─── Module-level recorder ────────────────────────────────────────────────────
+# record() is a no-op until start(), so the entry points can log events
+# unconditionally.
+
+_recorder = None
+
+
+def start(mic, **kwargs):
+    global _recorder
+    _recorder = BlackBox(**kwargs).start(mic)
+    for name in ("SIGUSR1", "SIGQUIT"):
+        if hasattr(signal, name):
+            signal.signal(getattr(signal, name), _recorder.dump_async)
+    if sys.platform != "win32":
+        print(f"[BLACKBOX] recording last {_recorder.capacity / _recorder.rate / 60:g} min; Ctrl+\\ or `kill -USR1 {os.getpid()}` to dump")
+    return _recorder
+
+
+def record(kind, **data):
+    if _recorder is not None:
+        _recorder.record(kind, **data)
+
+
+def dump():
+    return _recorder.dump() if _recorder is not None else None
+
+
+def stop():
+    if _recorder is not None:
+        _recorder.stop()
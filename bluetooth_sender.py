@@ -1,3 +1,4 @@
+import os
 import serial
 import time
 import sys
@@ -5,7 +6,7 @@ import re
 import threading
 
 # Serial port configuration
-PORT = '/dev/tty.HC-05' # Update this to your HC-05 serial port
+PORT = os.getenv('BLUETOOTH_PORT', '/dev/tty.HC-05') # Update this to your HC-05 serial port
 BAUD_RATE = 9600
 MAX_RETRY = 5
 
@@ -38,6 +39,15 @@ def send_to_arduino(ser, text):
         print(f"Error sending data: {e}")
         return False
 
+# Pick the text to display out of a line of mic_to_text.py output
+def parse_output_line(line):
+    if line.startswith("Translation:"):
+        return line[12:].strip() or None  # Remove the "Translation: " part
+    if line.startswith("Sentient:"):
+        response = line[9:].strip()  # Remove the "Sentient: " part
+        return "AI: " + response if response else None
+    return None
+
 # Monitor console output from mic_to_text.py
 def monitor_output():
     ser = setup_bluetooth()
@@ -52,17 +62,10 @@ def monitor_output():
         while True:
             line = input()  # Read line from stdin
             
-            # Look for translations in the output
-            if line.startswith("Translation:"):
-                translation = line[12:].strip()  # Remove the "Translation: " part
-                if translation:
-                    send_to_arduino(ser, translation)
-                    
-            # Also capture Sentient's responses
-            elif line.startswith("Sentient:"):
-                response = line[9:].strip()  # Remove the "Sentient: " part
-                if response:
-                    send_to_arduino(ser, "AI: " + response)
+            # Look for translations and Sentient's responses in the output
+            text = parse_output_line(line)
+            if text:
+                send_to_arduino(ser, text)
     
     except KeyboardInterrupt:
         print("Monitoring stopped by user")
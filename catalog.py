@@ -0,0 +1,186 @@
+import os
+import re
+import sys
+import json
+import string
+import threading
+from xml.sax.saxutils import escape, unescape
+
+# ─── On-glass String Catalog ──────────────────────────────────────────────────
+# Every fixed string the games put on the display, as str.format() templates.
+# prepare(lang, translator) loads CATALOG_DIR/<lang>.json and, on a background
+# thread, translates whichever templates it lacks in one batched DeepL request
+# and writes the file back: a language costs one request the first time it is
+# used and none after that. text() fills the fields in locally, so no game
+# screen waits on the network. Until a language is ready (or if DeepL can't be
+# reached) its screens stay in English.
+#
+# Fields travel to DeepL inside <x> tags it is told to leave alone, and a
+# translation that loses or invents a field is not used. Templates written in
+# capitals come back in capitals.
+#
+#   CATALOG_DIR=cache/catalog   where the translated catalogs are kept
+#
+#   python catalog.py ES        build (or load) the ES catalog and print it
+
+CATALOG_DIR = os.getenv("CATALOG_DIR", os.path.join("cache", "catalog"))
+
+TEMPLATES = {
+    # Wordle
+    "wordle": "WORDLE: {board}",
+    "wordle_strike": "STRIKE {strikes}: {board}",
+    "wordle_won": "WON: {word}",
+    "wordle_lost": "LOST: {word}",
+    "wordle_ended": "WORDLE ENDED",
+    # Rock Paper Scissors
+    "rps": "RPS YOU:{user} CPU:{cpu}",
+    "rps_prompt": "YOUR MOVE?",
+    "rps_hint": "SAY: ROCK PAPER SCISSORS | YOU:{user} CPU:{cpu}",
+    "rps_you_played": "You played: {move}",
+    "rps_cpu_played": "CPU played: {move}",
+    "rps_score": "You {user} : CPU {cpu}",
+    "rps_tie": "TIE!",
+    "rps_you_win": "YOU WIN!",
+    "rps_cpu_win": "CPU WIN!",
+    "rps_game_over": "GAME OVER",
+    "rps_ended": "RPS ENDED",
+    "rock": "Rock",
+    "paper": "Paper",
+    "scissors": "Scissors",
+    # Number guessing
+    "number": "NUMBER GAME | GUESS 1-100 | SAY A NUMBER",
+    "number_low": "GUESS {count}: {guess} TOO LOW! TRY HIGHER",
+    "number_high": "GUESS {count}: {guess} TOO HIGH! TRY LOWER",
+    "number_correct": "CORRECT! {number} IN {count} GUESSES!",
+    "number_ended": "NUMBER ENDED",
+}
+
+# tells DeepL what the short strings are for ("Rock" is a hand, not a stone)
+CONTEXT = "Short screens of a voice-controlled smart-glasses game: Wordle, Rock Paper Scissors, number guessing."
+
+_FIELD = re.compile(r"<x>(\{\w*\})</x>")
+
+_catalogs = {}  # lang -> Catalog
+_lock = threading.Lock()
+
+
+def _fields(template):
+    """Sorted field names of a template; ValueError if it won't format"""
+    return sorted(name for _, name, _, _ in string.Formatter().parse(template) if name is not None)
+
+
+def _shouted(template):
+    literal = re.sub(r"\{\w*\}", "", template)
+    return any(c.isalpha() for c in literal) and literal == literal.upper()
+
+
+def _wrap(template):
+    return re.sub(r"\{\w*\}", lambda m: f"<x>{m.group(0)}</x>", escape(template))
+
+
+def _unwrap(translated, shouted):
+    parts = _FIELD.split(translated)  # literal, field, literal, ...
+    parts[::2] = [unescape(part).upper() if shouted else unescape(part) for part in parts[::2]]
+    return "".join(parts)
+
+
+class Catalog:
+    """One language's screens: translated where ready, English otherwise"""
+
+    def __init__(self, lang):
+        self.lang = lang
+        self.path = os.path.join(CATALOG_DIR, f"{lang}.json")
+        self.strings = {}  # English template -> translated template, replaced whole
+        self.ready = threading.Event()
+        self.from_cache = 0
+        self.translated = 0
+
+    def text(self, key, **fields):
+        template = TEMPLATES[key]
+        return self.strings.get(template, template).format(**fields)
+
+    # ── cache ──
+    def load(self):
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                cached = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            print(f"[CATALOG] ignoring {self.path}: {e}")
+            return
+        wanted = set(TEMPLATES.values())
+        self.strings = {source: text for source, text in cached.items() if source in wanted}
+        self.from_cache = len(self.strings)
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.strings, f, ensure_ascii=False, indent=1, sort_keys=True)
+        os.replace(tmp, self.path)
+
+    # ── translation ──
+    def fill(self, translator):
+        """Translate the templates the cache lacks, in one request"""
+        try:
+            missing = [t for t in dict.fromkeys(TEMPLATES.values()) if t not in self.strings]
+            if missing and not self.lang.startswith("EN"):
+                results = translator.translate_text([_wrap(t) for t in missing], target_lang=self.lang,
+                                                    tag_handling="xml", ignore_tags=["x"], context=CONTEXT)
+                strings = dict(self.strings)
+                for source, result in zip(missing, results):
+                    text = _unwrap(result.text, _shouted(source))
+                    try:
+                        usable = _fields(text) == _fields(source)
+                    except ValueError:
+                        usable = False
+                    if usable:
+                        strings[source] = text
+                    else:
+                        print(f"[CATALOG] {self.lang}: keeping {source!r} in English (got {text!r})")
+                self.translated = len(strings) - len(self.strings)
+                self.strings = strings
+                self.save()
+        except Exception as e:
+            print(f"[CATALOG] {self.lang}: translation failed, screens stay in English: {e}")
+        finally:
+            self.ready.set()
+        print(f"[CATALOG] {self.report()}")
+
+    def report(self):
+        total = len(set(TEMPLATES.values()))
+        return (f"{self.lang}: {len(self.strings)}/{total} screens translated "
+                f"({self.from_cache} from {self.path}, {self.translated} from DeepL)")
+
+
+_english = Catalog("EN")
+
+
+def get(lang):
+    """The catalog prepare() started for lang, or plain English"""
+    return _catalogs.get(lang, _english)
+
+
+def prepare(lang, translator):
+    """Load lang's cached catalog now and translate the rest on a background thread"""
+    with _lock:
+        catalog = _catalogs.get(lang)
+        if catalog is None:
+            catalog = _catalogs[lang] = Catalog(lang)
+            catalog.load()
+            threading.Thread(target=catalog.fill, args=(translator,), name=f"catalog-{lang}",
+                             daemon=True).start()
+    return catalog
+
+
+if __name__ == "__main__":
+    import clients
+
+    lang = (sys.argv[1] if len(sys.argv) > 1 else "ES").upper()
+    catalog = prepare(lang, clients.Lazy(clients.translator))
+    catalog.ready.wait()
+    sample = {"board": "E _ C", "strikes": 2, "word": "ERC", "user": 1, "cpu": 2, "move": catalog.text("rock"),
+              "count": 3, "guess": 42, "number": 57}
+    for key in TEMPLATES:
+        print(f"{key:<16} {catalog.text(key, **sample)}")
@@ -0,0 +1,184 @@
+import os
+import time
+import functools
+import threading
+import metrics
+
+# ─── Service Clients ──────────────────────────────────────────────────────────
+# One place to build the Google Speech, DeepL and OpenAI clients, so every
+# script can be pointed at other endpoints (e.g. the stand-ins in
+# fakeservers.py) without code changes:
+#
+#   SPEECH_ENDPOINT=localhost:50051  Speech API host:port
+#   SPEECH_INSECURE=1                plaintext gRPC channel (local stand-in)
+#   DEEPL_SERVER_URL=http://localhost:8080
+#   OPENAI_BASE_URL=http://localhost:8080/v1
+#
+# The SDKs are imported on first use, and scripts hold their clients as Lazy
+# proxies, so nothing is built at import. DeepL and OpenAI calls are counted and
+# timed for metrics.py. The async_* variants are for pipeline.py's asyncio
+# core; DeepL's SDK has no async API, so that one speaks its REST API over
+# httpx (which the openai package already depends on).
+
+
+def speech_client():
+    from google.cloud import speech
+
+    endpoint = os.getenv("SPEECH_ENDPOINT")
+    if not endpoint:
+        return speech.SpeechClient()
+    if os.getenv("SPEECH_INSECURE", "0") == "1":
+        import grpc
+        from google.auth.credentials import AnonymousCredentials
+        from google.cloud.speech_v1.services.speech.transports import SpeechGrpcTransport
+
+        channel = grpc.insecure_channel(endpoint)
+        return speech.SpeechClient(transport=SpeechGrpcTransport(channel=channel,
+                                                                credentials=AnonymousCredentials()))
+    return speech.SpeechClient(client_options={"api_endpoint": endpoint})
+
+
+def translator():
+    import deepl
+
+    server_url = os.getenv("DEEPL_SERVER_URL")
+    if server_url:
+        client = deepl.Translator(os.getenv("DEEPL_API_KEY") or "local", server_url=server_url)
+    else:
+        client = deepl.Translator(os.getenv("DEEPL_API_KEY"))
+    client.translate_text = _metered_translate(client.translate_text)
+    return client
+
+
+def llm():
+    from openai import OpenAI
+
+    base_url = os.getenv("OPENAI_BASE_URL")
+    if base_url:
+        client = OpenAI(api_key=os.getenv("OPENAI_API_KEY") or "local", base_url=base_url)
+    else:
+        client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+    completions = client.chat.completions
+    completions.create = _metered_completion(completions.create)
+    return client
+
+
+class Lazy:
+    """A client built on first use (or by startup.warm_up()), so importing a script builds nothing"""
+
+    def __init__(self, factory):
+        self._factory = factory
+        self._client = None
+        self._lock = threading.Lock()
+
+    def get(self):
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    self._client = self._factory()
+        return self._client
+
+    def __getattr__(self, name):
+        return getattr(self.get(), name)
+
+
+# ─── Async Clients ────────────────────────────────────────────────────────────
+def async_speech_client():
+    from google.cloud import speech
+
+    endpoint = os.getenv("SPEECH_ENDPOINT")
+    if not endpoint:
+        return speech.SpeechAsyncClient()
+    if os.getenv("SPEECH_INSECURE", "0") == "1":
+        import grpc
+        from google.auth.credentials import AnonymousCredentials
+        from google.cloud.speech_v1.services.speech.transports import SpeechGrpcAsyncIOTransport
+
+        channel = grpc.aio.insecure_channel(endpoint)
+        return speech.SpeechAsyncClient(transport=SpeechGrpcAsyncIOTransport(channel=channel,
+                                                                          credentials=AnonymousCredentials()))
+    return speech.SpeechAsyncClient(client_options={"api_endpoint": endpoint})
+
+
+class _Translation:
+    def __init__(self, text):
+        self.text = text
+
+
+class AsyncTranslator:
+    """DeepL's /v2/translate with the SDK's translate_text() shape, awaitable"""
+
+    def __init__(self, auth_key, server_url=None, timeout=10.0):
+        import httpx
+
+        if not server_url:
+            free = auth_key.endswith(":fx")
+            server_url = "https://api-free.deepl.com" if free else "https://api.deepl.com"
+        self._http = httpx.AsyncClient(base_url=server_url, timeout=timeout,
+                                       headers={"Authorization": f"DeepL-Auth-Key {auth_key}"})
+
+    async def translate_text(self, text, target_lang=None, **kwargs):
+        metrics.inc("deepl_characters_total", len(text))
+        start = time.perf_counter()
+        try:
+            response = await self._http.post("/v2/translate", data={"text": text, "target_lang": target_lang})
+            response.raise_for_status()
+            translated = response.json()["translations"][0]["text"]
+        except Exception:
+            metrics.inc("deepl_requests_total", status="error")
+            raise
+        finally:
+            metrics.observe("deepl_request_seconds", time.perf_counter() - start)
+        metrics.inc("deepl_requests_total", status="ok")
+        return _Translation(translated)
+
+    async def close(self):
+        await self._http.aclose()
+
+
+def async_translator():
+    return AsyncTranslator(os.getenv("DEEPL_API_KEY") or "local", os.getenv("DEEPL_SERVER_URL"))
+
+
+def async_llm():
+    from openai import AsyncOpenAI
+
+    base_url = os.getenv("OPENAI_BASE_URL")
+    if base_url:
+        return AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY") or "local", base_url=base_url)
+    return AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+
+
+# ─── Metering ─────────────────────────────────────────────────────────────────
+def _metered_translate(translate_text):
+    @functools.wraps(translate_text)
+    def wrapper(text, *args, **kwargs):
+        texts = [text] if isinstance(text, str) else list(text)
+        metrics.inc("deepl_characters_total", sum(len(t) for t in texts))
+        try:
+            with metrics.timed("deepl_request_seconds"):
+                result = translate_text(text, *args, **kwargs)
+        except Exception:
+            metrics.inc("deepl_requests_total", status="error")
+            raise
+        metrics.inc("deepl_requests_total", status="ok")
+        return result
+    return wrapper
+
+
+def _metered_completion(create):
+    @functools.wraps(create)
+    def wrapper(*args, **kwargs):
+        try:
+            with metrics.timed("openai_request_seconds"):
+                response = create(*args, **kwargs)
+        except Exception:
+            metrics.inc("openai_requests_total", status="error")
+            raise
+        metrics.inc("openai_requests_total", status="ok")
+        usage = getattr(response, "usage", None)
+        if usage is not None:
+            metrics.inc("openai_tokens_total", usage.prompt_tokens or 0, kind="prompt")
+            metrics.inc("openai_tokens_total", usage.completion_tokens or 0, kind="completion")
+        return response
+    return wrapper
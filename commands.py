@@ -0,0 +1,159 @@
+import re
+import timeit
+from collections import namedtuple
+
+# ─── Command Router ────────────────────────────────────────────────────────────
+# One precompiled grammar per mode. Every intent pattern of a mode is folded into
+# a single regex, so a transcript is cleaned once and dispatched in one re call.
+# Intents are tried in registration order (e.g. "stop" wins over a game move).
+# Patterns see the cleaned text, but slot values are cut from the transcript
+# as spoken (case and punctuation kept), e.g. the question sent to the LLM.
+
+Command = namedtuple("Command", ["intent", "slots", "text"])
+
+_PUNCT = re.compile(r'[^\w\s]')
+_KEPT = re.compile(r'[\w\s]+')
+_SLOT = re.compile(r'\(\?P<(\w+)>')
+
+
+class CommandRouter:
+    """Maps utterances to (intent, slots) per mode using one compiled regex"""
+
+    def __init__(self):
+        self._intents = {}    # mode -> [(intent, pattern)]
+        self._compiled = {}   # mode -> (regex, {group: (intent, {group: slot})})
+
+    def register(self, mode, intent, pattern):
+        """Register an intent pattern for a mode; named groups become slots"""
+        self._intents.setdefault(mode, []).append((intent, pattern))
+        self._compiled.pop(mode, None)
+
+    def modes(self):
+        return list(self._intents)
+
+    def _compile(self, mode):
+        branches = []
+        groups = {}
+        for i, (intent, pattern) in enumerate(self._intents.get(mode, [])):
+            # group names must be unique across the alternation, so prefix slots
+            slots = {}
+
+            def rename(m, i=i, slots=slots):
+                name = f"i{i}_{m.group(1)}"
+                slots[name] = m.group(1)
+                return f"(?P<{name}>"
+
+            body = _SLOT.sub(rename, pattern)
+            branches.append(f"(?=.*?(?P<i{i}>{body}))")
+            groups[f"i{i}"] = (intent, slots)
+        regex = re.compile("^(?:" + "|".join(branches) + ")" if branches else r"(?!)", re.DOTALL)
+        self._compiled[mode] = (regex, groups)
+        return self._compiled[mode]
+
+    def route(self, mode, transcript):
+        """Return the first matching Command for a transcript in the given mode"""
+        text = _PUNCT.sub('', transcript).lower().strip()
+        regex, groups = self._compiled.get(mode) or self._compile(mode)
+        m = regex.match(text)
+        if m:
+            for group, (intent, slots) in groups.items():
+                if m.group(group) is not None:
+                    return Command(intent, {slot: _raw(transcript, text, m.span(name))
+                                            if m.group(name) is not None else None
+                                            for name, slot in slots.items()}, text)
+        return Command(None, {}, text)
+
+
+def _offset(transcript, index):
+    """Where the index-th character of the cleaned (unstripped) text is in the transcript"""
+    for run in _KEPT.finditer(transcript):
+        chunk = run.group(0)
+        size = len(chunk.lower())
+        if index < size:
+            if size == len(chunk):
+                return run.start() + index
+            for i, ch in enumerate(chunk):  # lower() made some characters longer (e.g. "İ")
+                index -= len(ch.lower())
+                if index < 0:
+                    return run.start() + i
+        index -= size
+    return len(transcript)
+
+
+def _raw(transcript, text, span):
+    """The transcript text behind a span of the cleaned text (trailing punctuation kept at the end)"""
+    lowered = _PUNCT.sub('', transcript).lower()
+    lead = len(lowered) - len(lowered.lstrip())
+    start, end = span
+    end = len(transcript) if end == len(text) else _offset(transcript, lead + end)
+    return transcript[_offset(transcript, lead + start):end].strip()
+
+
+# ─── Shared Grammar ────────────────────────────────────────────────────────────
+# Transcripts reach the patterns lowercased and with punctuation removed, so
+# "Hey, Sentient!" is matched as "hey sentient".
+
+STOP = r'\b(?:stop|quit|exit)\b'
+
+MODE_INTENTS = {
+    "idle": [
+        ("start_wordle", r'\b(?:play|start)\s*(?:the\s*)?word(?:le)?\b'),
+        ("start_rps", r'\b(?:play|start)\s*(?:the\s*)?(?:rock|rps)\b'),
+        ("start_number", r'\b(?:play|start)\s*(?:the\s*)?numbers?\b'),
+        ("hey_sentient", r'^\s*hey\s*sentient\b\s*(?P<question>.*)'),
+        ("stop", STOP),
+    ],
+    "conversation": [
+        ("end_conversation", r'\bbye\s*sentient\b|' + STOP),
+    ],
+    "wordle": [
+        ("stop", r'\bquit\s*game\b|' + STOP),
+    ],
+    "rps": [
+        ("stop", STOP),
+    ],
+    "number": [
+        ("stop", STOP),
+    ],
+}
+
+
+def build_router(mode_intents=MODE_INTENTS):
+    """Create a router with every mode's intents registered"""
+    r = CommandRouter()
+    for mode, intents in mode_intents.items():
+        for intent, pattern in intents:
+            r.register(mode, intent, pattern)
+    return r
+
+
+router = build_router()
+
+
+def route(mode, transcript):
+    return router.route(mode, transcript)
+
+
+# ─── Microbenchmark ────────────────────────────────────────────────────────────
+SAMPLE_TRANSCRIPTS = {
+    "idle": ["Play word.", "let's play rock", "Hey, Sentient, what's the weather?",
+             "I was thinking we could grab lunch at Price Center after class today."],
+    "conversation": ["Tell me a joke.", "Okay, bye Sentient!"],
+    "wordle": ["E", "stop", "quit game"],
+    "rps": ["Rock!", "stop the game"],
+    "number": ["forty two", "stop"],
+}
+
+
+def benchmark(number=20000):
+    print("Command router dispatch cost (per transcript)")
+    print("-------------------------------------------------------------")
+    for mode, samples in SAMPLE_TRANSCRIPTS.items():
+        for text in samples:
+            secs = timeit.timeit(lambda: router.route(mode, text), number=number)
+            cmd = router.route(mode, text)
+            print(f"{mode:>12} | {secs / number * 1e6:6.2f} us | {cmd.intent or '-':>16} {cmd.slots} <- {text!r}")
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -1,546 +1,599 @@
 import os
-import re
 import time
 import sys
-import serial
 import random
-from google.cloud import speech
-from dotenv import load_dotenv
-import deepl
+import startup
+import commands
+from normalize import extract_letter, extract_number
+from phonetic import PhoneticIndex, RPS_MOVES
+import recognition
+import engines
+import audio
+from vad import VoiceActivityDetector
+import blackbox
+import tracing
+import metrics
+import profiler
+import clients
+import catalog
+import wordle
 
 # ─── Configuration ─────────────────────────────────────────────────────────────
-ARDUINO_PORT = "COM6"#"/dev/cu.usbserial-10"#
+ARDUINO_PORT = os.getenv("ARDUINO_PORT", "COM6")#"/dev/cu.usbserial-10"#
 ARDUINO_BAUD = 9600
 ACK_TIMEOUT = 1.0    # seconds to wait for an ACK
 ACK_RETRIES = 3
 
-load_dotenv()
-os.environ["GOOGLE_APPLICATION_CREDENTIALS"] = os.path.join(os.getcwd(), "googleKey.json")
-deepl_client = deepl.Translator(os.getenv("DEEPL_API_KEY"))
-
-target_language = input("Enter target language (e.g., 'ES' for Spanish, 'FR' for French): ").strip().upper()
-
-streaming_active = True
-
-# Game state management
-wordle_active = False
-wordle_word = ""
-wordle_guessed = []
-wordle_strikes = 0
-wordle_max_strikes = 6
-wordle_display = []
-
-rps_active = False
-rps_user_score = 0
-rps_computer_score = 0
-
-number_game_active = False
-target_number = None
-num_guesses = 0
+deepl_client = clients.Lazy(clients.translator)
 
 campus_places = [
     "ERC"
 ]
+campus_index = PhoneticIndex(campus_places)
+
+# ─── Headset ───────────────────────────────────────────────────────────────────
+# Everything that belongs to one pair of glasses: mic, VAD, serial link, target
+# language and game state. The clients above, the recognizer engine and the
+# phonetic indexes are shared, so host.py can drive several headsets from one
+# process.
+
+class Headset:
+    """One pair of glasses: its capture, recognition, games and display link"""
+
+    def __init__(self, target_language, name="glasses", mic=None, port=ARDUINO_PORT,
+                 engine=None, console=True):
+        self.name = name
+        self.target_language = target_language
+        self.port = port
+        self.mic = mic or audio.Microphone()
+        self.vad = VoiceActivityDetector()
+        self.engine = engine  # None: the run's engines.get()
+        self.console = console
+        self.arduino = None
+        self.streaming_active = True
+
+        # Game state management
+        self.wordle_active = False
+        self.wordle_word = ""
+        self.wordle_guessed = []
+        self.wordle_strikes = 0
+        self.wordle_max_strikes = 6
+        self.wordle_display = []
+
+        self.rps_active = False
+        self.rps_user_score = 0
+        self.rps_computer_score = 0
+
+        self.number_game_active = False
+        self.target_number = None
+        self.num_guesses = 0
+
+    # ── serial link ──
+    def establish_connection(self):
+        import serial
 
-# ─── Serial Helpers ─────────────────────────────────────────────────────────────
-arduino = None
-
-def establish_connection():
-    global arduino
-    try:
-        print(f"[DEBUG] Attempting to connect to Arduino on {ARDUINO_PORT}")
-        arduino = serial.Serial(ARDUINO_PORT, ARDUINO_BAUD, timeout=0.1)
-        time.sleep(2)  # allow Arduino to reset
-        arduino.reset_input_buffer()
-        print("[DEBUG] Arduino connection established, testing communication...")
-        if _send_and_wait("TEST", expect_contains="Ready"):
-            print("[DEBUG] Arduino communication test successful")
-            return True
-        else:
-            print("[ERROR] Arduino communication test failed")
+        try:
+            print(f"[DEBUG] Attempting to connect to Arduino on {self.port}")
+            self.arduino = serial.Serial(self.port, ARDUINO_BAUD, timeout=0.1)
+            time.sleep(2)  # allow Arduino to reset
+            self.arduino.reset_input_buffer()
+            print("[DEBUG] Arduino connection established, testing communication...")
+            if self._send_and_wait("TEST", expect_contains="Ready"):
+                print("[DEBUG] Arduino communication test successful")
+                return True
+            else:
+                print("[ERROR] Arduino communication test failed")
+                return False
+        except Exception as e:
+            print(f"[ERROR] Opening {self.port}: {e}")
             return False
-    except Exception as e:
-        print(f"[ERROR] Opening {ARDUINO_PORT}: {e}")
+
+    def _send_and_wait(self, msg, expect_contains=None):
+        """Send msg\\n, wait for an ACK or for expect_contains in reply."""
+        print(f"[DEBUG] Sending to Arduino: '{msg}'")
+        for attempt in range(ACK_RETRIES):
+            try:
+                if attempt:
+                    metrics.inc("serial_retries_total")
+                self.arduino.write((msg + "\n").encode())
+                metrics.inc("serial_bytes_total", len(msg) + 1, direction="tx")
+                tracing.serial_write(msg)
+                print(f"[DEBUG] Written to Arduino (attempt {attempt+1}/{ACK_RETRIES})")
+                deadline = time.time() + ACK_TIMEOUT
+                while time.time() < deadline:
+                    raw = self.arduino.readline()
+                    metrics.inc("serial_bytes_total", len(raw), direction="rx")
+                    line = raw.decode(errors="ignore").strip()
+                    if not line:
+                        continue
+                    print(f"[DEBUG] Arduino response: '{line}'")
+                    if line.startswith("ACK:"):
+                        print(f"[DEBUG] Received ACK for '{msg}'")
+                        tracing.serial_ack(line[4:])
+                        return True
+                    if expect_contains and expect_contains in line:
+                        print(f"[DEBUG] Received expected response containing '{expect_contains}'")
+                        # echo back an ACK so callers see success
+                        self.arduino.write(f"ACK:{msg}\n".encode())
+                        return True
+                metrics.inc("serial_ack_timeouts_total")
+                print(f"[WARN] No ACK for '{msg}' (attempt {attempt+1}/{ACK_RETRIES})")
+            except Exception as e:
+                print(f"[ERROR] Arduino communication error: {e}")
         return False
 
-def _send_and_wait(msg, expect_contains=None):
-    """Send msg\\n, wait for an ACK or for expect_contains in reply."""
-    print(f"[DEBUG] Sending to Arduino: '{msg}'")
-    for attempt in range(ACK_RETRIES):
+    def send_to_arduino(self, prefix, text=""):
+        """Formats and sends prefix+text (e.g. 'T:', 'R:', 'G:')."""
+        if not self.arduino or not self.arduino.is_open:
+            print("[WARN] Cannot send to Arduino - not connected")
+            return
+        payload = f"{prefix}{text}"[:95]  # clamp length
+        print(f"[DEBUG] Preparing Arduino message: {payload}")
+        success = self._send_and_wait(payload)
+        blackbox.record("serial", payload=payload, acked=success)
+        if not success:
+            print(f"[WARN] Failed to send message to Arduino: {payload}")
+
+    # ── console and translation ──
+    def clear_console(self):
+        if self.console:
+            os.system('cls' if sys.platform == 'win32' else 'clear')
+
+    def translate_text(self, text):
+        if not text.strip():
+            return ""
         try:
-            arduino.write((msg + "\n").encode())
-            print(f"[DEBUG] Written to Arduino (attempt {attempt+1}/{ACK_RETRIES})")
-            deadline = time.time() + ACK_TIMEOUT
-            while time.time() < deadline:
-                line = arduino.readline().decode(errors="ignore").strip()
-                if not line:
-                    continue
-                print(f"[DEBUG] Arduino response: '{line}'")
-                if line.startswith("ACK:"):
-                    print(f"[DEBUG] Received ACK for '{msg}'")
-                    return True
-                if expect_contains and expect_contains in line:
-                    print(f"[DEBUG] Received expected response containing '{expect_contains}'")
-                    # echo back an ACK so callers see success
-                    arduino.write(f"ACK:{msg}\n".encode())
-                    return True
-            print(f"[WARN] No ACK for '{msg}' (attempt {attempt+1}/{ACK_RETRIES})")
+            tracing.mark("translation_requested")
+            translated = deepl_client.translate_text(text, target_lang=self.target_language).text
+            tracing.mark("translation_returned")
+            blackbox.record("translation", source=text, text=translated)
+            return translated
         except Exception as e:
-            print(f"[ERROR] Arduino communication error: {e}")
-    return False
-
-def send_to_arduino(prefix, text=""):
-    """Formats and sends prefix+text (e.g. 'T:', 'R:', 'G:')."""
-    if not arduino or not arduino.is_open:
-        print("[WARN] Cannot send to Arduino - not connected")
-        return
-    payload = f"{prefix}{text}"[:95]  # clamp length
-    print(f"[DEBUG] Preparing Arduino message: {payload}")
-    success = _send_and_wait(payload)
-    if not success:
-        print(f"[WARN] Failed to send message to Arduino: {payload}")
-
-# ─── Utility Functions ─────────────────────────────────────────────────────────
-def clear_console():
-    os.system('cls' if sys.platform == 'win32' else 'clear')
-
-def translate_text(text):
-    if not text.strip():
-        return ""
-    try:
-        return deepl_client.translate_text(text, target_lang=target_language).text
-    except Exception as e:
-        print(f"[ERROR] Translation: {e}")
-        return "(Translation error)"
-
-# ─── Game Functions ─────────────────────────────────────────────────────────────
-def start_wordle_game():
-    """Start a new Wordle game with a random campus place"""
-    global wordle_active, wordle_word, wordle_guessed, wordle_strikes, wordle_display
-    
-    wordle_active = True
-    wordle_word = random.choice(campus_places).upper()
-    wordle_guessed = []
-    wordle_strikes = 0
-    wordle_display = ['_' if c.isalpha() else c for c in wordle_word]
-    
-    print(f"\n>>> WORDLE GAME STARTED! <<<")
-    print(f"Guess the campus location: {' '.join(wordle_display)}")
-    print(f"Strikes: {wordle_strikes}/{wordle_max_strikes}")
-    print("Say letters to guess!")
-    # Send game info to Arduino with G: prefix
-    send_to_arduino("G:", f"WORDLE: {' '.join(wordle_display)}")
-
-def handle_wordle_guess(letter):
-    """Handle a letter guess in Wordle game"""
-    global wordle_active, wordle_strikes, wordle_display
-    
-    if not letter or len(letter) != 1 or not letter.isalpha():
-        return "Please say a single letter!"
-    
-    letter = letter.upper()
-    
-    if letter in wordle_guessed:
-        return f"You already guessed '{letter}'. Try another letter!"
-    
-    wordle_guessed.append(letter)
-    
-    if letter in wordle_word:
-        # Update display with correct letter
-        for i, c in enumerate(wordle_word):
-            if c == letter:
-                wordle_display[i] = letter
-        
-        # Check if word is complete
-        if '_' not in wordle_display:
-            wordle_active = False
-            result = f"🎉 CONGRATULATIONS! You guessed it: {wordle_word}"
-            send_to_arduino("G:", f"WON: {wordle_word}")
-            return result
+            print(f"[ERROR] Translation: {e}")
+            blackbox.record("translation_error", source=text, error=str(e))
+            return "(Translation error)"
+
+    # ── games ──
+    @property
+    def screens(self):
+        """This headset's catalog.py screens (English until catalog.prepare() has its language)"""
+        return catalog.get(self.target_language)
+
+    def show(self, screen, **fields):
+        """Send a catalog screen with its fields filled in; no network involved"""
+        self.send_to_arduino("G:", self.screens.text(screen, **fields))
+
+    def start_wordle_game(self):
+        """Start a new Wordle game with a random campus place"""
+        self.wordle_active = True
+        metrics.inc("game_events_total", game="wordle", event="start")
+        self.wordle_word = random.choice(campus_places).upper()
+        self.wordle_guessed = []
+        self.wordle_strikes = 0
+        self.wordle_display = ['_' if c.isalpha() else c for c in self.wordle_word]
+
+        print(f"\n>>> WORDLE GAME STARTED! <<<")
+        print(f"Guess the campus location: {' '.join(self.wordle_display)}")
+        print(f"Strikes: {self.wordle_strikes}/{self.wordle_max_strikes}")
+        print("Say letters to guess!")
+        # Send game info to Arduino with G: prefix
+        self.show("wordle", board=' '.join(self.wordle_display))
+
+    def handle_wordle_guess(self, letter):
+        """Handle a letter guess in Wordle game"""
+        if not letter or len(letter) != 1 or not letter.isalpha():
+            return "Please say a single letter!"
+
+        letter = letter.upper()
+
+        if letter in self.wordle_guessed:
+            return f"You already guessed '{letter}'. Try another letter!"
+
+        self.wordle_guessed.append(letter)
+        metrics.inc("game_events_total", game="wordle", event="move")
+
+        if letter in self.wordle_word:
+            # Update display with correct letter
+            for i, c in enumerate(self.wordle_word):
+                if c == letter:
+                    self.wordle_display[i] = letter
+
+            # Check if word is complete
+            if '_' not in self.wordle_display:
+                self.wordle_active = False
+                metrics.inc("game_events_total", game="wordle", event="win")
+                result = f"🎉 CONGRATULATIONS! You guessed it: {self.wordle_word}"
+                self.show("wordle_won", word=self.wordle_word)
+                return result
+            else:
+                result = f"Good guess! {' '.join(self.wordle_display)}"
+                self.show("wordle", board=' '.join(self.wordle_display))
+                return result
+        else:
+            self.wordle_strikes += 1
+            if self.wordle_strikes >= self.wordle_max_strikes:
+                self.wordle_active = False
+                metrics.inc("game_events_total", game="wordle", event="loss")
+                result = f"💀 Game Over! The word was: {self.wordle_word}"
+                self.show("wordle_lost", word=self.wordle_word)
+                return result
+            else:
+                result = f"Strike {self.wordle_strikes}/{self.wordle_max_strikes}! Letter '{letter}' not found. {' '.join(self.wordle_display)}"
+                self.show("wordle_strike", strikes=self.wordle_strikes, board=' '.join(self.wordle_display))
+                return result
+
+    def handle_wordle_solve(self, place):
+        """Handle a guess of the whole campus place in Wordle game"""
+        solved = wordle.solve(self.wordle_word, self.wordle_display, self.wordle_strikes,
+                              self.wordle_max_strikes, place)
+        self.wordle_active, self.wordle_strikes, self.wordle_display = solved.active, solved.strikes, solved.board
+        self.show(solved.screen, **solved.fields)
+        return solved.result
+
+    def start_rps_game(self):
+        """Start a new Rock Paper Scissors game"""
+        self.rps_active = True
+        metrics.inc("game_events_total", game="rps", event="start")
+        self.rps_user_score = 0
+        self.rps_computer_score = 0
+
+        print(f"\n>>> ROCK PAPER SCISSORS STARTED! <<<")
+        print(f"Score - You: {self.rps_user_score} | Computer: {self.rps_computer_score}")
+        print("Say 'rock', 'paper', or 'scissors' to play!")
+
+        # Send game info to Arduino with G: prefix
+        self.show("rps", user=self.rps_user_score, cpu=self.rps_computer_score)
+        self.show("rps_prompt")
+
+    def handle_rps_move(self, move):
+        """Handle a rock paper scissors move"""
+        if not move:
+            return "Please say 'rock', 'paper', or 'scissors'!"
+
+        move = move.lower().strip()
+        options = ["rock", "paper", "scissors"]
+
+        if move not in options:
+            return "Invalid choice. Please say 'rock', 'paper', or 'scissors'."
+
+        computer_choice = random.choice(options)
+        metrics.inc("game_events_total", game="rps", event="move")
+        result_msg = f"You chose: {move} | Computer chose: {computer_choice}\n"
+
+        # Determine result
+        if move == computer_choice:
+            round_result = "rps_tie"
+            result_msg += "It's a tie!"
+        elif (move == "rock" and computer_choice == "scissors") or \
+             (move == "paper" and computer_choice == "rock") or \
+             (move == "scissors" and computer_choice == "paper"):
+            self.rps_user_score += 1
+            round_result = "rps_you_win"
+            result_msg += "You win this round!"
         else:
-            result = f"Good guess! {' '.join(wordle_display)}"
-            send_to_arduino("G:", f"WORDLE: {' '.join(wordle_display)}")
+            self.rps_computer_score += 1
+            round_result = "rps_cpu_win"
+            result_msg += "Computer wins this round!"
+
+        # Show what the user played
+        self.show("rps_you_played", move=self.screens.text(move))
+        time.sleep(1)
+        # Show what the computer played
+        self.show("rps_cpu_played", move=self.screens.text(computer_choice))
+        time.sleep(1)
+        # Show the result
+        self.show(round_result)
+        time.sleep(1)
+        # Show the score
+        self.show("rps_score", user=self.rps_user_score, cpu=self.rps_computer_score)
+        time.sleep(1)
+
+        result_msg += f"\nScore - You: {self.rps_user_score} | Computer: {self.rps_computer_score}"
+
+        # Check for game end (first to 3 wins)
+        if self.rps_user_score >= 3:
+            self.rps_active = False
+            result_msg += "\n🎉 YOU WIN THE GAME! Say 'play rock' to play again."
+            metrics.inc("game_events_total", game="rps", event="win")
+            self.show("rps_game_over")
+            self.show("rps_you_win")
+        elif self.rps_computer_score >= 3:
+            self.rps_active = False
+            result_msg += "\n💀 COMPUTER WINS THE GAME! Say 'play rock' to play again."
+            metrics.inc("game_events_total", game="rps", event="loss")
+            self.show("rps_game_over")
+            self.show("rps_cpu_win")
+        else:
+            result_msg += "\nSay your next move!"
+            # Update display for next round
+            self.show("rps_score", user=self.rps_user_score, cpu=self.rps_computer_score)
+            self.show("rps_prompt")
+
+        return result_msg
+
+    def start_number_game(self):
+        """Start a new number guessing game"""
+        self.number_game_active = True
+        metrics.inc("game_events_total", game="number", event="start")
+        self.target_number = random.randint(1, 100)
+        self.num_guesses = 0
+
+        print(f"\n>>> NUMBER GUESSING GAME STARTED! <<<")
+        print(f"I'm thinking of a number between 1 and 100.")
+        print("Say a number to make your guess!")
+        # Send game info to Arduino with G: prefix
+        self.show("number")
+
+    def handle_number_guess(self, guess_text):
+        """Process the player's guess and provide feedback"""
+        # If guess_text is already an integer, use it directly
+        if isinstance(guess_text, int):
+            guess = guess_text
+        else:
+            guess = extract_number(guess_text)
+
+        print(f"[DEBUG] self.handle_number_guess: guess={guess}")
+
+        if not guess:
+            return "I didn't catch a number. Please say a number between 1 and 100."
+
+        if guess < 1 or guess > 100:
+            return "Please guess a number between 1 and 100."
+
+        self.num_guesses += 1
+        metrics.inc("game_events_total", game="number", event="move")
+
+        if guess < self.target_number:
+            result = f"{guess} is too low! Try a higher number. (Guess #{self.num_guesses})"
+            self.show("number_low", count=self.num_guesses, guess=guess)
             return result
-    else:
-        wordle_strikes += 1
-        if wordle_strikes >= wordle_max_strikes:
-            wordle_active = False
-            result = f"💀 Game Over! The word was: {wordle_word}"
-            send_to_arduino("G:", f"LOST: {wordle_word}")
+        elif guess > self.target_number:
+            result = f"{guess} is too high! Try a lower number. (Guess #{self.num_guesses})"
+            self.show("number_high", count=self.num_guesses, guess=guess)
             return result
         else:
-            result = f"Strike {wordle_strikes}/{wordle_max_strikes}! Letter '{letter}' not found. {' '.join(wordle_display)}"
-            send_to_arduino("G:", f"STRIKE {wordle_strikes}: {' '.join(wordle_display)}")
+            self.number_game_active = False
+            metrics.inc("game_events_total", game="number", event="win")
+            result = f"🎉 Congratulations! You found the number {self.target_number} in {self.num_guesses} guesses! Say 'play number' to start a new game."
+            self.show("number_correct", number=self.target_number, count=self.num_guesses)
             return result
 
-def start_rps_game():
-    """Start a new Rock Paper Scissors game"""
-    global rps_active, rps_user_score, rps_computer_score
-    
-    rps_active = True
-    rps_user_score = 0
-    rps_computer_score = 0
-    
-    print(f"\n>>> ROCK PAPER SCISSORS STARTED! <<<")
-    print(f"Score - You: {rps_user_score} | Computer: {rps_computer_score}")
-    print("Say 'rock', 'paper', or 'scissors' to play!")
-    
-    # Send game info to Arduino with G: prefix
-    send_to_arduino("G:", f"RPS YOU:{rps_user_score} CPU:{rps_computer_score}")
-    send_to_arduino("G:", "YOUR MOVE?")
-
-def handle_rps_move(move):
-    """Handle a rock paper scissors move"""
-    global rps_active, rps_user_score, rps_computer_score
-    
-    if not move:
-        return "Please say 'rock', 'paper', or 'scissors'!"
-    
-    move = move.lower().strip()
-    options = ["rock", "paper", "scissors"]
-    
-    if move not in options:
-        return "Invalid choice. Please say 'rock', 'paper', or 'scissors'."
-    
-    computer_choice = random.choice(options)
-    result_msg = f"You chose: {move} | Computer chose: {computer_choice}\n"
-
-    # Determine result
-    if move == computer_choice:
-        round_result = "TIE!"
-        result_msg += "It's a tie!"
-    elif (move == "rock" and computer_choice == "scissors") or \
-         (move == "paper" and computer_choice == "rock") or \
-         (move == "scissors" and computer_choice == "paper"):
-        rps_user_score += 1
-        round_result = "YOU WIN!"
-        result_msg += "You win this round!"
-    else:
-        rps_computer_score += 1
-        round_result = "CPU WIN!"
-        result_msg += "Computer wins this round!"
-
-    # Show what the user played
-    send_to_arduino("G:", f"You played: {move.title()}")
-    time.sleep(1)
-    # Show what the computer played
-    send_to_arduino("G:", f"CPU played: {computer_choice.title()}")
-    time.sleep(1)
-    # Show the result
-    send_to_arduino("G:", round_result)
-    time.sleep(1)
-    # Show the score
-    send_to_arduino("G:", f"You {rps_user_score} : CPU {rps_computer_score}")
-    time.sleep(1)
-
-    result_msg += f"\nScore - You: {rps_user_score} | Computer: {rps_computer_score}"
-    
-    # Check for game end (first to 3 wins)
-    if rps_user_score >= 3:
-        rps_active = False
-        result_msg += "\n🎉 YOU WIN THE GAME! Say 'play rock' to play again."
-        send_to_arduino("G:", "GAME OVER")
-        send_to_arduino("G:", "YOU WIN!")
-    elif rps_computer_score >= 3:
-        rps_active = False
-        result_msg += "\n💀 COMPUTER WINS THE GAME! Say 'play rock' to play again."
-        send_to_arduino("G:", "GAME OVER")
-        send_to_arduino("G:", "CPU WIN!")
-    else:
-        result_msg += "\nSay your next move!"
-        # Update display for next round
-        send_to_arduino("G:", f"You {rps_user_score} : CPU {rps_computer_score}")
-        send_to_arduino("G:", "YOUR MOVE?")
-    
-    return result_msg
-
-def extract_number(text):
-    """Extract a number from the spoken text"""
-    print(f"[DEBUG] extract_number called with text: '{text}'")
-    # Look for number words or digits
-    number_words = {
-        'one': '1', 'two': '2', 'three': '3', 'four': '4', 'five': '5',
-        'six': '6', 'seven': '7', 'eight': '8', 'nine': '9', 'ten': '10',
-        'eleven': '11', 'twelve': '12', 'thirteen': '13', 'fourteen': '14', 'fifteen': '15',
-        'sixteen': '16', 'seventeen': '17', 'eighteen': '18', 'nineteen': '19',
-        'twenty': '20', 'thirty': '30', 'forty': '40', 'fifty': '50',
-        'sixty': '60', 'seventy': '70', 'eighty': '80', 'ninety': '90'
-    }
-    
-    # Convert word numbers to digits
-    text_lower = text.lower()
-    print(f"[DEBUG] extract_number: text_lower='{text_lower}'")
-    for word, digit in number_words.items():
-        text_lower = text_lower.replace(word, digit)
-    
-    # Find any numbers in the text
-    numbers = re.findall(r'\d+', text_lower)
-    print(f"[DEBUG] extract_number: found numbers={numbers}")
-    if numbers:
-        return int(numbers[0])
-    return None
-
-def start_number_game():
-    """Start a new number guessing game"""
-    global number_game_active, target_number, num_guesses
-    
-    number_game_active = True
-    target_number = random.randint(1, 100)
-    num_guesses = 0
-    
-    print(f"\n>>> NUMBER GUESSING GAME STARTED! <<<")
-    print(f"I'm thinking of a number between 1 and 100.")
-    print("Say a number to make your guess!")
-    # Send game info to Arduino with G: prefix
-    send_to_arduino("G:", "NUMBER GAME | GUESS 1-100 | SAY A NUMBER")
-
-def handle_number_guess(guess_text):
-    """Process the player's guess and provide feedback"""
-    global num_guesses, number_game_active
-    
-    # If guess_text is already an integer, use it directly
-    if isinstance(guess_text, int):
-        guess = guess_text
-    else:
-        guess = extract_number(guess_text)
-    
-    print(f"[DEBUG] handle_number_guess: guess={guess}")
-    
-    if not guess:
-        return "I didn't catch a number. Please say a number between 1 and 100."
-    
-    if guess < 1 or guess > 100:
-        return "Please guess a number between 1 and 100."
-    
-    num_guesses += 1
-    
-    if guess < target_number:
-        result = f"{guess} is too low! Try a higher number. (Guess #{num_guesses})"
-        send_to_arduino("G:", f"GUESS {num_guesses}: {guess} TOO LOW! TRY HIGHER")
-        return result
-    elif guess > target_number:
-        result = f"{guess} is too high! Try a lower number. (Guess #{num_guesses})"
-        send_to_arduino("G:", f"GUESS {num_guesses}: {guess} TOO HIGH! TRY LOWER")
-        return result
-    else:
-        number_game_active = False
-        result = f"🎉 Congratulations! You found the number {target_number} in {num_guesses} guesses! Say 'play number' to start a new game."
-        send_to_arduino("G:", f"CORRECT! {target_number} IN {num_guesses} GUESSES!")
-        return result
-
-# ─── Streaming Speech → Text → Arduino ────────────────────────────────────────
-def stream_speech_to_text():
-    global wordle_active, rps_active, number_game_active
-    client = speech.SpeechClient()
-    config = speech.RecognitionConfig(
-        encoding=speech.RecognitionConfig.AudioEncoding.LINEAR16,
-        sample_rate_hertz=16000,
-        language_code="en-US",
-        enable_automatic_punctuation=True
-    )
-    stream_config = speech.StreamingRecognitionConfig(config=config, interim_results=True)
-
-    def audio_gen():
-        import pyaudio
-        pa = pyaudio.PyAudio()
-        stream = pa.open(
-            format=pyaudio.paInt16,
-            channels=1,
-            rate=16000,
-            input=True,
-            frames_per_buffer=1024
-        )
-        time.sleep(0.5)
-        while streaming_active:
-            yield stream.read(4096, exception_on_overflow=False)
-        stream.stop_stream(); stream.close(); pa.terminate()
-
-    requests = (speech.StreamingRecognizeRequest(audio_content=chunk)
-                for chunk in audio_gen())
-    responses = client.streaming_recognize(stream_config, requests)
-
-    last = ""
-    last_time = time.time()
-    cooldown = 0.3
-
-    print(">>> Listening (Ctrl‑C to stop)")
-    for resp in responses:
-        if not resp.results:
-            continue
-        res = resp.results[0]
-        txt = res.alternatives[0].transcript
-        now = time.time()
-
-        print(f"[DEBUG] Transcript: '{txt}' | final={res.is_final}")  # Debug print
-
-        # throttle updates
-        if txt != last and (res.is_final or now - last_time > cooldown):
-            clear_console()
-            
-            # Show current game status
-            if wordle_active:
-                print(">>> Playing Wordle! Say letters to guess (say 'stop' to quit)")
-                print(f"Word: {' '.join(wordle_display)} | Strikes: {wordle_strikes}/{wordle_max_strikes} | Guessed: {', '.join(wordle_guessed)}")
-            elif rps_active:
-                print(">>> Playing Rock Paper Scissors! Say 'rock', 'paper', or 'scissors' (say 'stop' to quit)")
-                print(f"Score - You: {rps_user_score} | Computer: {rps_computer_score}")
-            elif number_game_active:
-                print(">>> Playing Number Guessing Game! Say a number between 1-100 (say 'stop' to quit)")
-                print(f"Guesses: {num_guesses} | Range: 1-100")
+    def current_mode(self):
+        """Name of the command-router mode for the active game"""
+        if self.wordle_active:
+            return "wordle"
+        if self.rps_active:
+            return "rps"
+        if self.number_game_active:
+            return "number"
+        return "idle"
+
+    def caption(self, txt):
+        """Show a transcript and its translation on the display"""
+        self.send_to_arduino("T:", txt)
+        tr = self.translate_text(txt)
+        print(f"Translation: {tr}")
+        self.send_to_arduino("R:", tr)
+
+    def handle_transcript(self, txt, is_final):
+        """Captions, commands and game moves for one transcript; True ends the recognition stream"""
+        self.clear_console()
+
+        # Show current game status
+        if self.wordle_active:
+            print(">>> Playing Wordle! Say letters to guess (say 'stop' to quit)")
+            print(f"Word: {' '.join(self.wordle_display)} | Strikes: {self.wordle_strikes}/{self.wordle_max_strikes} | Guessed: {', '.join(self.wordle_guessed)}")
+        elif self.rps_active:
+            print(">>> Playing Rock Paper Scissors! Say 'rock', 'paper', or 'scissors' (say 'stop' to quit)")
+            print(f"Score - You: {self.rps_user_score} | Computer: {self.rps_computer_score}")
+        elif self.number_game_active:
+            print(">>> Playing Number Guessing Game! Say a number between 1-100 (say 'stop' to quit)")
+            print(f"Guesses: {self.num_guesses} | Range: 1-100")
+        else:
+            print(">>> Say 'play word' for Wordle, 'play rock' for RPS, or 'play number' for Number Game")
+
+        print(f"Transcription: {txt!r}  (final={is_final})")
+
+        # if not in game mode, send transcript+translation
+        if not self.wordle_active and not self.rps_active and not self.number_game_active:
+            self.caption(txt)
+
+        # Process the transcript
+        cmd = commands.route(self.current_mode(), txt)
+        clean = cmd.text
+        print(f"[DEBUG] Processing transcript: '{clean}' intent={cmd.intent} (final={is_final})")
+
+        # Check for stop/quit command first
+        if cmd.intent == "stop":
+            print(f"[DEBUG] Detected stop/quit command.")
+            if self.wordle_active:
+                self.wordle_active = False
+                self.show("wordle_ended")
+                metrics.inc("game_events_total", game="wordle", event="stop")
+                print("\n>>> Wordle game ended. Say 'play word' to start a new game.")
+            elif self.rps_active:
+                self.rps_active = False
+                self.show("rps_ended")
+                metrics.inc("game_events_total", game="rps", event="stop")
+                print("\n>>> Rock Paper Scissors game ended. Say 'play rock' to start a new game.")
+            elif self.number_game_active:
+                self.number_game_active = False
+                self.show("number_ended")
+                metrics.inc("game_events_total", game="number", event="stop")
+                print("\n>>> Number game ended. Say 'play number' to start a new game.")
+            return True
+
+        # Process game moves
+        if self.wordle_active:
+            print("[DEBUG] Processing Wordle game")
+            # Single letters and spoken letter names ("oh", "bee", "why")
+            letter = extract_letter(clean)
+            letters = [letter] if letter else []
+            # Otherwise the player may be calling out the whole place
+            place = None if letters else wordle.heard_place(campus_index, clean)
+            print(f"[DEBUG] After extraction: clean='{clean}', letters={letters}, place={place}")
+            if letters:
+                print(f">>> Extracted letter: '{letters[0]}'")
+                guess_result = self.handle_wordle_guess(letters[0].upper())
+                print(f">>> {guess_result}")
+                if not self.wordle_active:
+                    print("\n>>> Game ended. Say 'play word' to start a new game.")
+                return True
+            elif place:
+                guess_result = self.handle_wordle_solve(place.value)
+                print(f">>> {guess_result}")
+                if not self.wordle_active:
+                    print("\n>>> Game ended. Say 'play word' to start a new game.")
+                return True
+            else:
+                print(">>> Please say a single letter to guess!")
+                return True
+        elif self.rps_active:
+            print("[DEBUG] Processing RPS game")
+            # Fuzzy match so "rack" or "sisters" still counts as a move
+            move = RPS_MOVES.resolve(clean)
+            if move:
+                chosen_move = move.value
+                print(f"[DEBUG] Recognized RPS move: {chosen_move} (confidence {move.confidence:.2f})")
+                move_result = self.handle_rps_move(chosen_move)
+                print(f">>> {move_result}")
+            else:
+                print(f">>> Didn't recognize move in: '{txt}'. Please say 'rock', 'paper', or 'scissors'!")
+                self.show("rps_hint", user=self.rps_user_score, cpu=self.rps_computer_score)
+            return True
+        elif self.number_game_active:
+            print("[DEBUG] Processing Number game")
+            # Digits or compound number words ("forty two")
+            guess = extract_number(clean)
+            print(f"[DEBUG] Extracted number: {guess}")
+
+            if guess is not None and 1 <= guess <= 100:
+                print(f"[DEBUG] Processing valid guess: {guess}")
+                guess_result = self.handle_number_guess(guess)
+                print(f">>> {guess_result}")
             else:
-                print(">>> Say 'play word' for Wordle, 'play rock' for RPS, or 'play number' for Number Game")
-            
-            print(f"Transcription: {txt!r}  (final={res.is_final})")
-
-            # if not in game mode, send transcript+translation
-            if not wordle_active and not rps_active and not number_game_active:
-                send_to_arduino("T:", txt)
-                tr = translate_text(txt)
-                print(f"Translation: {tr}")
-                send_to_arduino("R:", tr)
-
-            # Process the transcript
-            clean = re.sub(r'[^-\x7f\w\s]', '', txt).lower().strip()
-            print(f"[DEBUG] Processing transcript: '{clean}' (final={res.is_final})")
-
-            # Check for stop/quit command first
-            if re.search(r'\b(stop|quit|exit)\b', clean, re.IGNORECASE):
-                print(f"[DEBUG] Detected stop/quit command.")
-                if wordle_active:
-                    wordle_active = False
-                    send_to_arduino("G:", "WORDLE ENDED")
-                    print("\n>>> Wordle game ended. Say 'play word' to start a new game.")
-                elif rps_active:
-                    rps_active = False
-                    send_to_arduino("G:", "RPS ENDED")
-                    print("\n>>> Rock Paper Scissors game ended. Say 'play rock' to start a new game.")
-                elif number_game_active:
-                    number_game_active = False
-                    send_to_arduino("G:", "NUMBER ENDED")
-                    print("\n>>> Number game ended. Say 'play number' to start a new game.")
-                return
-
-            # Process game moves
-            if wordle_active:
-                print("[DEBUG] Processing Wordle game")
-                # Special handling for common speech recognition issues
-                if clean in ['oh', 'owe']:
-                    letters = ['O']
-                elif len(clean) == 1 and clean.isalpha():
-                    letters = [clean]
-                else:
-                    # Extract single letter from transcript
-                    letters = re.findall(r'\b[A-Za-z]\b', clean)
-                    if not letters and len(clean) <= 3:
-                        letter_match = re.search(r'([A-Za-z])', clean)
-                        if letter_match:
-                            letters = [letter_match.group(1)]
-                print(f"[DEBUG] After extraction: clean='{clean}', letters={letters}")
-                if letters:
-                    print(f">>> Extracted letter: '{letters[0]}'")
-                    guess_result = handle_wordle_guess(letters[0].upper())
-                    print(f">>> {guess_result}")
-                    if not wordle_active:
-                        print("\n>>> Game ended. Say 'play word' to start a new game.")
+                print(">>> Please say a number between 1 and 100!")
+
+        # Check for game start commands
+        elif not (self.wordle_active or self.rps_active or self.number_game_active):
+            print("[DEBUG] Checking for game start commands")
+            if cmd.intent == "start_wordle":
+                self.wordle_active = True
+                self.rps_active = False
+                self.number_game_active = False
+                print("[DEBUG] Starting Wordle game.")
+                self.start_wordle_game()
+            elif cmd.intent == "start_rps":
+                self.wordle_active = False
+                self.rps_active = True
+                self.number_game_active = False
+                print("[DEBUG] Starting RPS game.")
+                self.start_rps_game()
+            elif cmd.intent == "start_number":
+                self.wordle_active = False
+                self.rps_active = False
+                self.number_game_active = True
+                print("[DEBUG] Starting Number game.")
+                self.start_number_game()
+        return False
+
+    # ── streaming speech → text → Arduino ──
+    def phrases(self, mode):
+        """Hints beyond the mode's own (the session config follows the game mode)"""
+        return campus_places if mode == "wordle" else ()
+
+    def stream_speech_to_text(self):
+        session_mode = self.current_mode()
+        session = {"open": True}
+        chunks = self.mic.chunks(lambda: self.streaming_active and session["open"])
+
+        # open the recognition stream only once speech starts; silence stays local
+        if not self.vad.wait_for_speech(chunks):
+            return
+        events = engines.stream(session_mode, self.vad.gate(chunks), self.vad, self.phrases(session_mode),
+                                engine=self.engine, headset=self)
+        try:
+            self._process_events(events, session_mode)
+        finally:
+            session["open"] = False
+
+    def _process_events(self, events, mode):
+        last = ""
+        last_time = time.time()
+        cooldown = 0.3
+
+        print(">>> Listening (Ctrl‑C to stop)")
+        for event in events:
+            txt = event.text
+            now = time.time()
+
+            print(f"[DEBUG] Transcript: '{txt}' | final={event.is_final}")  # Debug print
+
+            # throttle updates
+            if txt != last and (event.is_final or now - last_time > cooldown):
+                if self.handle_transcript(txt, event.is_final):
                     return
-                else:
-                    print(">>> Please say a single letter to guess!")
+
+                last = txt
+                last_time = now
+
+                # Restart recognition with the config for the new mode
+                if self.current_mode() != mode:
                     return
-            elif rps_active:
-                print("[DEBUG] Processing RPS game")
-                # Improved: pick the first move mentioned in the transcript
-                original_lower = txt.lower().strip()
-                move_found = False
-                move_order = []
-                for move in ["rock", "paper", "scissors", "scissor"]:
-                    idx = original_lower.find(move)
-                    if idx != -1:
-                        move_order.append((idx, move))
-                if move_order:
-                    move_order.sort()
-                    chosen_move = move_order[0][1]
-                    if chosen_move == "scissor":
-                        chosen_move = "scissors"
-                    print(f"[DEBUG] Recognized RPS move: {chosen_move}")
-                    move_result = handle_rps_move(chosen_move)
-                    print(f">>> {move_result}")
-                    move_found = True
-                if not move_found:
-                    print(f">>> Didn't recognize move in: '{txt}'. Please say 'rock', 'paper', or 'scissors'!")
-                    send_to_arduino("G:", f"SAY: ROCK PAPER SCISSORS | YOU:{rps_user_score} CPU:{rps_computer_score}")
-                return
-            elif number_game_active:
-                print("[DEBUG] Processing Number game")
-                # Try to get a number from the input
-                guess = None
-                
-                # First try direct digit
-                if clean.isdigit():
-                    guess = int(clean)
-                    print(f"[DEBUG] Found direct digit: {guess}")
-                # Then try to extract from text
-                else:
-                    # Look for numbers in the text
-                    numbers = re.findall(r'\d+', clean)
-                    if numbers:
-                        guess = int(numbers[0])
-                        print(f"[DEBUG] Found number in text: {guess}")
-                
-                if guess is not None and 1 <= guess <= 100:
-                    print(f"[DEBUG] Processing valid guess: {guess}")
-                    guess_result = handle_number_guess(guess)
-                    print(f">>> {guess_result}")
-                else:
-                    print(">>> Please say a number between 1 and 100!")
-
-            # Check for game start commands
-            elif not (wordle_active or rps_active or number_game_active):
-                print("[DEBUG] Checking for game start commands")
-                if re.search(r'\b(play|start)\s*(?:the\s*)?(?:word|wordle)\b', clean, re.IGNORECASE):
-                    wordle_active = True
-                    rps_active = False
-                    number_game_active = False
-                    print("[DEBUG] Starting Wordle game.")
-                    start_wordle_game()
-                elif re.search(r'\b(play|start)\s*(?:the\s*)?(?:rock|rps)\b', clean, re.IGNORECASE):
-                    wordle_active = False
-                    rps_active = True
-                    number_game_active = False
-                    print("[DEBUG] Starting RPS game.")
-                    start_rps_game()
-                elif re.search(r'\b(play|start)\s*(?:the\s*)?(?:number|numbers?)\b', clean, re.IGNORECASE):
-                    wordle_active = False
-                    rps_active = False
-                    number_game_active = True
-                    print("[DEBUG] Starting Number game.")
-                    start_number_game()
-
-            last = txt
-            last_time = now
 
 # ─── Main ─────────────────────────────────────────────────────────────────────
 def main():
+    startup.mark("imports")
+    startup.configure()
+    parser = startup.parser("Speech→Text→Translation→Arduino + Games")
+    parser.add_argument("--port", default=os.getenv("ARDUINO_PORT", ARDUINO_PORT),
+                        help="the display's serial port (default $ARDUINO_PORT)")
+    args = parser.parse_args()
+    target_language = startup.target_language(args.lang)
+    engine = engines.select(args.recognizer)
+    headset = Headset(target_language, port=args.port)
+    catalog.prepare(target_language, deepl_client)  # game screens, translated in the background
+    startup.mark("configuration")
+
     print("Speech→Text→Translation→Arduino + Games")
-    if not establish_connection():
+    # the Arduino's reset, the mic and the service connections all take a while; wait for them at once
+    ready = startup.warm_up({
+        "display": headset.establish_connection,
+        "mic": headset.mic.open,
+        "speech": engine.warm_up,
+        "deepl": lambda: startup.connect(deepl_client, "get_usage"),
+    })
+    if not ready["display"]:
         print("[WARN] Arduino not responding; continuing without display.")
     else:
         print("[OK] Arduino ready.")
-        send_to_arduino("LANG:", target_language)
-    print("Starting in 3 seconds…")
-    time.sleep(3)
-
+        headset.send_to_arduino("LANG:", target_language)
+    print(startup.report())
+
+    blackbox.start(headset.mic)
+    tracing.start()
+    metrics.serve()
+    profiler.watch("serial input buffer",
+                   lambda: headset.arduino.in_waiting if headset.arduino and headset.arduino.is_open else 0)
+    profiler.install()
     try:
         while True:
-            stream_speech_to_text()
+            headset.stream_speech_to_text()
     except KeyboardInterrupt:
         print("\n[INFO] Stopped by user.")
     finally:
-        global streaming_active
-        streaming_active = False
-        if arduino and arduino.is_open:
-            send_to_arduino("QUIT")
-            arduino.close()
+        headset.streaming_active = False
+        if headset.arduino and headset.arduino.is_open:
+            headset.send_to_arduino("QUIT")
+            headset.arduino.close()
+        blackbox.stop()
+        headset.mic.close()
+        print(recognition.report())
+        print(headset.vad.report())
+        print(headset.mic.report())
+        print(tracing.report())
+        tracing.stop()
         print("Done.")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
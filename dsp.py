@@ -0,0 +1,155 @@
+import os
+import sys
+import time
+from math import gcd
+import numpy as np
+
+# ─── Capture Conversion ───────────────────────────────────────────────────────
+# USB headsets often only offer 44.1/48 kHz stereo. The microphone is opened at
+# its native format and every device period is converted here: interleaved
+# int16 is downmixed to mono, resampled to 16 kHz by a rational polyphase FIR,
+# and optionally levelled by an AGC with a noise gate. Each step works on the
+# whole period at once in NumPy; filter state carries across periods so the
+# output is seamless.
+#
+#   AGC=1              enable automatic gain control
+#   NOISE_GATE_DB=-60  frames quieter than this are muted (AGC only)
+
+OUT_RATE = 16000
+AGC = os.getenv("AGC", "0") == "1"
+NOISE_GATE_DB = float(os.getenv("NOISE_GATE_DB", "-60"))
+
+
+def downmix(pcm, channels):
+    """Interleaved int16 bytes -> mono float32 in [-1, 1)"""
+    x = np.frombuffer(pcm, dtype=np.int16).astype(np.float32) / 32768.0
+    if channels > 1:
+        x = x[:len(x) - len(x) % channels].reshape(-1, channels).mean(axis=1)
+    return x
+
+
+def to_int16(x):
+    return (np.clip(x, -1.0, 32767 / 32768) * 32768.0).astype(np.int16).tobytes()
+
+
+class PolyphaseResampler:
+    """Streaming rational resampler (in_rate -> out_rate) using a Kaiser-windowed sinc"""
+
+    def __init__(self, in_rate, out_rate=OUT_RATE, taps_per_phase=32, beta=8.0, rolloff=0.85):
+        g = gcd(in_rate, out_rate)
+        self.up = out_rate // g
+        self.down = in_rate // g
+        self.taps = taps_per_phase
+        length = taps_per_phase * self.up
+        cutoff = rolloff * 0.5 / max(self.up, self.down)  # cycles per upsampled sample
+        n = np.arange(length) - (length - 1) / 2.0
+        h = 2 * cutoff * np.sinc(2 * cutoff * n) * np.kaiser(length, beta) * self.up
+        # phases[p, k] weights x[i - k] for an output whose upsampled position is i * up + p
+        self._phases = h.reshape(taps_per_phase, self.up).T.astype(np.float32)
+        self._offsets = np.arange(taps_per_phase)
+        self._history = np.zeros(taps_per_phase - 1, dtype=np.float32)
+        self._pos = (taps_per_phase - 1) * self.up  # next output, in upsampled units from buffer start
+
+    def process(self, x):
+        buf = np.concatenate((self._history, x))
+        end = len(buf) * self.up
+        count = max(0, -(-(end - self._pos) // self.down))
+        pos = self._pos + self.down * np.arange(count)
+        idx, phase = np.divmod(pos, self.up)
+        y = np.einsum("nk,nk->n", buf[idx[:, None] - self._offsets], self._phases[phase])
+        keep = self.taps - 1
+        self._pos += self.down * count - (len(buf) - keep) * self.up
+        self._history = buf[len(buf) - keep:]
+        return y
+
+
+class AutoGain:
+    """Frame-wise AGC towards target_db with a noise gate below gate_db"""
+
+    def __init__(self, rate=OUT_RATE, frame_ms=10, target_db=-20.0, max_gain_db=24.0,
+                 gate_db=NOISE_GATE_DB, attack=0.5, release=0.05):
+        self.frame_len = int(rate * frame_ms / 1000)
+        self.target_db = target_db
+        self.max_gain_db = max_gain_db
+        self.gate_db = gate_db
+        self.attack = attack    # smoothing when the gain has to drop (loud onset)
+        self.release = release  # smoothing when the gain may rise
+        self.gain_db = 0.0
+
+    def process(self, x):
+        n = len(x) // self.frame_len
+        if n == 0:
+            return x
+        frames = x[:n * self.frame_len].reshape(n, self.frame_len)
+        level_db = 10.0 * np.log10(np.mean(frames * frames, axis=1) + 1e-10)
+        wanted = np.clip(self.target_db - level_db, -self.max_gain_db, self.max_gain_db)
+        gains = np.empty(n, dtype=np.float32)
+        g = self.gain_db
+        for i, w in enumerate(wanted):  # a few frames per period; the smoothing is sequential
+            g += (self.attack if w < g else self.release) * (w - g)
+            gains[i] = g
+        self.gain_db = g
+        scale = np.where(level_db < self.gate_db, 0.0, 10.0 ** (gains / 20.0))
+        out = np.empty_like(x)
+        out[:n * self.frame_len] = (frames * scale[:, None].astype(np.float32)).ravel()
+        out[n * self.frame_len:] = x[n * self.frame_len:] * (scale[-1] if n else 1.0)
+        return out
+
+
+class CaptureConverter:
+    """Native device periods (int16, any rate/channels) -> 16 kHz mono int16 bytes"""
+
+    def __init__(self, in_rate, channels, out_rate=OUT_RATE, agc=AGC):
+        self.channels = channels
+        self.passthrough = in_rate == out_rate and channels == 1 and not agc
+        self.resampler = PolyphaseResampler(in_rate, out_rate) if in_rate != out_rate else None
+        self.agc = AutoGain(out_rate) if agc else None
+
+    def process(self, pcm):
+        if self.passthrough:
+            return pcm
+        x = downmix(pcm, self.channels)
+        if self.resampler:
+            x = self.resampler.process(x)
+        if self.agc:
+            x = self.agc.process(x)
+        return to_int16(x)
+
+
+# ─── Benchmark ────────────────────────────────────────────────────────────────
+# CPU per second of audio for common headset formats, fed in 20 ms periods
+# like the capture thread, plus a tone check that the filter passes speech
+# and rejects what would alias.
+
+def _tone_db(in_rate, freq, seconds=1.0):
+    t = np.arange(int(in_rate * seconds)) / in_rate
+    pcm = to_int16(0.5 * np.sin(2 * np.pi * freq * t))
+    y = PolyphaseResampler(in_rate).process(downmix(pcm, 1))[OUT_RATE // 10:]
+    return 20 * np.log10(np.sqrt(np.mean(y * y)) / (0.5 / np.sqrt(2)) + 1e-12)
+
+
+def benchmark(seconds=10.0):
+    rng = np.random.default_rng(0)
+    print("format               agc   cpu/s audio  realtime x")
+    for in_rate, channels in ((48000, 2), (44100, 2), (48000, 1), (16000, 1)):
+        for agc in (False, True):
+            period = in_rate // 50
+            pcm = to_int16(0.1 * rng.standard_normal(int(in_rate * seconds) * channels).astype(np.float32))
+            step = period * channels * 2
+            periods = [pcm[i:i + step] for i in range(0, len(pcm), step)]
+            conv = CaptureConverter(in_rate, channels, agc=agc)
+            start = time.process_time()
+            out = sum(len(conv.process(p)) for p in periods)
+            cpu = time.process_time() - start
+            assert abs(out // 2 - OUT_RATE * seconds) <= 1, out
+            print(f"{in_rate:>6} Hz x{channels}          {'on ' if agc else 'off'} "
+                  f"{cpu / seconds * 1000:>9.2f}ms {seconds / max(cpu, 1e-9):>10.0f}")
+    print()
+    for in_rate in (48000, 44100):
+        print(f"{in_rate} Hz: 1 kHz {_tone_db(in_rate, 1000):+.2f} dB, 3.4 kHz {_tone_db(in_rate, 3400):+.2f} dB, "
+              f"9 kHz {_tone_db(in_rate, 9000):+.1f} dB, "
+              f"10 kHz {_tone_db(in_rate, 10000):+.1f} dB, 15 kHz {_tone_db(in_rate, 15000):+.1f} dB")
+
+
+if __name__ == "__main__":
+    benchmark(float(sys.argv[1]) if len(sys.argv) > 1 else 10.0)
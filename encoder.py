@@ -0,0 +1,178 @@
+import io
+import os
+import sys
+import time
+import wave
+import queue
+import threading
+import numpy as np
+
+# ─── Compressed Upload ────────────────────────────────────────────────────────
+# Captured LINEAR16 chunks can be compressed on a worker thread before they
+# become StreamingRecognizeRequests. Each recognition session gets a fresh
+# encoder, so every stream starts with its own FLAC/Ogg header.
+#
+#   AUDIO_ENCODING=linear16  raw PCM, no worker thread (default)
+#   AUDIO_ENCODING=flac      lossless, needs `pip install pyflac`
+#   AUDIO_ENCODING=ogg_opus  lossy, needs `pip install pyogg` and libopus
+#
+# check() runs at start-up (startup.configure()): when the configured encoder
+# can't be built it falls back to linear16, and the recognition config, which
+# reads AUDIO_ENCODING, declares what is actually sent. An encoder that fails
+# mid-stream raises in the consumer instead of ending the upload silently.
+
+SAMPLE_RATE = 16000
+AUDIO_ENCODING = os.getenv("AUDIO_ENCODING", "linear16").lower()
+
+
+class FlacEncoder:
+    """Streaming FLAC encoder; compressed bytes are passed to write()"""
+
+    def __init__(self, write, rate=SAMPLE_RATE, compression_level=5):
+        import pyflac
+
+        self._encoder = pyflac.StreamEncoder(
+            write_callback=lambda buffer, num_bytes, num_samples, frame: write(bytes(buffer)),
+            sample_rate=rate,
+            compression_level=compression_level,
+            blocksize=1024,
+        )
+
+    def feed(self, chunk):
+        self._encoder.process(np.frombuffer(chunk, dtype=np.int16))
+
+    def finish(self):
+        self._encoder.finish()
+
+
+class OggOpusEncoder:
+    """Streaming Ogg/Opus encoder; completed Ogg pages are passed to write()"""
+
+    def __init__(self, write, rate=SAMPLE_RATE):
+        import pyogg
+
+        self._write = write
+        self._buffer = io.BytesIO()
+        opus = pyogg.OpusBufferedEncoder()
+        opus.set_application("voip")
+        opus.set_sampling_frequency(rate)
+        opus.set_channels(1)
+        opus.set_frame_size(20)  # ms
+        self._writer = pyogg.OggOpusWriter(self._buffer, opus)
+
+    def _drain(self):
+        data = self._buffer.getvalue()
+        if data:
+            self._buffer.seek(0)
+            self._buffer.truncate()
+            self._write(data)
+
+    def feed(self, chunk):
+        self._writer.write(memoryview(bytearray(chunk)))
+        self._drain()
+
+    def finish(self):
+        self._writer.close()
+        self._drain()
+
+
+ENCODERS = {
+    "flac": FlacEncoder,
+    "ogg_opus": OggOpusEncoder,
+}
+
+
+def check(encoding=None):
+    """The encoding to use: AUDIO_ENCODING, or linear16 if its encoder can't be built"""
+    global AUDIO_ENCODING
+    encoding = (encoding or AUDIO_ENCODING).lower()
+    if encoding != "linear16":
+        try:
+            ENCODERS[encoding](lambda data: None)
+        except Exception as e:
+            print(f"[WARN] {encoding} encoder unavailable ({e!r}); uploading linear16")
+            encoding = "linear16"
+    AUDIO_ENCODING = encoding
+    return encoding
+
+
+def encode(chunks, encoding=None, rate=SAMPLE_RATE, stats=None):
+    """Yield the audio payloads to upload for a stream of LINEAR16 chunks"""
+    encoding = (encoding or AUDIO_ENCODING).lower()
+    if encoding == "linear16":
+        yield from chunks
+        return
+
+    out = queue.Queue()
+    stats = stats if stats is not None else {}
+
+    def work():
+        cpu = time.process_time()
+        try:
+            encoder = ENCODERS[encoding](out.put, rate=rate)
+            for chunk in chunks:
+                stats["bytes_in"] = stats.get("bytes_in", 0) + len(chunk)
+                encoder.feed(chunk)
+            encoder.finish()
+        except Exception as e:
+            out.put(e)
+        finally:
+            # process_time covers every thread, so this is an upper bound
+            stats["cpu_seconds"] = stats.get("cpu_seconds", 0.0) + time.process_time() - cpu
+            out.put(None)
+
+    threading.Thread(target=work, daemon=True).start()
+    while True:
+        data = out.get()
+        if data is None:
+            return
+        if isinstance(data, Exception):
+            raise RuntimeError(f"{encoding} encoder failed") from data
+        stats["bytes_out"] = stats.get("bytes_out", 0) + len(data)
+        yield data
+
+
+# ─── Benchmark ────────────────────────────────────────────────────────────────
+# CPU cost vs bytes saved on a recorded 16 kHz mono WAV, and the resulting
+# upload latency per chunk on a few typical links.
+
+LINKS_KBPS = {"venue wifi": 2000, "phone hotspot": 500, "weak hotspot": 128}
+
+
+def benchmark(path, chunk_frames=1600):
+    with wave.open(path, "rb") as wav:
+        if wav.getframerate() != SAMPLE_RATE or wav.getnchannels() != 1 or wav.getsampwidth() != 2:
+            raise ValueError("benchmark expects a 16 kHz mono 16-bit WAV")
+        pcm = wav.readframes(wav.getnframes())
+    chunk_bytes = chunk_frames * 2
+    chunks = [pcm[i:i + chunk_bytes] for i in range(0, len(pcm), chunk_bytes)]
+    audio_secs = len(pcm) / 2 / SAMPLE_RATE
+    chunk_secs = chunk_frames / SAMPLE_RATE
+
+    print(f"{path}: {audio_secs:.1f}s of audio, {len(chunks)} chunks of {chunk_secs * 1000:.0f}ms")
+    print("encoding    bytes      ratio  cpu/s audio  " + "  ".join(f"{name:>14}" for name in LINKS_KBPS))
+    for encoding in ["linear16"] + list(ENCODERS):
+        stats = {}
+        try:
+            out = sum(len(data) for data in encode(iter(chunks), encoding, stats=stats))
+        except Exception as e:
+            print(f"{encoding:<10}  unavailable ({e})")
+            continue
+        if not out:
+            print(f"{encoding:<10}  unavailable (encoder produced no output)")
+            continue
+        cpu = stats.get("cpu_seconds", 0.0)
+        per_chunk_encode = cpu / len(chunks)
+        latencies = []
+        for kbps in LINKS_KBPS.values():
+            upload = out / len(chunks) * 8 / (kbps * 1000)
+            latencies.append(f"{(per_chunk_encode + upload) * 1000:>12.1f}ms")
+        print(f"{encoding:<10} {out:>8} {len(pcm) / out:>8.2f}x {cpu / audio_secs * 1000:>9.2f}ms  "
+              + "  ".join(latencies))
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        print("usage: python encoder.py <recording.wav>")
+        sys.exit(1)
+    benchmark(sys.argv[1])
@@ -0,0 +1,346 @@
+import os
+import abc
+import sys
+import json
+import time
+import wave
+import asyncio
+import threading
+import contextlib
+import blackbox
+import clients
+
+# ─── Recognizer Engines ───────────────────────────────────────────────────────
+# Every script gets its transcripts from one recognition session at a time:
+# PCM chunks in (16 kHz mono 16-bit, from the mic through the VAD), Events out.
+# An engine turns the chunks into what it consumes (requests()) and that into
+# normalized interim and final Events (results(), or aresults() on asyncio):
+#
+#   google     Google Speech streaming_recognize, with the mode's config
+#   local      Vosk on the CPU, with the model in RECOGNIZER_MODEL; offline, no
+#              upload. Command modes get a grammar of their phrase hints.
+#              Optional: `pip install -r requirements-local.txt`
+#   scripted   plays a JSON-lines file of results ({"at", "transcript",
+#              "is_final", "stability"}, or a black-box log) into whichever
+#              session is open at its "at" offset from the start of the run
+#
+# stream() runs a session the same way for each: a recognition.SessionTimer,
+# an utterance trace and black-box events for every result, so the latency
+# metrics and reports line up across engines.
+#
+#   RECOGNIZER=google                or --recognizer, per run
+#   RECOGNIZER_MODEL=models/vosk     the local engine's model directory
+#   RECOGNIZER_SCRIPT=results.jsonl  the scripted engine's results
+#
+#   python engines.py clip.wav --engines google,local --mode idle
+#
+# streams a recording through each engine at real-time pace and compares
+# first interim, first final and the transcripts.
+
+RECOGNIZER = os.getenv("RECOGNIZER", "google")
+RECOGNIZER_MODEL = os.getenv("RECOGNIZER_MODEL", os.path.join("models", "vosk"))
+RECOGNIZER_SCRIPT = os.getenv("RECOGNIZER_SCRIPT", "results.jsonl")
+
+_started = time.time()  # scripts import this module at start-up
+
+
+class Event:
+    """One recognizer result, whichever engine produced it"""
+    __slots__ = ("text", "is_final", "stability")
+
+    def __init__(self, text, is_final, stability=0.0):
+        self.text = text
+        self.is_final = is_final
+        self.stability = stability
+
+
+class Engine(abc.ABC):
+    """A recognizer: PCM chunks in, Events out"""
+    name = "engine"
+
+    def warm_up(self):
+        """Load whatever the first session would otherwise wait for"""
+        return self
+
+    def requests(self, chunks, timer):
+        """What results() consumes, made from PCM chunks (on the capture side)"""
+        return chunks
+
+    @abc.abstractmethod
+    def results(self, mode, requests, phrases=()):
+        """Events for one session's requests, with the mode's config and extra phrase hints"""
+
+    async def aresults(self, mode, requests, phrases=()):
+        """results() on a worker thread, for an async iterator of requests"""
+        loop = asyncio.get_running_loop()
+        events = asyncio.Queue()
+
+        def pull():
+            while True:
+                try:
+                    yield asyncio.run_coroutine_threadsafe(requests.__anext__(), loop).result()
+                except (StopAsyncIteration, RuntimeError):
+                    return
+
+        def run():
+            outcome = None
+            try:
+                for event in self.results(mode, pull(), phrases):
+                    loop.call_soon_threadsafe(events.put_nowait, event)
+            except Exception as e:
+                outcome = e
+            finally:
+                with contextlib.suppress(RuntimeError):  # the loop may be gone already
+                    loop.call_soon_threadsafe(events.put_nowait, outcome)
+
+        threading.Thread(target=run, name=f"recognizer-{self.name}", daemon=True).start()
+        while (event := await events.get()) is not None:
+            if isinstance(event, Exception):
+                raise event
+            yield event
+
+
+def _client(client):
+    """The client behind a clients.Lazy, or the client itself"""
+    return client.get() if isinstance(client, clients.Lazy) else client
+
+
+def _settings(mode):
+    import recognition
+
+    return recognition.MODE_CONFIGS.get(mode, recognition.MODE_CONFIGS["idle"])
+
+
+# ─── Google ───────────────────────────────────────────────────────────────────
+class Google(Engine):
+    """Google Speech, over one client (and gRPC channel) shared by every session"""
+    name = "google"
+
+    def __init__(self, client=None, async_client=None):
+        self.client = client or clients.Lazy(clients.speech_client)
+        self.async_client = async_client or clients.Lazy(clients.async_speech_client)
+
+    def warm_up(self):
+        _client(self.client)
+        return self
+
+    def requests(self, chunks, timer):
+        import encoder
+
+        return timer.requests(encoder.encode(chunks))
+
+    def results(self, mode, requests, phrases=()):
+        import recognition
+
+        config = recognition.build_streaming_config(mode, extra_phrases=phrases)
+        for response in _client(self.client).streaming_recognize(config, requests):
+            yield from self._events(response)
+
+    async def aresults(self, mode, requests, phrases=()):
+        import recognition
+
+        config = recognition.build_streaming_config(mode, extra_phrases=phrases)
+
+        async def with_config():
+            # the asyncio API takes the config as the first request
+            yield recognition.sdk().StreamingRecognizeRequest(streaming_config=config)
+            async for request in requests:
+                yield request
+
+        responses = await _client(self.async_client).streaming_recognize(requests=with_config())
+        async for response in responses:
+            for event in self._events(response):
+                yield event
+
+    @staticmethod
+    def _events(response):
+        if response.results:  # the first result is the one still changing
+            result = response.results[0]
+            yield Event(result.alternatives[0].transcript, result.is_final, result.stability)
+
+
+# ─── Local (Vosk) ─────────────────────────────────────────────────────────────
+class Local(Engine):
+    """Vosk (Kaldi) on the CPU: nothing leaves the machine, no network round trips"""
+    name = "local"
+
+    def __init__(self, model_dir=None):
+        self.model_dir = model_dir or RECOGNIZER_MODEL
+        self._model = None
+        self._lock = threading.Lock()
+
+    def warm_up(self):
+        with self._lock:
+            if self._model is None:
+                import vosk
+
+                if not os.path.isdir(self.model_dir):
+                    raise FileNotFoundError(f"no Vosk model in {self.model_dir!r} (set RECOGNIZER_MODEL)")
+                vosk.SetLogLevel(-1)
+                self._model = vosk.Model(self.model_dir)
+        return self
+
+    def _grammar(self, mode, phrases):
+        """The hints as a closed grammar for command modes; None for free speech"""
+        settings = _settings(mode)
+        words = list(settings["phrases"]) + list(phrases)
+        if settings["model"] != "command_and_search" or any(w.startswith("$") for w in words):
+            return None  # e.g. $OPERAND: numbers are any words
+        return json.dumps([w.lower() for w in words] + ["[unk]"])
+
+    def results(self, mode, requests, phrases=()):
+        import vosk
+        import recognition
+
+        self.warm_up()
+        grammar = self._grammar(mode, phrases)
+        args = (grammar,) if grammar else ()
+        recognizer = vosk.KaldiRecognizer(self._model, recognition.SAMPLE_RATE, *args)
+        single = _settings(mode)["single_utterance"]
+        partial = ""
+        for chunk in requests:
+            if recognizer.AcceptWaveform(chunk):
+                text = json.loads(recognizer.Result()).get("text", "")
+                partial = ""
+                if text:
+                    yield Event(text, True, 1.0)
+                    if single:
+                        return
+            else:
+                text = json.loads(recognizer.PartialResult()).get("partial", "")
+                if text and text != partial:
+                    partial = text
+                    yield Event(text, False, 0.0)
+        text = json.loads(recognizer.FinalResult()).get("text", "")
+        if text:
+            yield Event(text, True, 1.0)
+
+
+# ─── Scripted ─────────────────────────────────────────────────────────────────
+class Scripted(Engine):
+    """Results from a file, released as the open session pulls audio past their time"""
+    name = "scripted"
+
+    def __init__(self, script=None):
+        self.script = script or RECOGNIZER_SCRIPT
+        self.start = _started
+        self.missed = 0
+        self._results = None
+        self.next = None
+
+    def warm_up(self):
+        if self._results is None:
+            if isinstance(self.script, str):
+                import replay
+
+                self._results = iter(replay.load_responses(self.script))
+            else:
+                self._results = iter(self.script)
+            self.next = next(self._results, None)
+        return self
+
+    def results(self, mode, requests, phrases=()):
+        self.warm_up()
+        # results whose moment passed while no session was open are never produced
+        while self.next is not None and self.next["at"] < time.time() - self.start:
+            self.missed += 1
+            self.next = next(self._results, None)
+        single = _settings(mode)["single_utterance"]
+        for _ in requests:
+            while self.next is not None and time.time() - self.start >= self.next["at"]:
+                r, self.next = self.next, next(self._results, None)
+                event = Event(r["transcript"], bool(r.get("is_final")), r.get("stability", 0.0))
+                yield event
+                if event.is_final and single:
+                    return
+
+
+# ─── Selection ────────────────────────────────────────────────────────────────
+ENGINES = {"google": Google, "local": Local, "scripted": Scripted}
+
+_engines = {}  # name -> the run's shared engine
+_lock = threading.Lock()
+
+
+def select(name):
+    """Make name ($RECOGNIZER by default) the run's engine; returns it"""
+    global RECOGNIZER
+    if name:
+        if name.lower() not in ENGINES:
+            raise ValueError(f"unknown recognizer {name!r} (one of {', '.join(ENGINES)})")
+        RECOGNIZER = name.lower()
+    return get()
+
+
+def get(name=None):
+    """The shared engine of that kind, the run's by default"""
+    name = (name or RECOGNIZER).lower()
+    with _lock:
+        if name not in _engines:
+            _engines[name] = ENGINES[name]()
+        return _engines[name]
+
+
+def observe(timer, event):
+    """The metrics, trace and black-box event for one result, the same for every engine"""
+    timer.on_result(event.is_final)
+    blackbox.record("result", mode=timer.mode, transcript=event.text, is_final=event.is_final,
+                    stability=event.stability)
+
+
+def stream(mode, chunks, vad=None, phrases=(), engine=None, headset=None):
+    """One recognition session over PCM chunks: the engine's Events, timed and traced"""
+    import recognition
+
+    engine = engine or get()
+    timer = recognition.SessionTimer(mode, engine.name, headset)
+    for event in engine.results(mode, engine.requests(timer.trace.audio(chunks, vad), timer), phrases):
+        observe(timer, event)
+        yield event
+
+
+# ─── Engine Comparison ────────────────────────────────────────────────────────
+def _chunks(path, chunk_frames):
+    """A 16 kHz mono 16-bit WAV file at real-time pace"""
+    with wave.open(path, "rb") as wav:
+        while data := wav.readframes(chunk_frames):
+            yield data
+            time.sleep(chunk_frames / wav.getframerate())
+
+
+def compare(path, names, mode="idle", chunk_ms=100):
+    import recognition
+
+    print(f"{path}, mode {mode}")
+    print("engine      first interim  first final  results  transcript")
+    for name in names:
+        engine = get(name).warm_up()
+        start, first_interim, first_final, count, transcript = time.time(), None, None, 0, ""
+        for event in stream(mode, _chunks(path, recognition.SAMPLE_RATE * chunk_ms // 1000), engine=engine):
+            count += 1
+            first_interim = first_interim or time.time() - start
+            if event.is_final:
+                first_final = first_final or time.time() - start
+                transcript = f"{transcript} {event.text}".strip()
+
+        def ms(v):
+            return f"{v * 1000:.0f}ms" if v is not None else "none"
+
+        print(f"{name:<10} {ms(first_interim):>14} {ms(first_final):>12} {count:>8}  {transcript!r}")
+    print(recognition.report())
+
+
+if __name__ == "__main__":
+    import argparse
+    import startup
+
+    startup.configure()
+    parser = argparse.ArgumentParser(description="Compare recognizer engines on a recording")
+    parser.add_argument("wav", help="16 kHz mono 16-bit WAV")
+    parser.add_argument("--engines", default="google,local", help="comma-separated: " + ", ".join(ENGINES))
+    parser.add_argument("--mode", default="idle", help="recognition mode (config, hints, grammar)")
+    args = parser.parse_args()
+    try:
+        compare(args.wav, [n.strip() for n in args.engines.split(",") if n.strip()], args.mode)
+    except KeyboardInterrupt:
+        sys.exit(1)
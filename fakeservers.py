@@ -0,0 +1,282 @@
+import json
+import time
+import random
+import argparse
+import threading
+from concurrent import futures
+from urllib.parse import parse_qs, urlparse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# ─── Local Stand-in Services ──────────────────────────────────────────────────
+# Fake Google Speech (gRPC StreamingRecognize), DeepL (/v2/translate) and
+# OpenAI (/v1/chat/completions) that speak the real wire formats, so the
+# unmodified SDKs can be load-tested against slow or flaky backends. Point
+# the scripts at them through clients.py:
+#
+#   python fakeservers.py --speech-latency lognormal:300,0.5 --error-rate 0.05
+#   SPEECH_ENDPOINT=localhost:50051 SPEECH_INSECURE=1 \
+#   DEEPL_SERVER_URL=http://localhost:8080 OPENAI_BASE_URL=http://localhost:8080/v1 python display.py
+#
+# Latency specs are in milliseconds: fixed:200, uniform:100,400,
+# normal:200,50 or lognormal:200,0.5 (median, sigma).
+#
+# The speech stand-in emits results by seconds of audio received: from a
+# --script file (JSON lines as used by replay.py, "at" relative to the stream
+# start) or, by default, one generated sentence every --utterance-seconds with
+# word-by-word interims. It honours interim_results and single_utterance and
+# ends streams that run past --stream-limit like the real API.
+
+SENTENCES = [
+    "hello there how are you",
+    "play number",
+    "fifty",
+    "hey sentient what time is it",
+    "stop",
+]
+
+
+class Latency:
+    """Random delay drawn from a spec like lognormal:200,0.5 (milliseconds)"""
+
+    def __init__(self, spec="fixed:0", seed=None):
+        self.spec = spec
+        kind, _, args = spec.partition(":")
+        self.kind = kind
+        self.args = [float(a) for a in args.split(",") if a]
+        if kind not in ("fixed", "uniform", "normal", "lognormal"):
+            raise ValueError(f"unknown latency distribution {kind!r}")
+        self._rng = random.Random(seed)
+
+    def sample(self):
+        a = self.args
+        if self.kind == "fixed":
+            ms = a[0] if a else 0.0
+        elif self.kind == "uniform":
+            ms = self._rng.uniform(a[0], a[1])
+        elif self.kind == "normal":
+            ms = self._rng.gauss(a[0], a[1])
+        else:
+            ms = a[0] * self._rng.lognormvariate(0.0, a[1])
+        return max(0.0, ms) / 1000.0
+
+    def wait(self):
+        time.sleep(self.sample())
+
+
+class Settings:
+    """Per-service behaviour shared by the handlers"""
+
+    def __init__(self, latency="fixed:0", error_rate=0.0, seed=None):
+        self.latency = Latency(latency, seed)
+        self.error_rate = error_rate
+        self._rng = random.Random(seed)
+        self.calls = 0
+        self.errors = 0
+
+    def should_fail(self):
+        self.calls += 1
+        if self._rng.random() < self.error_rate:
+            self.errors += 1
+            return True
+        return False
+
+
+# ─── Google Speech ────────────────────────────────────────────────────────────
+def _generated_script(utterance_seconds=3.0, word_seconds=0.25):
+    at = 0.5
+    while True:
+        for sentence in SENTENCES:
+            words = sentence.split()
+            for n in range(1, len(words)):
+                yield {"at": at + n * word_seconds, "transcript": " ".join(words[:n]),
+                       "is_final": False, "stability": 0.5}
+            yield {"at": at + len(words) * word_seconds + 0.3, "transcript": sentence, "is_final": True}
+            at += utterance_seconds
+
+
+class FakeSpeechServicer:
+    def __init__(self, settings, script=None, utterance_seconds=3.0, stream_limit=305.0):
+        self.settings = settings
+        self.script = script
+        self.utterance_seconds = utterance_seconds
+        self.stream_limit = stream_limit
+
+    def streaming_recognize(self, request_iterator, context):
+        import grpc
+        from google.cloud import speech
+
+        if self.settings.should_fail():
+            context.abort(grpc.StatusCode.UNAVAILABLE, "injected failure")
+        first = next(request_iterator)
+        streaming = first.streaming_config
+        rate = streaming.config.sample_rate_hertz or 16000
+        linear = streaming.config.encoding == speech.RecognitionConfig.AudioEncoding.LINEAR16
+        script = iter(self.script) if self.script is not None else _generated_script(self.utterance_seconds)
+        pending = next(script, None)
+        received = 0
+        start = time.time()
+        for request in request_iterator:
+            received += len(request.audio_content)
+            # compressed audio has no fixed byte rate, so fall back to wall time
+            audio_time = received / (2 * rate) if linear else time.time() - start
+            if audio_time > self.stream_limit:
+                context.abort(grpc.StatusCode.OUT_OF_RANGE,
+                              f"Exceeded maximum allowed stream duration of {self.stream_limit:g} seconds.")
+            while pending is not None and pending["at"] <= audio_time:
+                final = bool(pending.get("is_final"))
+                if final or streaming.interim_results:
+                    self.settings.latency.wait()
+                    result = speech.StreamingRecognitionResult(
+                        alternatives=[speech.SpeechRecognitionAlternative(transcript=pending["transcript"],
+                                                                          confidence=0.9 if final else 0.0)],
+                        is_final=final, stability=pending.get("stability", 0.0))
+                    yield speech.StreamingRecognizeResponse(results=[result])
+                    if final and streaming.single_utterance:
+                        yield speech.StreamingRecognizeResponse(
+                            speech_event_type=speech.StreamingRecognizeResponse.SpeechEventType.END_OF_SINGLE_UTTERANCE)
+                        return
+                pending = next(script, None)
+
+
+def serve_speech(port, settings, script=None, utterance_seconds=3.0, stream_limit=305.0, workers=16):
+    import grpc
+    from google.cloud import speech
+
+    servicer = FakeSpeechServicer(settings, script, utterance_seconds, stream_limit)
+    handler = grpc.method_handlers_generic_handler("google.cloud.speech.v1.Speech", {
+        "StreamingRecognize": grpc.stream_stream_rpc_method_handler(
+            servicer.streaming_recognize,
+            request_deserializer=speech.StreamingRecognizeRequest.deserialize,
+            response_serializer=speech.StreamingRecognizeResponse.serialize),
+    })
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=workers))
+    server.add_generic_rpc_handlers((handler,))
+    server.add_insecure_port(f"[::]:{port}")
+    server.start()
+    return server
+
+
+# ─── DeepL and OpenAI ─────────────────────────────────────────────────────────
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, fmt, *args):
+        pass
+
+    def _json(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0) or 0))
+        path = urlparse(self.path).path
+        if path.endswith("/v2/translate"):
+            self._deepl(body)
+        elif path.endswith("/chat/completions"):
+            self._openai(body)
+        else:
+            self._json(404, {"message": f"no stub for {path}"})
+
+    def _deepl(self, body):
+        settings = self.server.deepl
+        settings.latency.wait()
+        if settings.should_fail():
+            return self._json(503, {"message": "injected failure"})
+        if self.headers.get("Content-Type", "").startswith("application/json"):
+            params = json.loads(body or b"{}")
+            texts = params.get("text", [])
+            target = params.get("target_lang", "EN")
+        else:
+            params = parse_qs(body.decode())
+            texts = params.get("text", [])
+            target = params.get("target_lang", ["EN"])[0]
+        texts = [texts] if isinstance(texts, str) else texts
+        self._json(200, {"translations": [{"detected_source_language": "EN", "text": f"<{target}> {t}"}
+                                          for t in texts]})
+
+    def _openai(self, body):
+        settings = self.server.openai
+        settings.latency.wait()
+        if settings.should_fail():
+            return self._json(500, {"error": {"message": "injected failure", "type": "server_error"}})
+        params = json.loads(body or b"{}")
+        messages = params.get("messages") or [{"content": ""}]
+        answer = f"(answer to: {messages[-1].get('content', '')})"
+        model = params.get("model", "gpt-4o-mini")
+        created = int(time.time())
+        if not params.get("stream"):
+            return self._json(200, {
+                "id": f"chatcmpl-local-{created}", "object": "chat.completion", "created": created, "model": model,
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": answer},
+                             "finish_reason": "stop"}],
+                "usage": {"prompt_tokens": 0, "completion_tokens": len(answer.split()), "total_tokens": 0},
+            })
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+        words = answer.split(" ")
+        for i, word in enumerate(words):
+            delta = {"role": "assistant", "content": word} if i == 0 else {"content": " " + word}
+            chunk = {"id": f"chatcmpl-local-{created}", "object": "chat.completion.chunk", "created": created,
+                     "model": model, "choices": [{"index": 0, "delta": delta, "finish_reason": None}]}
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+            self.wfile.flush()
+            time.sleep(self.server.token_seconds)
+        done = {"id": f"chatcmpl-local-{created}", "object": "chat.completion.chunk", "created": created,
+                "model": model, "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]}
+        self.wfile.write(f"data: {json.dumps(done)}\n\ndata: [DONE]\n\n".encode())
+
+
+def serve_http(port, deepl_settings, openai_settings, token_ms=30.0):
+    server = ThreadingHTTPServer(("", port), _StubHandler)
+    server.daemon_threads = True
+    server.deepl = deepl_settings
+    server.openai = openai_settings
+    server.token_seconds = token_ms / 1000.0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local stand-ins for Google Speech, DeepL and OpenAI")
+    parser.add_argument("--speech-port", type=int, default=50051)
+    parser.add_argument("--http-port", type=int, default=8080)
+    parser.add_argument("--speech-latency", default="fixed:0", help="delay before each result, e.g. lognormal:300,0.5")
+    parser.add_argument("--deepl-latency", default="fixed:0")
+    parser.add_argument("--openai-latency", default="fixed:0")
+    parser.add_argument("--token-ms", type=float, default=30.0, help="delay between streamed completion chunks")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of calls failed, all services")
+    parser.add_argument("--script", help="JSON lines of results to emit (replay.py format)")
+    parser.add_argument("--utterance-seconds", type=float, default=3.0)
+    parser.add_argument("--stream-limit", type=float, default=305.0)
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    script = None
+    if args.script:
+        from replay import load_responses
+        script = load_responses(args.script)
+    speech_settings = Settings(args.speech_latency, args.error_rate, args.seed)
+    deepl_settings = Settings(args.deepl_latency, args.error_rate, args.seed)
+    openai_settings = Settings(args.openai_latency, args.error_rate, args.seed)
+    grpc_server = serve_speech(args.speech_port, speech_settings, script, args.utterance_seconds, args.stream_limit)
+    http_server = serve_http(args.http_port, deepl_settings, openai_settings, args.token_ms)
+    print("Stand-ins running; point the scripts at them with:")
+    print(f"  export SPEECH_ENDPOINT=localhost:{args.speech_port} SPEECH_INSECURE=1")
+    print(f"  export DEEPL_SERVER_URL=http://localhost:{args.http_port}")
+    print(f"  export OPENAI_BASE_URL=http://localhost:{args.http_port}/v1")
+    try:
+        while True:
+            time.sleep(10)
+            print(f"[FAKE] speech {speech_settings.calls} streams ({speech_settings.errors} failed), "
+                  f"deepl {deepl_settings.calls} ({deepl_settings.errors}), "
+                  f"openai {openai_settings.calls} ({openai_settings.errors})")
+    except KeyboardInterrupt:
+        grpc_server.stop(0)
+        http_server.shutdown()
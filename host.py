@@ -0,0 +1,199 @@
+import os
+import sys
+import json
+import time
+import argparse
+import threading
+
+# ─── Multi-headset Host ───────────────────────────────────────────────────────
+# Drives several pairs of glasses from one process. Each headset is a
+# display.Headset with its own mic, VAD, serial link, language and game
+# state, run on its own thread; the DeepL client, the recognizer engine (for
+# Google, one gRPC channel and its thread pool) and the phonetic caches are
+# shared.
+#
+#   python host.py headsets.json
+#
+# headsets.json lists one object per pair of glasses:
+#
+#   [{"name": "booth-1", "mic": 2, "port": "/dev/tty.HC-05-1", "lang": "ES"},
+#    {"name": "booth-2", "mic": 3, "port": "/dev/tty.HC-05-2", "lang": "FR"}]
+#
+# "mic" is a PyAudio input device index (default: the default input device),
+# "port" the display's serial port (default: ARDUINO_PORT), "recognizer" an
+# engines.py engine (default: RECOGNIZER). A pipeline that
+# raises is restarted after a back-off of up to HOST_RESTART_MAX seconds.
+#
+#   python host.py --bench 8
+#
+# measures the CPU and memory each added headset costs, running the real
+# pipelines against replay.py's fakes and soak.py's synthetic speech in real
+# time.
+
+HOST_RESTART_MAX = float(os.getenv("HOST_RESTART_MAX", "30"))
+
+
+def _log(text):
+    print(f"[HOST] {text}", file=sys.stderr, flush=True)
+
+
+class Supervisor:
+    """Runs each headset's pipeline on its own thread, restarting it when it fails"""
+
+    def __init__(self):
+        self.headsets = []
+        self.restarts = {}
+        self._threads = []
+
+    def add(self, headset):
+        thread = threading.Thread(target=self._run, args=(headset,), name=f"headset-{headset.name}", daemon=True)
+        self.headsets.append(headset)
+        self.restarts[headset.name] = 0
+        self._threads.append(thread)
+        thread.start()
+
+    def _run(self, headset):
+        if headset.establish_connection():
+            headset.send_to_arduino("LANG:", headset.target_language)
+        else:
+            _log(f"{headset.name}: display on {headset.port} not responding; continuing without it")
+        backoff = 1.0
+        while headset.streaming_active:
+            try:
+                headset.stream_speech_to_text()
+                backoff = 1.0
+            except Exception as e:
+                self.restarts[headset.name] += 1
+                _log(f"{headset.name}: pipeline failed ({e!r}); restarting in {backoff:g}s")
+                time.sleep(backoff)
+                backoff = min(backoff * 2, HOST_RESTART_MAX)
+
+    def stop(self):
+        for headset in self.headsets:
+            headset.streaming_active = False
+        for thread in self._threads:
+            thread.join(timeout=5.0)
+        for headset in self.headsets:
+            if headset.arduino and headset.arduino.is_open:
+                headset.send_to_arduino("QUIT")
+                headset.arduino.close()
+            headset.mic.close()
+
+    def report(self):
+        lines = []
+        for headset in self.headsets:
+            lines.append(f"{headset.name}: {self.restarts[headset.name]} restarts, mode {headset.current_mode()}")
+            lines.append(f"  {headset.vad.report()}")
+        return "\n".join(lines)
+
+
+def load_config(path):
+    with open(path) as f:
+        entries = json.load(f)
+    names = [entry.get("name", f"headset-{i + 1}") for i, entry in enumerate(entries)]
+    if len(set(names)) != len(names):
+        raise ValueError(f"{path}: headset names must be unique")
+    return [{**entry, "name": name} for entry, name in zip(entries, names)]
+
+
+def run(config_path):
+    import audio
+    import catalog
+    import display
+    import engines
+    import metrics
+    import profiler
+    import recognition
+    import startup
+    import tracing
+
+    startup.configure()
+    supervisor = Supervisor()
+    for entry in load_config(config_path):
+        headset = display.Headset(entry.get("lang", "ES").upper(), name=entry["name"],
+                                  mic=audio.Microphone(device=entry.get("mic")),
+                                  port=entry.get("port", display.ARDUINO_PORT),
+                                  engine=engines.get(entry.get("recognizer")), console=False)
+        catalog.prepare(headset.target_language, display.deepl_client)
+        supervisor.add(headset)
+        _log(f"{headset.name}: mic {entry.get('mic', 'default')}, display {headset.port}, "
+             f"{headset.target_language}")
+
+    tracing.start()
+    metrics.serve()
+    for headset in supervisor.headsets:
+        profiler.watch(f"{headset.name} serial input buffer",
+                       lambda h=headset: h.arduino.in_waiting if h.arduino and h.arduino.is_open else 0)
+    profiler.install()
+    try:
+        while True:
+            time.sleep(1.0)
+    except KeyboardInterrupt:
+        _log("stopping")
+    finally:
+        supervisor.stop()
+        print(supervisor.report())
+        print(recognition.report())
+        print(tracing.report())
+        tracing.stop()
+
+
+# ─── Per-headset Cost ─────────────────────────────────────────────────────────
+def _cpu_seconds():
+    t = os.times()
+    return t.user + t.system
+
+
+def bench(count=8, step_seconds=20.0, warmup=5.0, seed=0):
+    """Add headsets one at a time; returns [(headsets, cpu % of a core, rss MB, threads)]"""
+    import replay
+    import soak
+
+    clock = replay.WallClock()
+    report = replay.Report(clock, keep=200)
+    rows = []
+
+    def measure(n):
+        cpu, wall = _cpu_seconds(), time.perf_counter()
+        time.sleep(step_seconds)
+        cpu = (_cpu_seconds() - cpu) / (time.perf_counter() - wall) * 100.0
+        rows.append((n, cpu, soak.rss_mb(), threading.active_count()))
+        previous = rows[-2] if n else rows[-1]
+        _log(f"{n} headsets: cpu {cpu:5.1f}% of a core, rss {rows[-1][2]:6.1f} MB, {rows[-1][3]} threads "
+             f"({cpu - previous[1]:+.1f}% and {rows[-1][2] - previous[2]:+.1f} MB for this one)")
+
+    with replay.offline(report, deepl_latency=0.15, llm_latency=0.8):
+        display = replay.load_script(os.path.join(os.path.dirname(os.path.abspath(__file__)), "display.py"))
+        import engines  # the one display.py got, on the fakes
+        supervisor = Supervisor()
+        measure(0)
+        for n in range(1, count + 1):
+            transcripts = soak.SyntheticTranscripts(seed + n, start=clock.elapsed + 1.0)
+            recognizer = replay._Recognizer(transcripts.responses(), report)
+            mic = soak.SyntheticMicrophone(transcripts, clock, duration=float("inf"))
+            engine = engines.Google(replay._fake_speech(recognizer).SpeechClient())
+            supervisor.add(display.Headset("ES", name=f"bench-{n}", mic=mic, console=False, engine=engine))
+            time.sleep(warmup)
+            measure(n)
+        supervisor.stop()
+    if count > 1:
+        # the first headset also pays for one-time imports and warm caches
+        _log(f"each headset after the first: {(rows[-1][1] - rows[1][1]) / (count - 1):.2f}% of a core and "
+             f"{(rows[-1][2] - rows[1][2]) / (count - 1):.2f} MB")
+    _log(f"{report.counts.get('result', 0)} results, {report.counts.get('translation', 0)} translations, "
+         f"{report.counts.get('serial', 0)} serial frames across {count} headsets")
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Drive several pairs of glasses from one process")
+    parser.add_argument("config", nargs="?", help="JSON list of headsets (name, mic, port, lang)")
+    parser.add_argument("--bench", type=int, metavar="N", help="measure CPU and memory for 1..N headsets")
+    parser.add_argument("--step-seconds", type=float, default=20.0, help="measuring time per bench step")
+    args = parser.parse_args()
+    if args.bench:
+        bench(args.bench, args.step_seconds)
+    elif args.config:
+        run(args.config)
+    else:
+        parser.error("give a headsets.json or --bench N")
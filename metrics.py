@@ -0,0 +1,240 @@
+import os
+import time
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# ─── Metrics Endpoint ─────────────────────────────────────────────────────────
+# Counters, gauges and latency histograms in the Prometheus text format on
+# http://METRICS_ADDR:METRICS_PORT/metrics, served from its own thread, so a
+# dashboard can scrape every demo station:
+#
+#   METRICS_PORT=9108       0 disables the endpoint
+#   METRICS_ADDR=127.0.0.1  0.0.0.0 to let a fleet scraper in
+#
+# Updates never take a lock: each thread adds into its own shard, and only a
+# scrape walks the shards (folding in those of threads that have exited).
+# Values read from elsewhere (ring overruns, backlog) are registered as
+# callbacks and evaluated at scrape time.
+
+METRICS_PORT = int(os.getenv("METRICS_PORT", "9108"))
+METRICS_ADDR = os.getenv("METRICS_ADDR", "127.0.0.1")
+
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+METRICS = {
+    "speech_sessions_total": ("counter", "Recognition streams opened, by engine and mode"),
+    "speech_mode_switches_total": ("counter", "Recognition streams opened with a different mode config"),
+    "speech_responses_total": ("counter", "Recognizer results, by engine, mode and kind (interim or final)"),
+    "deepl_requests_total": ("counter", "DeepL translate calls, by status"),
+    "deepl_characters_total": ("counter", "Characters sent to DeepL"),
+    "deepl_request_seconds": ("histogram", "DeepL translate call latency"),
+    "openai_requests_total": ("counter", "OpenAI chat completion calls, by status"),
+    "openai_tokens_total": ("counter", "OpenAI tokens, by kind (prompt or completion)"),
+    "openai_request_seconds": ("histogram", "OpenAI chat completion latency"),
+    "serial_bytes_total": ("counter", "Bytes on the Arduino serial link, by direction"),
+    "serial_retries_total": ("counter", "Serial sends repeated after a missing ACK"),
+    "serial_ack_timeouts_total": ("counter", "Serial sends that waited out the ACK timeout"),
+    "audio_overruns_total": ("counter", "Times the recognizer's mic cursor fell a whole ring behind"),
+    "audio_backlog_seconds": ("gauge", "Captured audio not yet read by the recognizer"),
+    "game_events_total": ("counter", "Game events, by game and event"),
+    "pipeline_dropped_total": ("counter", "Stale items dropped from a full pipeline queue, by queue"),
+    "pipeline_blocked_total": ("counter", "Pipeline puts that waited on a full queue, by queue"),
+    "process_uptime_seconds": ("gauge", "Seconds since the metrics module was loaded"),
+}
+
+_started = time.time()
+_local = threading.local()
+_shards = []            # (thread, counters, histograms)
+_retired = ({}, {})     # folded shards of finished threads
+_shards_lock = threading.Lock()
+_gauges = {}
+_callbacks = {"process_uptime_seconds": lambda: time.time() - _started}
+
+
+def _shard():
+    try:
+        return _local.shard
+    except AttributeError:
+        shard = _local.shard = ({}, {})
+        with _shards_lock:
+            _shards.append((threading.current_thread(), *shard))
+        return shard
+
+
+def _key(name, labels):
+    return (name, tuple(sorted(labels.items()))) if labels else (name, ())
+
+
+# ─── Updates ──────────────────────────────────────────────────────────────────
+def inc(name, n=1, **labels):
+    counters = _shard()[0]
+    key = _key(name, labels)
+    counters[key] = counters.get(key, 0) + n
+
+
+def set_gauge(name, value, **labels):
+    _gauges[_key(name, labels)] = value
+
+
+def observe(name, seconds, **labels):
+    histograms = _shard()[1]
+    key = _key(name, labels)
+    h = histograms.get(key)
+    if h is None:
+        h = histograms[key] = [0] * (len(LATENCY_BUCKETS) + 2)  # buckets..., count, sum
+    for i, bound in enumerate(LATENCY_BUCKETS):
+        if seconds <= bound:
+            h[i] += 1
+    h[-2] += 1
+    h[-1] += seconds
+
+
+def register(name, fn):
+    """Read fn() at scrape time as the value of name"""
+    _callbacks[name] = fn
+
+
+class timed:
+    """Context manager observing its duration into a histogram"""
+
+    def __init__(self, name, **labels):
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        observe(self.name, time.perf_counter() - self.start, **self.labels)
+        return False
+
+
+# ─── Exposition ───────────────────────────────────────────────────────────────
+def _merge(into, counters, histograms):
+    for key, value in counters.items():
+        into[0][key] = into[0].get(key, 0) + value
+    for key, h in histograms.items():
+        total = into[1].get(key)
+        into[1][key] = list(h) if total is None else [a + b for a, b in zip(total, h)]
+
+
+def collect():
+    """(counters, histograms) summed across threads"""
+    totals = ({}, {})
+    with _shards_lock:
+        for entry in list(_shards):
+            thread, counters, histograms = entry
+            # copies are single C calls, so they are consistent against the owner's writes
+            counters, histograms = counters.copy(), {k: list(v) for k, v in histograms.copy().items()}
+            if not thread.is_alive():
+                _shards.remove(entry)
+                _merge(_retired, counters, histograms)
+            else:
+                _merge(totals, counters, histograms)
+        _merge(totals, *_retired)
+    return totals
+
+
+def _labels(pairs, extra=()):
+    pairs = tuple(pairs) + tuple(extra)
+    if not pairs:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, v in pairs)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + "}"
+
+
+def _fmt(value):
+    value = float(value)
+    return str(int(value)) if value.is_integer() else repr(value)
+
+
+def exposition():
+    counters, histograms = collect()
+    samples = {}
+    for (name, labels), value in counters.items():
+        samples.setdefault(name, []).append(f"{name}{_labels(labels)} {_fmt(value)}")
+    for (name, labels), value in list(_gauges.items()):
+        samples.setdefault(name, []).append(f"{name}{_labels(labels)} {_fmt(value)}")
+    for name, fn in list(_callbacks.items()):
+        try:
+            samples.setdefault(name, []).append(f"{name} {_fmt(fn())}")
+        except Exception:
+            pass
+    for (name, labels), h in histograms.items():
+        lines = samples.setdefault(name, [])
+        for bound, count in zip(LATENCY_BUCKETS, h):
+            lines.append(f"{name}_bucket{_labels(labels, [('le', f'{bound:g}')])} {count}")
+        lines.append(f"{name}_bucket{_labels(labels, [('le', '+Inf')])} {h[-2]}")
+        lines.append(f"{name}_count{_labels(labels)} {h[-2]}")
+        lines.append(f"{name}_sum{_labels(labels)} {_fmt(h[-1])}")
+
+    out = []
+    for name in sorted(samples):
+        kind, text = METRICS.get(name, ("untyped", name))
+        out += [f"# HELP {name} {text}", f"# TYPE {name} {kind}"] + samples[name]
+    return "\n".join(out) + "\n"
+
+
+# ─── Server ───────────────────────────────────────────────────────────────────
+class _Handler(BaseHTTPRequestHandler):
+    def log_message(self, fmt, *args):
+        pass
+
+    def do_GET(self):
+        if self.path.split("?")[0] not in ("/", "/metrics"):
+            self.send_error(404)
+            return
+        body = exposition().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+_server = None
+
+
+def serve(port=METRICS_PORT, addr=METRICS_ADDR):
+    """Start the endpoint on a daemon thread (once); returns the server or None"""
+    global _server
+    if _server is not None or not port:
+        return _server
+    try:
+        _server = ThreadingHTTPServer((addr, port), _Handler)
+    except OSError as e:
+        print(f"[METRICS] could not listen on {addr}:{port}: {e}")
+        return None
+    _server.daemon_threads = True
+    threading.Thread(target=_server.serve_forever, name="metrics", daemon=True).start()
+    print(f"[METRICS] serving http://{addr}:{port}/metrics")
+    return _server
+
+
+if __name__ == "__main__":
+    # rough cost of a hot-path update, uncontended and from 4 threads at once
+    n = 200_000
+    start = time.perf_counter()
+    for _ in range(n):
+        inc("speech_responses_total", mode="idle", kind="interim")
+    single = (time.perf_counter() - start) / n
+
+    def worker():
+        for _ in range(n):
+            inc("serial_bytes_total", 12, direction="tx")
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    contended = (time.perf_counter() - start) / (4 * n)
+    for _ in range(1000):
+        observe("deepl_request_seconds", 0.12)
+    start = time.perf_counter()
+    text = exposition()
+    print(text)
+    print(f"inc(): {single * 1e9:.0f}ns single thread, {contended * 1e9:.0f}ns/update across 4 threads; "
+          f"scrape {(time.perf_counter() - start) * 1000:.2f}ms")
@@ -1,18 +1,22 @@
 import os
-import re
 import time
 import sys
-from google.cloud import speech
-from dotenv import load_dotenv
-import deepl
-from openai import OpenAI
-
-load_dotenv()
-os.environ["GOOGLE_APPLICATION_CREDENTIALS"] = os.path.join(os.getcwd(), "googleKey.json")
-deepl_client = deepl.Translator(os.getenv("DEEPL_API_KEY"))
+import startup
+import commands
+import recognition
+import engines
+import audio
+from vad import VoiceActivityDetector
+import blackbox
+import tracing
+import metrics
+import profiler
+import clients
+
+deepl_client = clients.Lazy(clients.translator)
 
 #language we want to translate to
-target_language = input("Enter target language (e.g., 'ES' for Spanish, 'FR' for French): ").strip().upper()
+target_language = None  # set by main(): --lang, $TARGET_LANGUAGE or a prompt
 streaming_active = True
 
 # Conversation state management
@@ -32,10 +36,14 @@ def translate_text(text, target_language):
         return ""
 
     try:
+        tracing.mark("translation_requested")
         result = deepl_client.translate_text(text, target_lang=target_language)
+        tracing.mark("translation_returned")
+        blackbox.record("translation", source=text, text=result.text)
         return result.text
     except Exception as e:
         print(f"Translation error: {e}")
+        blackbox.record("translation_error", source=text, error=str(e))
         return "(Translation error)"
 
 #handle conversation with OpenAI LLM
@@ -46,7 +54,7 @@ def handle_conversation(user_input):
         return "(Empty input detected)"
     
     # Check for conversation end
-    if re.search(r'\s*bye\s*,?\s*sentient\b', user_input, re.IGNORECASE):
+    if commands.route("conversation", user_input).intent == "end_conversation":
         conversation_active = False
         conversation_history = []
         return "Goodbye! It was nice talking to you."
@@ -60,12 +68,14 @@ def handle_conversation(user_input):
             {"role": "system", "content": "You are a helpful and friendly AI assistant named Sentient. Engage in natural conversation while being helpful and concise."}
         ] + conversation_history
         
+        tracing.mark("llm_requested")
         response = llm.chat.completions.create(
             model="gpt-4o-mini",
             messages=messages,
             temperature=0.7,
             max_tokens=150
         )
+        tracing.mark("llm_first_token")
         answer = response.choices[0].message.content.strip()
         
         # Add assistant's response to conversation history
@@ -81,77 +91,44 @@ def handle_conversation(user_input):
         return f"(OpenAI Error: {str(e)})"
 
 #ask an OpenAI LLM question if transcript starts with "Hey Sentient"
-llm = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+llm = clients.Lazy(clients.llm)
 def ask_openai_question(question):
     
     if not question or question.isspace():
         return "(Empty question detected)"
         
     try:
+        tracing.mark("llm_requested")
         response = llm.chat.completions.create(
             model="gpt-4o-mini",
             messages=[{"role": "user", "content": question}],
             temperature=0.7,
             max_tokens=150
         )
+        tracing.mark("llm_first_token")
         answer = response.choices[0].message.content.strip()
         return answer
     except Exception as e:
         print(f"OpenAI API error: {e}")
         return f"(OpenAI Error: {str(e)})"
 
+#the microphone stays open across recognition sessions; the VAD holds back
+#silence so only speech is uploaded
+mic = audio.Microphone()
+vad = VoiceActivityDetector()
+
 #attach microphone input to the Google Cloud Speech-to-Text API
 def stream_speech_to_text():
-    client = speech.SpeechClient()
-
-    config = speech.RecognitionConfig(
-        encoding=speech.RecognitionConfig.AudioEncoding.LINEAR16,
-        sample_rate_hertz=16000,
-        language_code="en-US", 
-        enable_automatic_punctuation=True,
-    )
-
-    streaming_config = speech.StreamingRecognitionConfig(
-        config=config,
-        interim_results=True 
-    )
-
-    def audio_generator():
-        import pyaudio
-
-        audio_interface = pyaudio.PyAudio()
-        audio_stream = audio_interface.open(
-            format=pyaudio.paInt16,
-            channels=1,
-            rate=16000,
-            input=True,
-            frames_per_buffer=1024,
-            stream_callback=None
-        )
-
-        time.sleep(0.5)
-
-        print("Stream active. Start speaking...")
-
-        while streaming_active:
-            data = audio_stream.read(4096, exception_on_overflow=False)
-            yield data
-
-        audio_stream.stop_stream()
-        audio_stream.close()
-        audio_interface.terminate()
+    global conversation_active, streaming_active
+    session_mode = "conversation" if conversation_active else "idle"
 
-    audio_generator_instance = audio_generator()
-    requests = (speech.StreamingRecognizeRequest(audio_content=content)
-                for content in audio_generator_instance)
-
-    responses = client.streaming_recognize(streaming_config, requests)
+    session_open = True
+    chunks = mic.chunks(lambda: streaming_active and session_open)
 
     last_transcript = ""
     last_update_time = time.time()
     update_cooldown = 0.3
     current_input = ""
-    global conversation_active
 
     try:
         clear_console()
@@ -162,12 +139,12 @@ def stream_speech_to_text():
         else:
             print(">>> Say 'hey, sentient' to start a conversation")
 
-        for response in responses:
-            if not response.results:
-                continue
-
-            result = response.results[0]
-            transcript = result.alternatives[0].transcript
+        # Only open the recognition stream once someone speaks; the VAD gate
+        # ends it again after a long silence
+        if not vad.wait_for_speech(chunks):
+            return
+        for result in engines.stream(session_mode, vad.gate(chunks), vad):
+            transcript = result.text
 
             current_time = time.time()
             if (transcript != last_transcript and 
@@ -190,7 +167,7 @@ def stream_speech_to_text():
                 if result.is_final:
                     if not conversation_active:
                         # Check for conversation start
-                        if re.search(r'\s*hey\s*,?\s*sentient\b.?\s*', transcript, re.IGNORECASE):
+                        if commands.route("idle", transcript).intent == "hey_sentient":
                             conversation_active = True
                             print("\n>>> Starting conversation with Sentient...")
                             response = handle_conversation("Hello!")
@@ -209,25 +186,46 @@ def stream_speech_to_text():
 
     except KeyboardInterrupt:
         print("\nStream closed by user.")
+        streaming_active = False
     except Exception as e:
         print(f"Error in streaming: {e}")
         import traceback
         traceback.print_exc()  
-    finally:
-        global streaming_active
         streaming_active = False
+    finally:
+        session_open = False
 
 def main():
+    global target_language
+    startup.mark("imports")
+    startup.configure()
+    args = startup.parser("Real-time translator with the Sentient assistant").parse_args()
+    target_language = startup.target_language(args.lang)
+    engine = engines.select(args.recognizer)
+    startup.mark("configuration")
+
     print("Google Cloud Speech-to-Text & Translation - Real-time Translator")
     print("-------------------------------------------------------------")
     print(f"Source language: English | Target language: {target_language}")
     print("Make sure your Google Cloud credentials are properly set up.")
-    print("Starting in 3 seconds...")
-    time.sleep(3)
-
+    # the mic, the Speech client and the service connections warm up at once
+    startup.warm_up({
+        "mic": mic.open,
+        "speech": engine.warm_up,
+        "deepl": lambda: startup.connect(deepl_client, "get_usage"),
+        "openai": lambda: startup.connect(llm, "models.list"),
+    })
+    print(startup.report())
+
+    blackbox.start(mic)
+    tracing.start()
+    metrics.serve()
+    profiler.watch("conversation_history", lambda: conversation_history)
+    profiler.install()
     try:
         clear_console()
-        stream_speech_to_text()
+        while streaming_active:
+            stream_speech_to_text()
     except KeyboardInterrupt:
         print("\nProgram terminated by user.")
     except Exception as e:
@@ -236,6 +234,13 @@ def main():
         import traceback
         traceback.print_exc() 
     finally:
+        blackbox.stop()
+        mic.close()
+        print(vad.report())
+        print(recognition.report())
+        print(mic.report())
+        print(tracing.report())
+        tracing.stop()
         print("Program finished.")
 
 if __name__ == "__main__":
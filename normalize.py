@@ -0,0 +1,204 @@
+import re
+import random
+import time
+from collections import namedtuple
+
+# ─── Spoken Number / Letter Normalizer ────────────────────────────────────────
+# One tokenizer pass over the transcript. Number words are folded into compound
+# values ("forty two" -> 42, "one hundred and five" -> 105) and spelled letters
+# are resolved through a homophone table ("bee" -> B, "why" -> Y).
+
+Parsed = namedtuple("Parsed", ["numbers", "letters", "tokens"])
+
+_TOKEN = re.compile(r"[a-z]+|\d+")
+
+UNITS = {
+    'zero': 0, 'one': 1, 'two': 2, 'three': 3, 'four': 4, 'five': 5,
+    'six': 6, 'seven': 7, 'eight': 8, 'nine': 9,
+}
+TEENS = {
+    'ten': 10, 'eleven': 11, 'twelve': 12, 'thirteen': 13, 'fourteen': 14,
+    'fifteen': 15, 'sixteen': 16, 'seventeen': 17, 'eighteen': 18, 'nineteen': 19,
+}
+TENS = {
+    'twenty': 20, 'thirty': 30, 'forty': 40, 'fifty': 50,
+    'sixty': 60, 'seventy': 70, 'eighty': 80, 'ninety': 90,
+}
+
+# Words the recognizer returns for a spoken letter name
+LETTER_HOMOPHONES = {
+    'ay': 'A', 'eh': 'A', 'bee': 'B', 'be': 'B', 'see': 'C', 'sea': 'C',
+    'dee': 'D', 'ee': 'E', 'ef': 'F', 'eff': 'F', 'gee': 'G', 'aitch': 'H',
+    'eye': 'I', 'jay': 'J', 'kay': 'K', 'el': 'L', 'ell': 'L', 'em': 'M',
+    'en': 'N', 'oh': 'O', 'owe': 'O', 'pee': 'P', 'pea': 'P', 'cue': 'Q',
+    'queue': 'Q', 'que': 'Q', 'are': 'R', 'ess': 'S', 'tea': 'T', 'tee': 'T',
+    'you': 'U', 'yu': 'U', 'vee': 'V', 'ex': 'X', 'why': 'Y', 'zee': 'Z',
+    'zed': 'Z',
+}
+
+# token -> (kind, value); built once so the parse loop is a single dict lookup
+_TABLE = {}
+_TABLE.update({w: ('unit', v) for w, v in UNITS.items()})
+_TABLE.update({w: ('teen', v) for w, v in TEENS.items()})
+_TABLE.update({w: ('tens', v) for w, v in TENS.items()})
+_TABLE.update({'hundred': ('hundred', 100), 'thousand': ('thousand', 1000)})
+
+
+def parse(text):
+    """Tokenize once and return every number and letter spoken in the text"""
+    tokens = _TOKEN.findall(text.lower())
+    numbers = []
+    letters = []
+    homophones = []
+
+    total = 0       # thousands already folded in
+    group = None    # value below one thousand, None when no number is open
+    last = None     # kind of the previous number token
+    double = False  # "double" seen, may start "double you"
+
+    def flush():
+        nonlocal total, group, last
+        if group is not None or total:
+            numbers.append(total + (group or 0))
+        total, group, last = 0, None, None
+
+    for i, tok in enumerate(tokens):
+        entry = _TABLE.get(tok)
+        if entry is not None:
+            kind, value = entry
+            if kind == 'unit':
+                if group is not None and last not in ('tens', 'hundred', 'thousand'):
+                    flush()
+                group = (group or 0) + value
+            elif kind == 'teen' or kind == 'tens':
+                if group is not None and last not in ('hundred', 'thousand'):
+                    flush()
+                group = (group or 0) + value
+            elif kind == 'hundred':
+                if group is None:
+                    group = 1  # "hundred" / "a hundred"
+                elif group >= 100:
+                    flush()
+                    group = 1
+                group *= 100
+            else:
+                if total:
+                    flush()
+                total = (group or 1) * 1000
+                group = None
+            last = kind
+            double = False
+            continue
+
+        if tok.isdigit():
+            flush()
+            numbers.append(int(tok))
+        elif tok == 'and' and last in ('hundred', 'thousand'):
+            continue
+        elif tok == 'a' and i + 1 < len(tokens) and tokens[i + 1] in ('hundred', 'thousand'):
+            flush()
+            continue
+        else:
+            flush()
+            if len(tok) == 1:
+                letters.append(tok.upper())
+            elif double and tok in ('you', 'yu'):
+                homophones.append('W')
+            elif tok in LETTER_HOMOPHONES:
+                homophones.append(LETTER_HOMOPHONES[tok])
+        double = tok == 'double'
+    flush()
+
+    # a homophone only counts as a letter when nothing else was said, or after
+    # "letter" ("the letter bee"), so "are you there" is not read as R
+    if homophones and (len(tokens) <= 2 or 'letter' in tokens):
+        letters.extend(homophones)
+    return Parsed(numbers, letters, tokens)
+
+
+def extract_number(text):
+    """Extract the first number from the spoken text"""
+    numbers = parse(text).numbers
+    return numbers[0] if numbers else None
+
+
+def extract_letter(text):
+    """Extract the first spoken letter from the text, upper-cased"""
+    letters = parse(text).letters
+    return letters[0] if letters else None
+
+
+# ─── Self-check / Benchmark ────────────────────────────────────────────────────
+# The parser's properties are checked here rather than in a test suite (the
+# repo has none): self_check() runs by hand (python normalize.py) and before
+# every benchmarks.py run.
+_UNIT_WORDS = {v: w for w, v in UNITS.items()}
+_TEEN_WORDS = {v: w for w, v in TEENS.items()}
+_TENS_WORDS = {v: w for w, v in TENS.items()}
+
+
+def spell_number(n, rng=random):
+    """Spell 0..999999 the way a speaker might ("forty two", "a hundred and five")"""
+    if n == 0:
+        return 'zero'
+    words = []
+    if n >= 1000:
+        words += [spell_number(n // 1000, rng), 'thousand']
+        n %= 1000
+    if n >= 100:
+        words += [_UNIT_WORDS[n // 100], 'hundred']
+        if n // 100 == 1 and not words[:-2] and rng.random() < 0.3:
+            words[-2] = 'a'
+        n %= 100
+        if n and rng.random() < 0.5:
+            words.append('and')
+    if n >= 20:
+        words.append(_TENS_WORDS[n - n % 10])
+        n %= 10
+        if n:
+            words.append(_UNIT_WORDS[n])
+    elif n >= 10:
+        words.append(_TEEN_WORDS[n])
+    elif n:
+        words.append(_UNIT_WORDS[n])
+    return ' '.join(words)
+
+
+def self_check(samples=5000, seed=0):
+    """Randomized round-trip checks of the parser's invariants"""
+    rng = random.Random(seed)
+    fillers = ['i guess', 'is it', 'maybe', 'um', 'how about']
+    for _ in range(samples):
+        n = rng.randrange(0, 1000000) if rng.random() < 0.2 else rng.randrange(0, 1000)
+        spoken = spell_number(n, rng)
+        text = f"{rng.choice(fillers)} {spoken}"
+        assert extract_number(text) == n, (text, extract_number(text))
+        assert extract_number(text.upper() + '?') == n
+        assert extract_number(f"{text} or {n + 1}") == n
+        m = rng.randrange(0, 1000)
+        assert parse(f"{spoken} then {spell_number(m, rng)}").numbers == [n, m]
+    for letter in 'ABCDEFGHIJKLMNOPQRSTUVWXYZ':
+        assert extract_letter(letter) == letter
+        assert extract_letter(f"{letter.lower()}.") == letter
+    for word, letter in LETTER_HOMOPHONES.items():
+        assert extract_letter(word) == letter, word
+        assert extract_letter(f"the letter {word}") == letter, word
+    assert extract_letter("double you") == 'W'
+    assert extract_letter("are you there right now") is None
+    print(f"self-check passed ({samples} random numbers, {len(LETTER_HOMOPHONES)} homophones)")
+
+
+def benchmark(samples=20000, seed=1):
+    rng = random.Random(seed)
+    texts = [f"is it {spell_number(rng.randrange(1, 101), rng)}" for _ in range(samples)]
+    texts += [rng.choice(list(LETTER_HOMOPHONES)) for _ in range(samples)]
+    start = time.perf_counter()
+    for text in texts:
+        parse(text)
+    elapsed = time.perf_counter() - start
+    print(f"parse: {len(texts) / elapsed:,.0f} transcripts/s ({elapsed / len(texts) * 1e6:.2f} us each)")
+
+
+if __name__ == "__main__":
+    self_check()
+    benchmark()
@@ -0,0 +1,216 @@
+import re
+import time
+from collections import namedtuple
+from functools import lru_cache
+
+# ─── Phonetic Vocabulary Index ────────────────────────────────────────────────
+# Game vocabularies are tiny, so every entry's Metaphone-style key is computed
+# once up front. A transcript is resolved by keying each word window and taking
+# the closest entry by edit distance, which catches recognizer slips such as
+# "rack" -> rock or "sisters" -> scissors without another spoken round trip.
+# The default threshold keeps everyday words out: with vocabularies this small,
+# a loose match turns "work" into rock or "err" into ERC.
+
+Match = namedtuple("Match", ["value", "phrase", "confidence"])
+
+_WORD = re.compile(r"[a-z]+")
+_VOWELS = "AEIOU"
+
+
+@lru_cache(maxsize=4096)
+def metaphone(word):
+    """Simplified Metaphone key for a single word"""
+    w = ''.join(c for c in word.upper() if 'A' <= c <= 'Z')
+    if not w:
+        return ''
+    if w[:2] in ('AE', 'GN', 'KN', 'PN', 'WR'):
+        w = w[1:]
+    elif w[0] == 'X':
+        w = 'S' + w[1:]
+    elif w[:2] == 'WH':
+        w = 'W' + w[2:]
+
+    out = []
+    n = len(w)
+    for i, c in enumerate(w):
+        prev = w[i - 1] if i else ''
+        nxt = w[i + 1] if i + 1 < n else ''
+        nxt2 = w[i + 2] if i + 2 < n else ''
+        if c == prev and c != 'C':
+            continue
+        if c in _VOWELS:
+            if i == 0:
+                out.append(c)
+        elif c == 'B':
+            if not (prev == 'M' and i == n - 1):
+                out.append('B')
+        elif c == 'C':
+            if nxt == 'H' or (nxt == 'I' and nxt2 == 'A'):
+                out.append('K' if prev == 'S' else 'X')
+            elif nxt in ('I', 'E', 'Y'):
+                if prev != 'S':
+                    out.append('S')
+            else:
+                out.append('K')
+        elif c == 'D':
+            out.append('J' if nxt == 'G' and nxt2 in ('E', 'I', 'Y') else 'T')
+        elif c == 'G':
+            if nxt == 'H' and nxt2 and nxt2 not in _VOWELS:
+                continue
+            if nxt == 'N' and (i + 2 == n or w[i + 2:] == 'ED'):
+                continue
+            out.append('J' if nxt in ('I', 'E', 'Y') and prev != 'G' else 'K')
+        elif c == 'H':
+            if nxt in _VOWELS and prev not in ('C', 'S', 'P', 'T', 'G'):
+                out.append('H')
+        elif c == 'K':
+            if prev != 'C':
+                out.append('K')
+        elif c == 'P':
+            out.append('F' if nxt == 'H' else 'P')
+        elif c == 'Q':
+            out.append('K')
+        elif c == 'S':
+            out.append('X' if nxt == 'H' or (nxt == 'I' and nxt2 in ('O', 'A')) else 'S')
+        elif c == 'T':
+            if nxt == 'I' and nxt2 in ('O', 'A'):
+                out.append('X')
+            elif nxt == 'H':
+                out.append('0')
+            elif not (nxt == 'C' and nxt2 == 'H'):
+                out.append('T')
+        elif c == 'V':
+            out.append('F')
+        elif c in ('W', 'Y'):
+            if nxt in _VOWELS:
+                out.append(c)
+        elif c == 'X':
+            out.append('KS')
+        elif c == 'Z':
+            out.append('S')
+        else:
+            out.append(c)
+    return ''.join(out)
+
+
+def edit_distance(a, b, limit):
+    """Levenshtein distance, giving up (returns limit + 1) once it exceeds limit"""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    row = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        prev_diag, row[0] = row[0], i
+        best = i
+        for j, cb in enumerate(b, 1):
+            cur = min(row[j] + 1, row[j - 1] + 1, prev_diag + (ca != cb))
+            prev_diag, row[j] = row[j], cur
+            if cur < best:
+                best = cur
+        if best > limit:
+            return limit + 1
+    return row[-1]
+
+
+def _similarity(a, b, limit):
+    if a == b:
+        return 1.0
+    if not a or not b:
+        return 0.0
+    # "rocks" still says rock: credit a window that starts with the entry
+    if len(a) > len(b) and a.startswith(b):
+        return len(b) / len(a)
+    d = edit_distance(a, b, limit)
+    return 0.0 if d > limit else 1.0 - d / max(len(a), len(b))
+
+
+def _limit(length, threshold):
+    """Most edits a length-long key can take and still score threshold"""
+    return int(length * (1 - threshold) + 1e-9)  # 5 * (1 - 0.8) is 0.999...
+
+
+class PhoneticIndex:
+    """Precomputed phonetic keys for a fixed vocabulary of words or phrases"""
+
+    def __init__(self, vocab, threshold=0.8):
+        # vocab is a list of phrases, or a dict of phrase -> value for aliases
+        if not isinstance(vocab, dict):
+            vocab = {phrase: phrase for phrase in vocab}
+        self.threshold = threshold
+        self._entries = {}  # word count -> [(phrase, value, spelling, key)]
+        self._exact = {}    # spelling or key -> (phrase, value)
+        for phrase, value in vocab.items():
+            words = _WORD.findall(phrase.lower())
+            spelling = ''.join(words)
+            key = ''.join(metaphone(w) for w in words)
+            self._entries.setdefault(len(words), []).append((phrase, value, spelling, key))
+            self._exact.setdefault(spelling, (phrase, value))
+            self._exact.setdefault(key, (phrase, value))
+
+    def resolve(self, transcript, threshold=None):
+        """Best vocabulary Match for any word window of the transcript, or None"""
+        threshold = self.threshold if threshold is None else threshold
+        words = _WORD.findall(transcript.lower())
+        best = None
+        for size, entries in self._entries.items():
+            for start in range(len(words) - size + 1):
+                window = words[start:start + size]
+                spelling = ''.join(window)
+                hit = self._exact.get(spelling)
+                if hit:
+                    return Match(hit[1], hit[0], 1.0)
+                key = ''.join(metaphone(w) for w in window)
+                hit = self._exact.get(key)
+                if hit:
+                    return Match(hit[1], hit[0], 1.0)
+                for phrase, value, e_spelling, e_key in entries:
+                    # anything scoring below threshold is not worth the full DP
+                    limit = _limit(max(len(key), len(e_key)), threshold)
+                    score = max(_similarity(key, e_key, limit),
+                                _similarity(spelling, e_spelling, _limit(len(spelling), threshold)))
+                    if score >= threshold and (best is None or score > best.confidence):
+                        best = Match(value, phrase, score)
+        return best
+
+
+RPS_MOVES = PhoneticIndex({"rock": "rock", "paper": "paper", "scissors": "scissors", "scissor": "scissors"})
+
+
+# ─── Self-check / Benchmark ───────────────────────────────────────────────────
+# Everyday words that must not be taken for a short vocabulary entry, and the
+# recognizer slips that must still be; run by hand and before benchmarks.py.
+COMMON_WORDS = ("work", "err", "earth", "er c", "were", "early", "lock", "sock", "back", "make", "take",
+                "look", "right", "sure", "go", "wait", "okay", "hello there", "what", "i think so")
+SLIPS = {"rack": "rock", "rocks": "rock", "pepper": "paper", "sisters": "scissors", "scissor": "scissors"}
+
+
+def self_check():
+    short = PhoneticIndex(["ERC"])
+    for word in COMMON_WORDS:
+        for index in (RPS_MOVES, short):
+            match = index.resolve(word)
+            assert match is None, (word, match)
+    for slip, move in SLIPS.items():
+        match = RPS_MOVES.resolve(slip)
+        assert match and match.value == move, (slip, match)
+    print(f"self-check passed ({len(COMMON_WORDS)} common words, {len(SLIPS)} slips)")
+
+
+def benchmark(number=2000):
+    places = PhoneticIndex(["GEISEL LIBRARY", "WONG AVERY LIBRARY", "REVELLE COLLEGE", "MUIR COLLEGE",
+                            "PRICE CENTER", "PEPPER CANYON", "RIMAC", "SUN GOD LAWN", "BIRCH AQUARIUM"])
+    cases = [(RPS_MOVES, t) for t in ("rock", "rack", "I'll go with paperless", "sisters", "scissor", "hello there")]
+    cases += [(places, t) for t in ("geisel library", "guys el library", "price centre", "sun god lawn", "the letter e")]
+    print("Phonetic index resolve cost (per transcript)")
+    print("-------------------------------------------------------------")
+    for index, text in cases:
+        start = time.perf_counter()
+        for _ in range(number):
+            match = index.resolve(text)
+        us = (time.perf_counter() - start) / number * 1e6
+        found = f"{match.value} ({match.confidence:.2f})" if match else "-"
+        print(f"{us:8.1f} us | {found:>24} <- {text!r}")
+
+
+if __name__ == "__main__":
+    self_check()
+    benchmark()
@@ -0,0 +1,501 @@
+import os
+import sys
+import time
+import signal
+import asyncio
+import collections
+import blackbox
+import catalog
+import clients
+import commands
+import metrics
+import startup
+import tracing
+
+# ─── asyncio Pipeline ─────────────────────────────────────────────────────────
+# Runs a display.Headset (or test.py, whose module has the same hooks) as
+# concurrent stages instead of one blocking loop:
+#
+#   capture (thread: mic → VAD → engine requests) ─audio─▶ recognize (async gRPC)
+#     ─results─▶ dispatch (the headset's handle_transcript on a worker thread)
+#     ─translations─▶ translate (async DeepL) ─┐
+#     ─questions─▶ answer (async OpenAI) ──────┼─link─▶ serial link
+#     game frames ─────────────────────────────┘
+#
+# Every hop is a bounded Channel. A full channel makes its producer wait
+# (backpressure), except for items that a newer one supersedes: interim
+# results, captions and their translations are dropped oldest-first instead.
+# So a DeepL call that takes seconds costs stale translations, not stalled
+# recognition or games, and a slow display link pushes back on the game logic
+# that feeds it rather than on the microphone.
+#
+# The game logic is the script's, unchanged: handle_transcript() runs on a
+# worker thread and its send_to_arduino()/caption() calls go into the link
+# and translation channels. pyserial has no asyncio API, so the link stage
+# does its blocking writes and ACK waits on a worker thread too. Recognizer
+# engines without an asyncio API (engines.py's local and scripted ones) get
+# one there as well.
+#
+#   python pipeline.py                          the display.py setup on asyncio
+#   python pipeline.py --script test            test.py's games and conversation
+#   python pipeline.py --bench --deepl-latency 2 --seconds 60
+#                                               blocking loop vs pipeline
+#                                               on fakes, with a slow DeepL
+
+PIPELINE_AUDIO_QUEUE = int(os.getenv("PIPELINE_AUDIO_QUEUE", "30"))  # requests, 3 s at 100 ms chunks
+PIPELINE_RESULT_QUEUE = int(os.getenv("PIPELINE_RESULT_QUEUE", "8"))
+PIPELINE_TRANSLATE_QUEUE = int(os.getenv("PIPELINE_TRANSLATE_QUEUE", "2"))
+PIPELINE_QUESTION_QUEUE = int(os.getenv("PIPELINE_QUESTION_QUEUE", "2"))
+PIPELINE_LINK_QUEUE = int(os.getenv("PIPELINE_LINK_QUEUE", "16"))
+LLM_MODEL = os.getenv("LLM_MODEL", "gpt-4o-mini")
+SYSTEM_PROMPT = "You are a helpful and friendly AI assistant named Sentient. Answer in one or two short sentences."
+COOLDOWN = 0.3  # seconds between interim updates, as in the blocking loop
+
+
+class Channel:
+    """Bounded queue between two stages; put() waits while it is full"""
+
+    def __init__(self, name, maxsize):
+        self.name = name
+        self.maxsize = maxsize
+        self.dropped = 0
+        self.blocked = 0
+        self.closed = False
+        self._items = collections.deque()  # (item, droppable)
+        self._unfinished = 0
+        self._changed = asyncio.Condition()
+
+    def __len__(self):
+        return len(self._items)
+
+    async def put(self, item, droppable=False):
+        """Droppable items first evict the oldest droppable one instead of waiting"""
+        async with self._changed:
+            if droppable and len(self._items) >= self.maxsize:
+                for i, (_, stale) in enumerate(self._items):
+                    if stale:
+                        del self._items[i]
+                        self._unfinished -= 1
+                        self.dropped += 1
+                        metrics.inc("pipeline_dropped_total", queue=self.name)
+                        break
+            if len(self._items) >= self.maxsize and not self.closed:
+                self.blocked += 1
+                metrics.inc("pipeline_blocked_total", queue=self.name)
+                await self._changed.wait_for(lambda: len(self._items) < self.maxsize or self.closed)
+            if self.closed:
+                return
+            self._items.append((item, droppable))
+            self._unfinished += 1
+            self._changed.notify_all()
+
+    async def get(self):
+        """Next item, or None once the channel is closed and empty"""
+        async with self._changed:
+            await self._changed.wait_for(lambda: self._items or self.closed)
+            if not self._items:
+                return None
+            item, _ = self._items.popleft()
+            self._changed.notify_all()
+            return item
+
+    async def done(self):
+        """The item from the last get() has been handled"""
+        async with self._changed:
+            self._unfinished -= 1
+            self._changed.notify_all()
+
+    async def join(self):
+        async with self._changed:
+            await self._changed.wait_for(lambda: self._unfinished <= 0)
+
+    async def close(self):
+        async with self._changed:
+            self.closed = True
+            self._changed.notify_all()
+
+    def report(self):
+        return f"{self.name}: {self.dropped} dropped, {self.blocked} waits"
+
+
+class Result:
+    __slots__ = ("stream", "mode", "text", "is_final", "trace")
+
+    def __init__(self, stream, mode, text, is_final, trace):
+        self.stream = stream
+        self.mode = mode
+        self.text = text
+        self.is_final = is_final
+        self.trace = trace
+
+
+class Pipeline:
+    """One headset's stages on the running event loop"""
+
+    def __init__(self, headset, engine=None, translator=None, llm=None):
+        self.headset = headset
+        self.engine = engine
+        self.translator = translator
+        self.llm = llm
+        self.stream_id = 0
+        self._audio = None  # the open stream's channel
+
+    # ── handler hooks (called on worker threads) ──
+    def _from_thread(self, coro):
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result()
+
+    def _send(self, prefix, text=""):
+        # game frames wait for room: the display should show every move
+        self._from_thread(self.link.put((prefix, text, tracing.current())))
+
+    def _caption(self, txt):
+        trace = tracing.current()
+        self._from_thread(self.link.put(("T:", txt, trace), droppable=True))
+        self._from_thread(self.translations.put((txt, trace), droppable=True))
+
+    # ── stages ──
+    def _capture(self, timer, session, audio):
+        """Mic → VAD → encoder → requests on a worker thread, ending with None"""
+        headset = self.headset
+        chunks = headset.mic.chunks(lambda: headset.streaming_active and session["open"])
+        try:
+            # the stream is opened only once speech starts; silence stays local
+            if headset.vad.wait_for_speech(chunks):
+                audio_chunks = timer.trace.audio(headset.vad.gate(chunks), headset.vad)
+                for request in self.engine.requests(audio_chunks, timer):
+                    self._from_thread(audio.put(request))
+                    if audio.closed:
+                        break
+        finally:
+            self._from_thread(audio.put(None))
+
+    async def _recognize(self):
+        import recognition
+
+        while self.headset.streaming_active:
+            mode = self.headset.current_mode()
+            timer = recognition.SessionTimer(mode, self.engine.name, self.headset)
+            session = {"open": True}
+            self.stream_id += 1
+            self._end_stream = asyncio.Event()
+            audio = self._audio = Channel("audio", PIPELINE_AUDIO_QUEUE)
+            capture = asyncio.ensure_future(asyncio.to_thread(self._capture, timer, session, audio))
+
+            first = await audio.get()
+            if first is not None:
+                async def requests():
+                    request = first
+                    while request is not None:
+                        yield request
+                        request = await audio.get()
+
+                print(">>> Listening (Ctrl‑C to stop)")
+                consume = asyncio.ensure_future(self._consume(requests(), timer))
+                ended = asyncio.ensure_future(self._end_stream.wait())
+                await asyncio.wait({consume, ended}, return_when=asyncio.FIRST_COMPLETED)
+                ended.cancel()
+                if not consume.done():
+                    consume.cancel()
+                elif consume.exception():
+                    print(f"[ERROR] Recognition stream: {consume.exception()!r}")
+            session["open"] = False
+            await audio.close()
+            await capture
+            # let the dispatcher catch up, so the next stream gets the mode it leaves behind
+            await self.results.join()
+
+    async def _consume(self, requests, timer):
+        import engines
+
+        async for event in self.engine.aresults(timer.mode, requests, self.headset.phrases(timer.mode)):
+            engines.observe(timer, event)
+            print(f"[DEBUG] Transcript: '{event.text}' | final={event.is_final}")
+            result = Result(self.stream_id, timer.mode, event.text, event.is_final, tracing.current())
+            await self.results.put(result, droppable=not event.is_final)
+
+    def _handle(self, result):
+        tracing.bind(result.trace)
+        return self.headset.handle_transcript(result.text, result.is_final)
+
+    async def _dispatch(self):
+        last, last_time, stream = "", time.time(), None
+        while True:
+            result = await self.results.get()
+            try:
+                if result.stream != stream:
+                    last, last_time, stream = "", time.time(), result.stream
+                now = time.time()
+                # throttle updates
+                if result.text != last and (result.is_final or now - last_time > COOLDOWN):
+                    end = await asyncio.to_thread(self._handle, result)
+                    last, last_time = result.text, now
+                    if result.is_final and result.mode == "idle" and not getattr(self.headset, "converses", False):
+                        cmd = commands.route("idle", result.text)
+                        if cmd.intent == "hey_sentient" and cmd.slots.get("question"):
+                            await self.questions.put((cmd.slots["question"], result.trace))
+                    # restart recognition with the config for the new mode
+                    if (end or self.headset.current_mode() != result.mode) and result.stream == self.stream_id:
+                        self._end_stream.set()
+            except Exception as e:
+                print(f"[ERROR] Handling {result.text!r}: {e!r}")
+            finally:
+                await self.results.done()
+
+    async def _translate(self):
+        while True:
+            text, trace = await self.translations.get()
+            try:
+                if trace:
+                    trace.mark("translation_requested")
+                try:
+                    translated = (await self.translator.translate_text(
+                        text, target_lang=self.headset.target_language)).text
+                    blackbox.record("translation", source=text, text=translated)
+                except Exception as e:
+                    print(f"[ERROR] Translation: {e}")
+                    blackbox.record("translation_error", source=text, error=str(e))
+                    translated = "(Translation error)"
+                if trace:
+                    trace.mark("translation_returned")
+                print(f"Translation: {translated}")
+                await self.link.put(("R:", translated, trace), droppable=True)
+            finally:
+                await self.translations.done()
+
+    async def _answer(self):
+        while True:
+            question, trace = await self.questions.get()
+            try:
+                if trace:
+                    trace.mark("llm_requested")
+                parts = []
+                with metrics.timed("openai_request_seconds"):
+                    stream = await self.llm.chat.completions.create(
+                        model=LLM_MODEL, stream=True, max_tokens=150,
+                        messages=[{"role": "system", "content": SYSTEM_PROMPT},
+                                  {"role": "user", "content": question}])
+                    async for chunk in stream:
+                        delta = chunk.choices[0].delta.content if chunk.choices else None
+                        if delta:
+                            if not parts and trace:
+                                trace.mark("llm_first_token")
+                            parts.append(delta)
+                metrics.inc("openai_requests_total", status="ok")
+                await self.link.put(("A:", "".join(parts).strip(), trace))
+            except Exception as e:
+                metrics.inc("openai_requests_total", status="error")
+                print(f"[ERROR] OpenAI: {e}")
+            finally:
+                await self.questions.done()
+
+    def _write(self, prefix, text, trace):
+        tracing.bind(trace)
+        self._display(prefix, text)
+
+    async def _link(self):
+        while True:
+            prefix, text, trace = await self.link.get()
+            try:
+                await asyncio.to_thread(self._write, prefix, text, trace)
+            except Exception as e:
+                print(f"[ERROR] Display link: {e!r}")
+            finally:
+                await self.link.done()
+
+    # ── lifecycle ──
+    async def run(self):
+        """Run until stop(); frames already queued for the display are flushed"""
+        import engines
+
+        self.loop = asyncio.get_running_loop()
+        self.results = Channel("results", PIPELINE_RESULT_QUEUE)
+        self.translations = Channel("translations", PIPELINE_TRANSLATE_QUEUE)
+        self.questions = Channel("questions", PIPELINE_QUESTION_QUEUE)
+        self.link = Channel("link", PIPELINE_LINK_QUEUE)
+        self.engine = self.engine or self.headset.engine or engines.get()
+        self.translator = self.translator or clients.async_translator()
+        self.llm = self.llm or clients.async_llm()
+
+        headset = self.headset
+        # a Headset's hooks are methods (overridden on the instance), test.py's module functions
+        hooks = {name: vars(headset).get(name) for name in ("send_to_arduino", "caption")}
+        self._display = headset.send_to_arduino
+        headset.send_to_arduino, headset.caption = self._send, self._caption
+        workers = [asyncio.ensure_future(stage()) for stage in (self._dispatch, self._translate, self._answer, self._link)]
+        try:
+            await self._recognize()
+            # translations and answers feed the link, so they drain first
+            await self._drain(self.translations, self.questions)
+            await self._drain(self.link)
+        finally:
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            for name, hook in hooks.items():
+                if hook is None:
+                    delattr(headset, name)
+                else:
+                    setattr(headset, name, hook)
+
+    async def _drain(self, *channels, timeout=5.0):
+        """Wait for the stages behind channels to finish what is queued; warns about each that did not"""
+        joins = {asyncio.ensure_future(channel.join()): channel for channel in channels}
+        _, pending = await asyncio.wait(joins, timeout=timeout)
+        for join in pending:
+            join.cancel()
+            channel = joins[join]
+            print(f"[WARN] {channel.name} did not drain before shutdown ({len(channel)} still queued)")
+
+    def stop(self):
+        """Thread-safe: end the current stream and let run() return"""
+        self.headset.streaming_active = False
+        if self._audio is not None:
+            asyncio.run_coroutine_threadsafe(self._audio.close(), self.loop)
+
+    def report(self):
+        return "Pipeline: " + ", ".join(c.report() for c in (self.results, self.translations, self.questions, self.link))
+
+
+# ─── Main ─────────────────────────────────────────────────────────────────────
+async def _main(headset):
+    pipeline = Pipeline(headset)
+    loop = asyncio.get_running_loop()
+    for name in ("SIGINT", "SIGTERM"):
+        if hasattr(signal, name):
+            try:
+                loop.add_signal_handler(getattr(signal, name), pipeline.stop)
+            except NotImplementedError:  # Windows event loops
+                pass
+    await pipeline.run()
+    return pipeline
+
+
+def main(args):
+    import engines
+    import recognition
+
+    target_language = startup.target_language(args.lang)
+    engine = engines.select(args.recognizer)
+    if args.script == "test":
+        import test as headset  # the module is the headset: its globals are the game state
+
+        headset.target_language = target_language
+    else:
+        import display
+
+        headset = display.Headset(target_language)
+        catalog.prepare(target_language, display.deepl_client)
+    startup.mark("configuration")
+    print(f"Speech→Text→Translation→Arduino + Games ({args.script}.py on asyncio)")
+    tasks = {"mic": headset.mic.open, "speech": engine.warm_up}
+    if hasattr(headset, "establish_connection"):
+        tasks["display"] = headset.establish_connection
+    ready = startup.warm_up(tasks)
+    if ready.get("display"):
+        headset.send_to_arduino("LANG:", target_language)
+    elif "display" in tasks:
+        print("[WARN] Arduino not responding; continuing without display.")
+    print(startup.report())
+
+    tracing.start()
+    metrics.serve()
+    try:
+        pipeline = asyncio.run(_main(headset))
+        print(pipeline.report())
+    finally:
+        headset.streaming_active = False
+        if getattr(headset, "arduino", None) and headset.arduino.is_open:
+            headset.send_to_arduino("QUIT")
+            headset.arduino.close()
+        headset.mic.close()
+        print(recognition.report())
+        print(headset.vad.report())
+        print(tracing.report())
+        tracing.stop()
+
+
+# ─── Blocking Loop vs Pipeline ────────────────────────────────────────────────
+class _FakeTranslator:
+    def __init__(self, seconds):
+        self.seconds = seconds
+
+    async def translate_text(self, text, target_lang=None, **kwargs):
+        await asyncio.sleep(self.seconds)
+        return clients._Translation(f"<{target_lang}> {text}")
+
+
+class _FakeLLM:
+    """chat.completions.create(stream=True) answering word by word"""
+
+    def __init__(self, seconds, token_seconds=0.03):
+        self.seconds = seconds
+        self.token_seconds = token_seconds
+        self.chat = self
+        self.completions = self
+
+    async def create(self, messages=(), **kwargs):
+        await asyncio.sleep(self.seconds)
+        words = f"(answer to: {messages[-1]['content']})".split(" ")
+
+        async def chunks():
+            for i, word in enumerate(words):
+                await asyncio.sleep(self.token_seconds)
+                delta = type("Delta", (), {"content": word if i == 0 else " " + word})
+                yield type("Chunk", (), {"choices": [type("Choice", (), {"delta": delta})]})
+        return chunks()
+
+
+def bench(seconds=60.0, deepl_latency=2.0, llm_latency=1.0, seed=0):
+    """The same synthetic speech through the blocking loop and the pipeline, in real time"""
+    import threading
+    import replay
+    import soak
+
+    here = os.path.dirname(os.path.abspath(__file__))
+    for kind in ("blocking", "asyncio"):
+        tracing._traces.clear()
+        clock = replay.WallClock()
+        report = replay.Report(clock, keep=200)
+        transcripts = soak.SyntheticTranscripts(seed, scenarios={"caption": 5, "rps": 1, "number": 1},
+                                                start=clock.elapsed + 1.0)
+        recognizer = replay._Recognizer(transcripts.responses(), report)
+        mic = soak.SyntheticMicrophone(transcripts, clock, duration=clock.elapsed + seconds)
+        latency = deepl_latency if kind == "blocking" else 0.0
+        with replay.offline(report, recognizer, deepl_latency=latency, llm_latency=llm_latency):
+            display = replay.load_script(os.path.join(here, "display.py"))
+            import engines  # the one display.py got, on the fakes
+            headset = display.Headset("ES", mic=mic, console=False)
+            headset.establish_connection()
+            if kind == "blocking":
+                while not mic.exhausted:
+                    headset.stream_speech_to_text()
+                extra = ""
+            else:
+                speech = sys.modules["google.cloud.speech"]
+                engine = engines.Google(async_client=speech.SpeechAsyncClient())
+                pipeline = Pipeline(headset, engine, _FakeTranslator(deepl_latency), _FakeLLM(llm_latency))
+                watchdog = threading.Timer(seconds, pipeline.stop)
+                watchdog.start()
+                asyncio.run(pipeline.run())
+                extra = pipeline.report()
+        print(f"{kind}: {report.counts.get('result', 0)} results, {report.counts.get('serial', 0)} serial frames, "
+              f"{recognizer.missed} results missed while no stream was open", file=sys.stderr)
+        if extra:
+            print(extra, file=sys.stderr)
+        print(tracing.report(), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    startup.mark("imports")
+    startup.configure()
+    parser = startup.parser("display.py's headset (or test.py) on an asyncio pipeline")
+    parser.add_argument("--script", choices=["display", "test"], default="display", help="whose handlers to run")
+    parser.add_argument("--bench", action="store_true", help="compare with the blocking loop on fakes")
+    parser.add_argument("--seconds", type=float, default=60.0)
+    parser.add_argument("--deepl-latency", type=float, default=2.0, help="seconds per translation (bench)")
+    parser.add_argument("--llm-latency", type=float, default=1.0, help="seconds per LLM call (bench)")
+    args = parser.parse_args()
+    if args.bench:
+        bench(args.seconds, args.deepl_latency, args.llm_latency)
+    else:
+        main(args)
@@ -0,0 +1,285 @@
+import os
+import sys
+import time
+import signal
+import threading
+import tracemalloc
+from collections import Counter
+
+# ─── On-demand Profiling ──────────────────────────────────────────────────────
+# For a station that has started lagging: capture a CPU profile or a memory
+# diff from the running process without restarting it.
+#
+#   kill -PROF <pid>     sample every thread's stack for PROFILE_SECONDS and
+#                        write profiles/cpu_<time>.collapsed (Ctrl+T does the
+#                        same where the terminal sends SIGINFO, e.g. macOS)
+#   kill -VTALRM <pid>   memory snapshot: the first one starts tracemalloc and
+#                        records a baseline, each later one writes
+#                        profiles/memory_<time>.txt with the growth since the
+#                        previous snapshot, plus a .tracemalloc dump
+#
+# The CPU profile is wall-clock stack sampling in the collapsed format read by
+# flamegraph.pl and speedscope; threads waiting on I/O show up where they
+# wait. While nothing has been requested no thread runs and tracemalloc is
+# off, so the only cost is the installed signal handlers. MEMORY_TRACE=1
+# starts tracemalloc at install() to get a baseline from start-up.
+#
+# watch(name, getter) adds a named object (conversation history, serial
+# buffers, caches) to every memory report with its size and growth.
+
+PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+PROFILE_SECONDS = float(os.getenv("PROFILE_SECONDS", "30"))
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "5"))
+MEMORY_TRACE = os.getenv("MEMORY_TRACE", "0") == "1"
+MEMORY_FRAMES = int(os.getenv("MEMORY_FRAMES", "16"))
+
+# allocations whose traceback passes through these paths are summed per area
+AREAS = {
+    "grpc / speech responses": ("grpc", os.path.join("google", "cloud"), "proto"),
+    "serial": (os.sep + "serial" + os.sep,),
+    "deepl / openai / http": ("deepl", "openai", "httpx", "urllib3", "requests"),
+    "numpy": ("numpy",),
+}
+
+
+def _stamp():
+    return time.strftime("%Y%m%d_%H%M%S")
+
+
+# ─── CPU Sampling ─────────────────────────────────────────────────────────────
+class Sampler:
+    """Samples sys._current_frames() on a thread and writes collapsed stacks"""
+
+    def __init__(self, seconds=PROFILE_SECONDS, interval_ms=PROFILE_INTERVAL_MS, out_dir=PROFILE_DIR):
+        self.seconds = seconds
+        self.interval = interval_ms / 1000.0
+        self.out_dir = out_dir
+        self.stacks = Counter()
+        self.samples = 0
+
+    def _sample(self, own, names):
+        for ident, frame in sys._current_frames().items():
+            if ident == own:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            stack.append(names.get(ident, f"thread-{ident}"))
+            self.stacks[";".join(reversed(stack))] += 1
+
+    def run(self):
+        own = threading.get_ident()
+        end = time.monotonic() + self.seconds
+        names, names_at = {}, 0.0
+        while (now := time.monotonic()) < end:
+            if now - names_at > 1.0:
+                names = {t.ident: t.name for t in threading.enumerate()}
+                names_at = now
+            self._sample(own, names)
+            self.samples += 1
+            time.sleep(self.interval)
+        return self.write()
+
+    def write(self):
+        os.makedirs(self.out_dir, exist_ok=True)
+        path = os.path.join(self.out_dir, f"cpu_{_stamp()}.collapsed")
+        with open(path, "w") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+        return path
+
+    def top(self, n=10):
+        """Leaf frames with the most samples"""
+        leaves = Counter()
+        for stack, count in self.stacks.items():
+            leaves[stack.rsplit(";", 1)[-1]] += count
+        return leaves.most_common(n)
+
+
+_sampling = threading.Lock()
+
+
+def _profile_worker(seconds):
+    if not _sampling.acquire(blocking=False):
+        print("[PROFILE] a CPU profile is already running")
+        return
+    try:
+        print(f"[PROFILE] sampling all threads for {seconds:g}s")
+        sampler = Sampler(seconds)
+        path = sampler.run()
+        hot = ", ".join(f"{frame} {count * 100 / max(1, sampler.samples):.0f}%" for frame, count in sampler.top(3))
+        print(f"[PROFILE] {sampler.samples} samples -> {path} (top: {hot})")
+    finally:
+        _sampling.release()
+
+
+def profile(seconds=PROFILE_SECONDS):
+    """Start a CPU profile in the background"""
+    threading.Thread(target=_profile_worker, args=(seconds,), name="profiler", daemon=True).start()
+
+
+# ─── Memory Snapshots ─────────────────────────────────────────────────────────
+_watched = {}
+_previous = {"snapshot": None, "watched": {}}
+_snapshotting = threading.Lock()
+
+
+def watch(name, getter):
+    """Report getter()'s size in every memory snapshot"""
+    _watched[name] = getter
+
+
+def _deep_size(obj, seen, depth=0):
+    if id(obj) in seen or depth > 8:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj, 0)
+    if isinstance(obj, dict):
+        size += sum(_deep_size(k, seen, depth + 1) + _deep_size(v, seen, depth + 1) for k, v in list(obj.items()))
+    elif isinstance(obj, (list, tuple, set, frozenset)) or type(obj).__name__ == "deque":
+        size += sum(_deep_size(x, seen, depth + 1) for x in list(obj))
+    return size
+
+
+def _measure(getter):
+    """(value, unit) for a watched object"""
+    obj = getter()
+    if isinstance(obj, (int, float)):
+        return obj, "bytes"
+    if hasattr(obj, "cache_info"):
+        return obj.cache_info().currsize, "entries"
+    return _deep_size(obj, set()), "bytes"
+
+
+def _default_watches():
+    """Caches and buffers of whichever project modules are loaded"""
+    modules = sys.modules
+    found = {}
+    if "phonetic" in modules:
+        found["phonetic.metaphone cache"] = lambda: modules["phonetic"].metaphone
+    if "tracing" in modules:
+        found["tracing traces"] = lambda: modules["tracing"]._traces
+        found["tracing ACK waits"] = lambda: modules["tracing"]._awaiting_ack
+    if "metrics" in modules:
+        found["metrics shards"] = lambda: modules["metrics"]._shards
+    return found
+
+
+def _area_sizes(diffs):
+    """{area: (size, growth)} over traceback-grouped StatisticDiffs"""
+    sizes = {area: [0, 0] for area in AREAS}
+    areas_of = {}
+    for diff in diffs:
+        hit = set()
+        for frame in diff.traceback:
+            if frame.filename not in areas_of:
+                areas_of[frame.filename] = [area for area, fragments in AREAS.items()
+                                            if any(fragment in frame.filename for fragment in fragments)]
+            hit.update(areas_of[frame.filename])
+        for area in hit:
+            sizes[area][0] += diff.size
+            sizes[area][1] += diff.size_diff
+    return sizes
+
+
+def _measure_watched():
+    """({name: value}, report lines) for the watched objects"""
+    values, lines = {}, []
+    for name, getter in {**_default_watches(), **_watched}.items():
+        try:
+            value, unit = _measure(getter)
+        except Exception as e:
+            lines.append(f"{name:<32} unavailable ({e})")
+            continue
+        values[name] = value
+        delta = value - _previous["watched"].get(name, value)
+        lines.append(f"{name:<32} {value:>12,} {unit} ({delta:+,})")
+    return values, lines
+
+
+def memory_snapshot(out_dir=PROFILE_DIR, top=40):
+    """Take a snapshot and write its diff against the previous one; returns the report path"""
+    with _snapshotting:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(MEMORY_FRAMES)
+            _previous["snapshot"] = tracemalloc.take_snapshot()
+            _previous["watched"] = _measure_watched()[0]
+            print(f"[MEMORY] tracemalloc started ({MEMORY_FRAMES} frames); "
+                  f"send the signal again later for a diff")
+            return None
+
+        snapshot = tracemalloc.take_snapshot()
+        previous = _previous["snapshot"]
+        stamp = _stamp()
+        os.makedirs(out_dir, exist_ok=True)
+        path = os.path.join(out_dir, f"memory_{stamp}.txt")
+        current, peak = tracemalloc.get_traced_memory()
+        # leave out tracemalloc's own bookkeeping
+        by_traceback = [d for d in snapshot.compare_to(previous, "traceback")
+                        if d.traceback[0].filename != tracemalloc.__file__]
+        by_line = [d for d in snapshot.compare_to(previous, "lineno")
+                   if d.traceback[0].filename != tracemalloc.__file__]
+
+        watched, watched_lines = _measure_watched()
+        lines = [f"traced {current / 1e6:.1f} MB (peak {peak / 1e6:.1f} MB)", "", "== watched objects =="]
+        lines += watched_lines
+
+        lines += ["", "== by area (tracebacks through) =="]
+        for area, (size, growth) in _area_sizes(by_traceback).items():
+            lines.append(f"{area:<32} {size:>12,} bytes ({growth:+,})")
+
+        lines += ["", f"== top {top} growth by line =="]
+        lines += [str(d) for d in by_line[:top]]
+
+        lines += ["", "== largest growth, full traceback =="]
+        for d in by_traceback[:3]:
+            lines.append(f"{d.size_diff:+,} bytes in {d.count_diff:+} blocks")
+            lines += ["    " + line for line in d.traceback.format()]
+
+        with open(path, "w") as f:
+            f.write("\n".join(lines) + "\n")
+        snapshot.dump(os.path.join(out_dir, f"memory_{stamp}.tracemalloc"))
+        _previous["snapshot"], _previous["watched"] = snapshot, watched
+        print(f"[MEMORY] traced {current / 1e6:.1f} MB, diff written to {path}")
+        return path
+
+
+# ─── Signals ──────────────────────────────────────────────────────────────────
+def _on_profile_signal(*_):
+    profile()
+
+
+def _on_memory_signal(*_):
+    threading.Thread(target=memory_snapshot, name="memory-snapshot", daemon=True).start()
+
+
+def install():
+    """Register the signal handlers; nothing else runs until one fires"""
+    for name in ("SIGPROF", "SIGINFO"):
+        if hasattr(signal, name):
+            signal.signal(getattr(signal, name), _on_profile_signal)
+    if hasattr(signal, "SIGVTALRM"):
+        signal.signal(signal.SIGVTALRM, _on_memory_signal)
+    if MEMORY_TRACE:
+        memory_snapshot()
+
+
+if __name__ == "__main__":
+    # self-check: profile a busy thread and a leaking list for a few seconds
+    leak = []
+    watch("demo leak", lambda: leak)
+
+    def busy():
+        end = time.time() + 2.5
+        while time.time() < end:
+            sum(i * i for i in range(2000))
+            leak.append(bytearray(1024))
+
+    memory_snapshot()
+    worker = threading.Thread(target=busy, name="busy")
+    worker.start()
+    _profile_worker(2.0)
+    worker.join()
+    memory_snapshot()
@@ -0,0 +1,298 @@
+import os
+import sys
+import time
+import wave
+import encoder
+import clients
+import metrics
+import tracing
+
+# ─── Mode-aware Recognition Config ────────────────────────────────────────────
+# A session is configured for what the user is about to say: short game answers
+# get phrase hints, single_utterance and no punctuation so the final comes back
+# quickly; free speech keeps punctuation and long-running recognition.
+
+SAMPLE_RATE = 16000
+
+LETTERS = [chr(c) for c in range(ord('A'), ord('Z') + 1)]
+
+MODE_CONFIGS = {
+    "idle": {
+        "phrases": ["play word", "play rock", "play number", "hey sentient"],
+        "boost": 5.0,
+        "single_utterance": False,
+        "punctuation": True,
+        "model": "default",
+    },
+    "conversation": {
+        "phrases": ["bye sentient", "stop"],
+        "boost": 5.0,
+        "single_utterance": False,
+        "punctuation": True,
+        "model": "default",
+    },
+    "assistant": {
+        # one question after the on-device wake word
+        "phrases": ["hey sentient"],
+        "boost": 5.0,
+        "single_utterance": True,
+        "punctuation": True,
+        "model": "default",
+    },
+    "wordle": {
+        "phrases": LETTERS + ["letter", "stop", "quit game"],
+        "boost": 15.0,
+        "single_utterance": True,
+        "punctuation": False,
+        "model": "command_and_search",
+    },
+    "rps": {
+        "phrases": ["rock", "paper", "scissors", "stop"],
+        "boost": 15.0,
+        "single_utterance": True,
+        "punctuation": False,
+        "model": "command_and_search",
+    },
+    "number": {
+        "phrases": ["$OPERAND", "stop"],
+        "boost": 15.0,
+        "single_utterance": True,
+        "punctuation": False,
+        "model": "command_and_search",
+    },
+}
+
+
+ENCODINGS = {"linear16": "LINEAR16", "flac": "FLAC", "ogg_opus": "OGG_OPUS"}
+
+_speech = None
+
+
+def sdk():
+    """google.cloud.speech, imported on first use (it pulls in gRPC and protobuf)"""
+    global _speech
+    if _speech is None:
+        from google.cloud import speech
+        _speech = speech
+    return _speech
+
+
+def build_streaming_config(mode, extra_phrases=(), sample_rate=SAMPLE_RATE, encoding=None):
+    """StreamingRecognitionConfig tuned for the given mode"""
+    speech = sdk()
+    settings = MODE_CONFIGS.get(mode, MODE_CONFIGS["idle"])
+    phrases = list(settings["phrases"]) + list(extra_phrases)
+    config = speech.RecognitionConfig(
+        encoding=getattr(speech.RecognitionConfig.AudioEncoding, ENCODINGS[(encoding or encoder.AUDIO_ENCODING).lower()]),
+        sample_rate_hertz=sample_rate,
+        language_code="en-US",
+        enable_automatic_punctuation=settings["punctuation"],
+        model=settings["model"],
+        speech_contexts=[speech.SpeechContext(phrases=phrases, boost=settings["boost"])],
+    )
+    return speech.StreamingRecognitionConfig(
+        config=config,
+        interim_results=True,
+        single_utterance=settings["single_utterance"],
+    )
+
+
+def build_baseline_config(sample_rate=SAMPLE_RATE):
+    """The fixed config every script used before mode switching, for comparison"""
+    speech = sdk()
+    config = speech.RecognitionConfig(
+        encoding=speech.RecognitionConfig.AudioEncoding.LINEAR16,
+        sample_rate_hertz=sample_rate,
+        language_code="en-US",
+        enable_automatic_punctuation=True,
+    )
+    return speech.StreamingRecognitionConfig(config=config, interim_results=True)
+
+
+# ─── Instrumentation ──────────────────────────────────────────────────────────
+# Every request pays protobuf framing plus a gRPC length prefix (5 bytes) and an
+# HTTP/2 DATA frame header (9 bytes) on top of its audio, and its build and
+# send cost on the generator thread. Short chunks lower time to first interim
+# at the price of more of both; report() shows the two side by side.
+
+GRPC_FRAMING = 5 + 9
+
+_last_mode = {}  # headset (None: a script's only one) -> mode of its previous session
+mode_stats = {}  # (engine, mode) -> {"sessions", "switches", "first_interim": [], "first_final": [], request counters}
+
+
+def _stats(mode, engine="google"):
+    return mode_stats.setdefault((engine, mode), {"sessions": 0, "switches": 0, "first_interim": [], "first_final": [],
+                                        "requests": 0, "payload_bytes": 0, "overhead_bytes": 0,
+                                        "request_seconds": 0.0})
+
+
+def request_overhead(request, payload_len):
+    """Bytes on the wire for one request beyond its audio payload"""
+    return len(sdk().StreamingRecognizeRequest.serialize(request)) - payload_len + GRPC_FRAMING
+
+
+class SessionTimer:
+    """Times one recognition session (of any engines.py engine) from stream open to first interim/final"""
+
+    def __init__(self, mode, engine="google", headset=None):
+        self.mode = mode
+        self.engine = engine
+        self.start = time.time()
+        self.first_interim = None
+        self.first_final = None
+        self.trace = tracing.Session(mode)
+        stats = _stats(mode, engine)
+        stats["sessions"] += 1
+        metrics.inc("speech_sessions_total", engine=engine, mode=mode)
+        previous = _last_mode.get(headset)
+        if mode != previous:
+            stats["switches"] += 1
+            metrics.inc("speech_mode_switches_total", engine=engine, mode=mode)
+            settings = MODE_CONFIGS.get(mode, MODE_CONFIGS["idle"])
+            print(f"[RECOG] config {previous or '-'} -> {mode} "
+                  f"(single_utterance={settings['single_utterance']}, "
+                  f"punctuation={settings['punctuation']}, hints={len(settings['phrases'])})")
+            _last_mode[headset] = mode
+
+    def requests(self, payloads):
+        """StreamingRecognizeRequests for the payloads, counting per-request overhead"""
+        stats = _stats(self.mode, self.engine)
+        speech = sdk()
+        for payload in payloads:
+            start = time.perf_counter()
+            request = speech.StreamingRecognizeRequest(audio_content=payload)
+            stats["requests"] += 1
+            stats["payload_bytes"] += len(payload)
+            stats["overhead_bytes"] += request_overhead(request, len(payload))
+            stats["request_seconds"] += time.perf_counter() - start
+            yield request
+
+    def on_result(self, is_final):
+        self.trace.result(is_final)
+        metrics.inc("speech_responses_total", engine=self.engine, mode=self.mode,
+                    kind="final" if is_final else "interim")
+        elapsed = time.time() - self.start
+        if self.first_interim is None:
+            self.first_interim = elapsed
+            _stats(self.mode, self.engine)["first_interim"].append(elapsed)
+        if is_final and self.first_final is None:
+            self.first_final = elapsed
+            _stats(self.mode, self.engine)["first_final"].append(elapsed)
+
+
+def _median(values):
+    if not values:
+        return float("nan")
+    ordered = sorted(values)
+    return ordered[len(ordered) // 2]
+
+
+def report():
+    """Per-engine and mode session counts, median time to first interim/final and request overhead"""
+    lines = ["engine    mode          sessions  switches  first interim  first final  requests  overhead/req  build/req"]
+    for (engine, mode), stats in mode_stats.items():
+        n = stats["requests"] or 1
+        sent = stats["payload_bytes"] + stats["overhead_bytes"]
+        share = stats["overhead_bytes"] / sent * 100 if sent else 0.0
+        lines.append(f"{engine:<9} {mode:<12} {stats['sessions']:>9} {stats['switches']:>9} "
+                     f"{_median(stats['first_interim']) * 1000:>12.0f}ms "
+                     f"{_median(stats['first_final']) * 1000:>10.0f}ms "
+                     f"{stats['requests']:>9} {stats['overhead_bytes'] / n:>7.0f}B {share:>3.1f}% "
+                     f"{stats['request_seconds'] / n * 1e6:>7.1f}us")
+    return "\n".join(lines)
+
+
+# ─── Fixture Comparison ───────────────────────────────────────────────────────
+# Recorded fixtures live in <dir>/<mode>/*.wav (16 kHz mono 16-bit). Each file is
+# streamed at real-time pace with the old fixed config and with the mode config.
+
+def _stream_fixture(client, streaming_config, path, chunk_frames=1600):
+    with wave.open(path, "rb") as wav:
+        chunks = []
+        while True:
+            data = wav.readframes(chunk_frames)
+            if not data:
+                break
+            chunks.append(data)
+    speech = sdk()
+    chunk_secs = chunk_frames / SAMPLE_RATE
+    audio_end = [None]
+
+    def requests():
+        for data in chunks:
+            yield speech.StreamingRecognizeRequest(audio_content=data)
+            time.sleep(chunk_secs)
+        audio_end[0] = time.time()
+
+    start = time.time()
+    first_interim = None
+    first_final = None
+    transcript = ""
+    for response in client.streaming_recognize(streaming_config, requests()):
+        for result in response.results:
+            if first_interim is None:
+                first_interim = time.time()
+            if result.is_final and first_final is None:
+                first_final = time.time()
+                transcript = result.alternatives[0].transcript
+    end = audio_end[0] or time.time()
+    return {
+        "requests": len(chunks),
+        "overhead_bytes": sum(request_overhead(speech.StreamingRecognizeRequest(audio_content=data), len(data))
+                              for data in chunks),
+        "first_interim": (first_interim - start) if first_interim else None,
+        "first_final": (first_final - start) if first_final else None,
+        # negative when the final arrived before the tail of the file was sent
+        "after_audio": (first_final - end) if first_final else None,
+        "transcript": transcript,
+    }
+
+
+def compare_modes(fixture_dir):
+    client = clients.speech_client()
+    print("mode         fixture                  baseline final  mode final  transcript")
+    for mode in sorted(os.listdir(fixture_dir)):
+        mode_dir = os.path.join(fixture_dir, mode)
+        if mode not in MODE_CONFIGS or not os.path.isdir(mode_dir):
+            continue
+        for name in sorted(f for f in os.listdir(mode_dir) if f.endswith(".wav")):
+            path = os.path.join(mode_dir, name)
+            base = _stream_fixture(client, build_baseline_config(), path)
+            tuned = _stream_fixture(client, build_streaming_config(mode), path)
+
+            def fmt(r):
+                return f"{r['first_final'] * 1000:.0f}ms" if r["first_final"] is not None else "none"
+
+            print(f"{mode:<12} {name:<24} {fmt(base):>14} {fmt(tuned):>11}  "
+                  f"{base['transcript']!r} -> {tuned['transcript']!r}")
+
+
+def chunk_sweep(path, mode="idle", chunk_ms_values=(20, 50, 100, 160, 250)):
+    """Stream one fixture at several chunk durations: overhead vs time to first interim"""
+    client = clients.speech_client()
+    config = build_streaming_config(mode)
+    with wave.open(path, "rb") as wav:
+        audio_secs = wav.getnframes() / wav.getframerate()
+    print(f"{path}: {audio_secs:.1f}s of audio, mode {mode}")
+    print("chunk   req/s  overhead B/s  overhead %  first interim  first final")
+    for chunk_ms in chunk_ms_values:
+        r = _stream_fixture(client, config, path, chunk_frames=SAMPLE_RATE * chunk_ms // 1000)
+        audio_bytes = audio_secs * SAMPLE_RATE * 2
+        share = r["overhead_bytes"] / (audio_bytes + r["overhead_bytes"]) * 100
+
+        def ms(v):
+            return f"{v * 1000:.0f}ms" if v is not None else "none"
+
+        print(f"{chunk_ms:>3}ms {r['requests'] / audio_secs:>7.1f} {r['overhead_bytes'] / audio_secs:>13.0f} "
+              f"{share:>10.2f}% {ms(r['first_interim']):>14} {ms(r['first_final']):>12}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 3 and sys.argv[1] == "--chunks":
+        chunk_sweep(sys.argv[2])
+    elif len(sys.argv) == 2:
+        compare_modes(sys.argv[1])
+    else:
+        print("usage: python recognition.py <fixture_dir> | --chunks <recording.wav>")
+        sys.exit(1)
@@ -0,0 +1,504 @@
+import os
+import sys
+import json
+import time
+import types
+import wave
+import asyncio
+import shutil
+import builtins
+import threading
+import argparse
+import tempfile
+import contextlib
+import collections
+import importlib.util
+import dsp
+import catalog
+import tracing
+from ring import AudioRing
+from audio import RING_SECONDS
+
+# ─── Offline Replay ───────────────────────────────────────────────────────────
+# Runs a script's real stream_speech_to_text loop against a WAV file, with
+# fakes standing in for PyAudio, Google Speech, DeepL, OpenAI and the serial
+# port, on a virtual clock:
+#
+#   * audio chunk k becomes available at (k + 1) * chunk duration; reading
+#     ahead of that moves the clock forward instead of waiting
+#   * time.sleep() and injected service latencies move the clock forward
+#   * recognition responses (from --responses) are released once the clock
+#     passes their "at" offset and the stream has pulled audio up to there
+#
+# Everything runs on the caller's thread, so the same inputs always give the
+# same report, and a run takes only as long as the CPU work.
+#
+#   python replay.py display.py clip.wav --responses clip.jsonl --lang ES
+#
+# --responses is JSON lines of {"at", "transcript", "is_final", "stability"};
+# a black-box event log works as-is (only its "result" events are used).
+
+BASE_TIME = 1_700_000_000.0
+_wall_time, _wall_sleep = time.time, time.sleep
+
+
+class VirtualClock:
+    def __init__(self):
+        self.elapsed = 0.0
+
+    def time(self):
+        return BASE_TIME + self.elapsed
+
+    def sleep(self, seconds):
+        self.elapsed += max(0.0, seconds)
+
+    def advance_to(self, elapsed):
+        self.elapsed = max(self.elapsed, elapsed)
+
+
+class WallClock:
+    """The same interface on real time, for threaded runs (several pipelines, one clock)"""
+
+    def __init__(self):
+        self.start = _wall_time()
+
+    @property
+    def elapsed(self):
+        return _wall_time() - self.start
+
+    def time(self):
+        return _wall_time()
+
+    def sleep(self, seconds):
+        _wall_sleep(max(0.0, seconds))
+
+    def advance_to(self, elapsed):
+        self.sleep(elapsed - self.elapsed)
+
+
+class Report:
+    def __init__(self, clock, keep=None):
+        self.clock = clock
+        self.lines = collections.deque(maxlen=keep)
+        self.counts = {}
+
+    def log(self, kind, text):
+        self.counts[kind] = self.counts.get(kind, 0) + 1
+        self.lines.append(f"{self.clock.elapsed:>9.3f}  {kind:<12} {text}")
+
+
+# ─── Fake microphone ──────────────────────────────────────────────────────────
+class _Tap:
+    """mic.reader() for the fakes: what chunks() hands out also goes into a ring, as captured audio does"""
+    ring = None
+
+    def reader(self, from_start=False):
+        """A new independent cursor into the audio handed out so far"""
+        if self.ring is None:
+            self.ring = AudioRing(seconds=RING_SECONDS, rate=self.rate)
+        return self.ring.reader(from_start=from_start)
+
+    def _captured(self, chunk):
+        if self.ring is not None:
+            self.ring.write(chunk)
+        return chunk
+
+    def _close_ring(self):
+        if self.ring is not None:
+            self.ring.close()
+            self.ring = None
+
+
+class ReplayMicrophone(_Tap):
+    """Serves a WAV file through the audio.Microphone interface on the virtual clock"""
+
+    def __init__(self, path, clock, chunk_ms=100, rate=dsp.OUT_RATE):
+        with wave.open(path, "rb") as wav:
+            if wav.getsampwidth() != 2:
+                raise ValueError(f"{path}: expected 16-bit PCM")
+            converter = dsp.CaptureConverter(wav.getframerate(), wav.getnchannels(), rate, agc=False)
+            self.pcm = converter.process(wav.readframes(wav.getnframes()))
+        self.clock = clock
+        self.rate = rate
+        self.chunk_ms = chunk_ms
+        self.chunk_frames = rate * chunk_ms // 1000
+        self.position = 0  # bytes handed out
+        self.active = False
+
+    @property
+    def exhausted(self):
+        return self.position >= len(self.pcm)
+
+    @property
+    def duration(self):
+        return len(self.pcm) / 2 / self.rate
+
+    def chunks(self, is_open=lambda: True):
+        if not self.active:
+            # like the real device, nothing is captured before the first session opens it
+            self.active = True
+            self.position = min(len(self.pcm), int(self.clock.elapsed * self.rate) * 2)
+        step = self.chunk_frames * 2
+        while not self.exhausted and is_open():
+            chunk = self.pcm[self.position:self.position + step]
+            self.position += len(chunk)
+            self.clock.advance_to(self.position / 2 / self.rate)
+            yield self._captured(chunk)
+
+    def close(self):
+        self.active = False
+        self._close_ring()
+
+    def report(self):
+        return f"Mic: replayed {self.position / 2 / self.rate:.1f}s of {self.duration:.1f}s"
+
+
+# ─── Fake Google Speech ───────────────────────────────────────────────────────
+class _Fields:
+    def __init__(self, **kwargs):
+        self.__dict__.update(kwargs)
+
+
+class _Recognizer:
+    """Plays recorded responses back into whichever stream is open at their time"""
+
+    def __init__(self, responses, report):
+        self._responses = iter(responses)  # sorted by "at"; may be endless
+        self.next = next(self._responses, None)
+        self.report = report
+        self.missed = 0
+        self.uploaded = 0
+
+    def stream(self, config, requests):
+        settings = config.config
+        self.report.log("stream", f"open model={getattr(settings, 'model', 'default')} "
+                                  f"single_utterance={getattr(config, 'single_utterance', False)}")
+        # responses whose moment passed while no stream was open were never produced
+        while self.next is not None and self.next["at"] < self.report.clock.elapsed:
+            self.report.log("missed", repr(self.next["transcript"]))
+            self.missed += 1
+            self.next = next(self._responses, None)
+        try:
+            yield from self._respond(config, iter(requests))
+        finally:
+            # also reached when the script stops reading after a mode switch
+            self.report.log("stream", "closed")
+
+    def _respond(self, config, requests):
+        open_ = True
+        while open_ and self.next is not None:
+            r = self.next
+            while self.report.clock.elapsed < r["at"]:
+                request = next(requests, None)
+                if request is None:
+                    open_ = False
+                    break
+                self.uploaded += len(request.audio_content)
+            if not open_:
+                break
+            self.next = next(self._responses, None)
+            final = bool(r.get("is_final"))
+            self.report.log("result", f"{'final  ' if final else 'interim'} {r['transcript']!r}")
+            result = _Fields(alternatives=[_Fields(transcript=r["transcript"], confidence=0.0)],
+                             is_final=final, stability=r.get("stability", 0.0))
+            yield _Fields(results=[result])
+            if final and getattr(config, "single_utterance", False):
+                break
+        else:
+            # nothing left to say: keep draining audio until the VAD ends the stream
+            for request in requests:
+                self.uploaded += len(request.audio_content)
+
+
+def _fake_speech(recognizer):
+    speech = types.ModuleType("google.cloud.speech")
+
+    class AudioEncoding:
+        LINEAR16, FLAC, OGG_OPUS = 1, 2, 6
+
+    class RecognitionConfig(_Fields):
+        pass
+
+    RecognitionConfig.AudioEncoding = AudioEncoding
+
+    class StreamingRecognizeRequest(_Fields):
+        def __init__(self, audio_content=b"", **kwargs):
+            super().__init__(audio_content=audio_content, **kwargs)
+
+        @staticmethod
+        def serialize(request):
+            n, varint = len(request.audio_content), bytearray()
+            while True:
+                varint.append((n & 0x7F) | (0x80 if n > 0x7F else 0))
+                n >>= 7
+                if not n:
+                    break
+            return b"\x12" + bytes(varint) + request.audio_content
+
+    class SpeechClient:
+        def streaming_recognize(self, config, requests):
+            return recognizer.stream(config, requests)
+
+    class SpeechAsyncClient:
+        """The asyncio API: the first request carries the config; the recognizer runs on a thread"""
+
+        async def streaming_recognize(self, requests=None, **kwargs):
+            loop = asyncio.get_running_loop()
+            requests = requests.__aiter__()
+            config = (await requests.__anext__()).streaming_config
+            responses = asyncio.Queue()
+
+            def audio():
+                while True:
+                    try:
+                        yield asyncio.run_coroutine_threadsafe(requests.__anext__(), loop).result()
+                    except (StopAsyncIteration, RuntimeError):
+                        return
+
+            def run():
+                try:
+                    for response in recognizer.stream(config, audio()):
+                        loop.call_soon_threadsafe(responses.put_nowait, response)
+                finally:
+                    with contextlib.suppress(RuntimeError):  # the loop may be gone already
+                        loop.call_soon_threadsafe(responses.put_nowait, None)
+
+            threading.Thread(target=run, name="fake-speech", daemon=True).start()
+
+            async def results():
+                while (response := await responses.get()) is not None:
+                    yield response
+            return results()
+
+    speech.RecognitionConfig = RecognitionConfig
+    speech.StreamingRecognitionConfig = type("StreamingRecognitionConfig", (_Fields,), {})
+    speech.SpeechContext = type("SpeechContext", (_Fields,), {})
+    speech.StreamingRecognizeRequest = StreamingRecognizeRequest
+    speech.SpeechClient = SpeechClient
+    speech.SpeechAsyncClient = SpeechAsyncClient
+    return speech
+
+
+# ─── Fake DeepL, OpenAI, serial, PyAudio ──────────────────────────────────────
+def _fake_deepl(report, latency):
+    deepl = types.ModuleType("deepl")
+
+    class Translator:
+        def __init__(self, auth_key=None, **kwargs):
+            pass
+
+        def translate_text(self, text, target_lang=None, **kwargs):
+            report.clock.sleep(latency)
+            if not isinstance(text, str):  # a batch: one request, one result per text
+                report.log("translation", f"{len(text)} texts")
+                return [_Fields(text=f"<{target_lang}> {t}") for t in text]
+            translated = f"<{target_lang}> {text}"
+            report.log("translation", repr(translated))
+            return _Fields(text=translated)
+
+    deepl.Translator = Translator
+    return deepl
+
+
+def _fake_openai(report, latency):
+    openai = types.ModuleType("openai")
+
+    class Completions:
+        def create(self, model=None, messages=(), **kwargs):
+            report.clock.sleep(latency)
+            question = messages[-1]["content"] if messages else ""
+            answer = f"(answer to: {question})"
+            report.log("llm", f"{question!r} -> {answer!r}")
+            return _Fields(choices=[_Fields(message=_Fields(content=answer))])
+
+    class OpenAI:
+        def __init__(self, api_key=None, **kwargs):
+            self.chat = _Fields(completions=Completions())
+
+    openai.OpenAI = OpenAI
+    return openai
+
+
+def _fake_serial(report):
+    serial = types.ModuleType("serial")
+
+    class Serial:
+        """Answers like arduino_display.ino: a Ready line for TEST, then ACK:<line>"""
+
+        def __init__(self, port=None, baudrate=9600, timeout=None, **kwargs):
+            self.baudrate = baudrate
+            self.timeout = timeout or 0.0
+            self.is_open = True
+            self._replies = []
+
+        @property
+        def in_waiting(self):
+            return sum(len(r) for r in self._replies)
+
+        def write(self, data):
+            # 10 bits per byte on the wire
+            report.clock.sleep(len(data) * 10 / self.baudrate)
+            for line in data.decode(errors="ignore").splitlines():
+                report.log("serial", repr(line))
+                if line == "TEST":
+                    self._replies.append(b"Arduino Nano Ready\n")
+                if not line.startswith("ACK:"):
+                    self._replies.append(f"ACK:{line}\n".encode())
+            return len(data)
+
+        def readline(self):
+            if self._replies:
+                return self._replies.pop(0)
+            report.clock.sleep(self.timeout)
+            return b""
+
+        def reset_input_buffer(self):
+            self._replies.clear()
+
+        def close(self):
+            self.is_open = False
+
+    serial.Serial = Serial
+    return serial
+
+
+def _fake_pyaudio():
+    pyaudio = types.ModuleType("pyaudio")
+    pyaudio.paInt16 = 8
+
+    class PyAudio:
+        def __init__(self):
+            raise RuntimeError("replay serves audio from the WAV file; the device is never opened")
+
+    pyaudio.PyAudio = PyAudio
+    return pyaudio
+
+
+def load_responses(path):
+    responses = []
+    with open(path) as f:
+        for line in f:
+            if not line.strip():
+                continue
+            event = json.loads(line)
+            if event.get("kind", "result") == "result":
+                responses.append(event)
+    return sorted(responses, key=lambda r: r["at"])
+
+
+# ─── Runner ───────────────────────────────────────────────────────────────────
+@contextlib.contextmanager
+def offline(report, recognizer=None, lang="ES", deepl_latency=0.0, llm_latency=0.0, verbose=False):
+    """Install the fakes and the virtual clock for the duration of the block"""
+    recognizer = recognizer or _Recognizer([], report)
+    google = types.ModuleType("google")
+    cloud = types.ModuleType("google.cloud")
+    speech = _fake_speech(recognizer)
+    google.cloud, cloud.speech = cloud, speech
+    dotenv = types.ModuleType("dotenv")
+    dotenv.load_dotenv = lambda *a, **k: False
+    fakes = {"google": google, "google.cloud": cloud, "google.cloud.speech": speech,
+             "deepl": _fake_deepl(report, deepl_latency), "openai": _fake_openai(report, llm_latency),
+             "serial": _fake_serial(report), "pyaudio": _fake_pyaudio(), "dotenv": dotenv}
+
+    saved_modules = {name: sys.modules.get(name) for name in fakes}
+    saved = (time.time, time.sleep, builtins.input, os.system)
+    sys.modules.update(fakes)
+    time.time, time.sleep = report.clock.time, report.clock.sleep
+    builtins.input = lambda prompt="": lang
+    os.system = lambda command: 0
+    sink = open(os.devnull, "w") if not verbose else None
+    # fake translations must not end up in the real catalog cache
+    saved_catalog_dir, catalog.CATALOG_DIR = catalog.CATALOG_DIR, tempfile.mkdtemp(prefix="replay-catalog-")
+    try:
+        with contextlib.redirect_stdout(sink) if sink else contextlib.nullcontext():
+            # recognition caches the speech module on first use, and engines its
+            # engines' clients, so both must see the fakes too
+            sys.modules.pop("recognition", None)
+            sys.modules.pop("engines", None)
+            yield
+    finally:
+        time.time, time.sleep, builtins.input, os.system = saved
+        shutil.rmtree(catalog.CATALOG_DIR, ignore_errors=True)
+        catalog.CATALOG_DIR = saved_catalog_dir
+        for name, previous in saved_modules.items():
+            if previous is None:
+                sys.modules.pop(name, None)
+            else:
+                sys.modules[name] = previous
+        sys.modules.pop("recognition", None)
+        sys.modules.pop("engines", None)
+        if sink:
+            sink.close()
+
+
+def load_script(script):
+    """Import a script by path (inside offline(), so its module-level setup hits the fakes)"""
+    path = os.path.abspath(script)
+    sys.path.insert(0, os.path.dirname(path))
+    spec = importlib.util.spec_from_file_location(os.path.splitext(os.path.basename(path))[0], path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def attach(module, mic, lang="ES"):
+    """What runs the script's pipeline on mic: a Headset where the script has one, else the module"""
+    if hasattr(module, "Headset"):
+        return module.Headset(lang, mic=mic)
+    module.mic = mic
+    if hasattr(module, "target_language"):
+        module.target_language = lang  # main() would have asked for it
+    return module
+
+
+def replay(script, wav_path, responses_path=None, lang="ES", chunk_ms=100,
+           deepl_latency=0.0, llm_latency=0.0, verbose=False):
+    clock = VirtualClock()
+    report = Report(clock)
+    mic = ReplayMicrophone(wav_path, clock, chunk_ms)
+    responses = load_responses(responses_path) if responses_path else []
+    recognizer = _Recognizer(responses, report)
+
+    wall = time.perf_counter()
+    with offline(report, recognizer, lang, deepl_latency, llm_latency, verbose):
+        pipeline = attach(load_script(script), mic, lang)
+        for setup in ("establish_connection", "setup_arduino"):
+            if hasattr(pipeline, setup):
+                getattr(pipeline, setup)()
+        while not mic.exhausted and getattr(pipeline, "streaming_active", True):
+            pipeline.stream_speech_to_text()
+        vad_report = pipeline.vad.report() if hasattr(pipeline, "vad") else ""
+    wall = time.perf_counter() - wall
+
+    out = [f"replay {os.path.basename(script)} <- {os.path.basename(wav_path)} ({mic.duration:.2f}s), "
+           f"{len(responses)} recorded responses",
+           "   t (s)   event        detail"]
+    out += report.lines
+    c = report.counts
+    out.append(f"summary: {c.get('stream', 0) // 2} streams, {c.get('result', 0)} results, "
+               f"{recognizer.missed} missed, {c.get('translation', 0)} translations, "
+               f"{c.get('llm', 0)} llm calls, {c.get('serial', 0)} serial frames, "
+               f"{recognizer.uploaded / 2 / mic.rate:.2f}s of audio uploaded")
+    if vad_report:
+        out.append(vad_report)
+    if tracing.summary():
+        out.append(tracing.report())
+    print("\n".join(out))
+    print(f"[replay] {mic.duration:.1f}s of audio in {wall:.2f}s wall ({mic.duration / max(wall, 1e-9):.0f}x real time)",
+          file=sys.stderr)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay a WAV (and recorded responses) through a script offline")
+    parser.add_argument("script", help="display.py, siri.py, test.py, mic_to_text.py, ...")
+    parser.add_argument("wav")
+    parser.add_argument("--responses", help="JSON lines of recognition results (or a black-box event log)")
+    parser.add_argument("--lang", default="ES", help="answer to the target language prompt")
+    parser.add_argument("--chunk-ms", type=int, default=100)
+    parser.add_argument("--deepl-latency", type=float, default=0.0, help="virtual seconds per translation")
+    parser.add_argument("--llm-latency", type=float, default=0.0, help="virtual seconds per LLM call")
+    parser.add_argument("--verbose", action="store_true", help="show the script's own output")
+    args = parser.parse_args()
+    replay(args.script, args.wav, args.responses, args.lang, args.chunk_ms,
+           args.deepl_latency, args.llm_latency, args.verbose)
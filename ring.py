@@ -0,0 +1,218 @@
+import sys
+import time
+import threading
+import numpy as np
+from multiprocessing import resource_tracker, shared_memory
+
+# ─── Shared Audio Ring ────────────────────────────────────────────────────────
+# The capture thread writes 16 kHz int16 audio once into a shared_memory ring;
+# any number of readers, in this process or another one attached by name,
+# consume it through their own cursor. read() copies the samples out, so the
+# writer can never change audio a consumer is still holding.
+#
+# Layout: an int64 header [write_pos, capacity, writing_pos, cursor_0 ..
+# cursor_N-1] followed by the sample ring. Positions count samples since the
+# ring was created and only grow, so lag is simply write_pos - cursor. The
+# writer moves writing_pos before it touches the samples and write_pos after,
+# so a read that raced a write can tell which of its samples were overwritten.
+# A reader that falls more than a ring behind has lost audio: it is moved up
+# to the oldest sample still held and the overrun is counted.
+#
+# Slots are claimed under a lock in the process that created the ring; a
+# process that attaches by name is handed a slot number the owner claimed
+# (claim()), as stages.py does for the recognize stage.
+
+SAMPLE_RATE = 16000
+MAX_READERS = 8
+_WRITE, _CAPACITY, _WRITING, _CURSORS = 0, 1, 2, 3
+FREE = -1
+CLAIMED = -2  # by claim(), for a reader yet to attach
+
+
+class AudioRing:
+    """Single-writer, multi-reader int16 ring in shared memory"""
+
+    def __init__(self, name=None, seconds=10.0, rate=SAMPLE_RATE, create=True, child=False):
+        self.rate = rate
+        header_bytes = (_CURSORS + MAX_READERS) * 8
+        if create:
+            capacity = int(seconds * rate)
+            self._shm = shared_memory.SharedMemory(name=name, create=True, size=header_bytes + capacity * 2)
+        elif sys.version_info >= (3, 13):
+            self._shm = shared_memory.SharedMemory(name=name, track=False)
+        else:
+            # before 3.13 an attaching process would unlink the block when it exits;
+            # a child of the owner (child=True) shares the owner's tracker instead
+            self._shm = shared_memory.SharedMemory(name=name)
+            if not child:
+                resource_tracker.unregister(self._shm._name, "shared_memory")
+        self._header = np.ndarray(_CURSORS + MAX_READERS, dtype=np.int64, buffer=self._shm.buf)
+        if create:
+            self._header[_WRITE] = self._header[_WRITING] = 0
+            self._header[_CAPACITY] = capacity
+            self._header[_CURSORS:] = FREE
+        self.capacity = int(self._header[_CAPACITY])
+        self._data = np.ndarray(self.capacity, dtype=np.int16, buffer=self._shm.buf, offset=header_bytes)
+        self.owner = create
+        self._claiming = threading.Lock()
+
+    @property
+    def name(self):
+        return self._shm.name
+
+    @property
+    def write_pos(self):
+        return int(self._header[_WRITE])
+
+    def write(self, chunk):
+        """Append int16 PCM bytes; readers see them once write_pos moves"""
+        x = np.frombuffer(chunk, dtype=np.int16)[-self.capacity:]
+        pos = self.write_pos
+        start = pos % self.capacity
+        first = min(len(x), self.capacity - start)
+        self._header[_WRITING] = pos + len(x)
+        self._data[start:start + first] = x[:first]
+        self._data[:len(x) - first] = x[first:]
+        self._header[_WRITE] = pos + len(x)
+
+    def claim(self):
+        """Reserve the first free cursor slot (owner only); returns its number"""
+        if not self.owner:
+            raise RuntimeError("only the process that created the audio ring can claim slots")
+        with self._claiming:
+            free = np.flatnonzero(self._header[_CURSORS:] == FREE)
+            if not len(free):
+                raise RuntimeError(f"audio ring has no free reader slot ({MAX_READERS} in use)")
+            slot = int(free[0])
+            self._header[_CURSORS + slot] = CLAIMED
+        return slot
+
+    def reader(self, slot=None, from_start=False):
+        """A reader on the given slot (claimed by the owner), or on a newly claimed one"""
+        return RingReader(self, self.claim() if slot is None else slot, from_start)
+
+    def lags(self):
+        """Samples behind the writer for every claimed slot"""
+        write = self.write_pos
+        cursors = self._header[_CURSORS:]
+        return {slot: write - int(c) for slot, c in enumerate(cursors) if c >= 0}
+
+    def close(self):
+        del self._header, self._data
+        self._shm.close()
+        if self.owner:
+            self._shm.unlink()
+
+
+class RingReader:
+    """One consumer's cursor into an AudioRing"""
+
+    def __init__(self, ring, slot, from_start=False):
+        self.ring = ring
+        self.slot = slot
+        start = max(0, ring.write_pos - ring.capacity) if from_start else ring.write_pos
+        ring._header[_CURSORS + slot] = start
+        self.overruns = 0
+        self.samples_lost = 0
+        self.max_lag = 0
+
+    @property
+    def cursor(self):
+        return int(self.ring._header[_CURSORS + self.slot])
+
+    def lag(self):
+        return self.ring.write_pos - self.cursor
+
+    def _catch_up(self):
+        lag = self.lag()
+        self.max_lag = max(self.max_lag, lag)
+        if lag > self.ring.capacity:
+            lost = lag - self.ring.capacity
+            self.overruns += 1
+            self.samples_lost += lost
+            self.ring._header[_CURSORS + self.slot] = self.cursor + lost
+            print(f"[RING] reader {self.slot} fell {lag / self.ring.rate:.2f}s behind, "
+                  f"skipped {lost / self.ring.rate:.2f}s")
+        return min(lag, self.ring.capacity)
+
+    def read(self, max_samples):
+        """Copies of up to max_samples unread samples (two arrays across the wrap)"""
+        available = min(self._catch_up(), max_samples)
+        if available <= 0:
+            return []
+        cap = self.ring.capacity
+        cursor = self.cursor
+        start = cursor % cap
+        first = min(available, cap - start)
+        parts = [self.ring._data[start:start + first].copy()]
+        if available > first:
+            parts.append(self.ring._data[:available - first].copy())
+        # a write that started while we copied may have lapped the cursor
+        lapped = int(self.ring._header[_WRITING]) - cap - cursor
+        if lapped > 0:
+            self.overruns += 1
+            self.samples_lost += min(lapped, available)
+            parts = _drop(parts, lapped)
+        self.ring._header[_CURSORS + self.slot] = cursor + available
+        return parts
+
+    def chunks(self, chunk_samples, is_open=lambda: True, poll=0.01):
+        """Yield chunk_samples of audio at a time as bytes, waiting for the writer"""
+        while is_open():
+            if self._catch_up() < chunk_samples:
+                time.sleep(poll)
+                continue
+            yield b"".join(view.tobytes() for view in self.read(chunk_samples))
+
+    def seek(self, position):
+        """Move the cursor to an absolute sample position still held by the ring"""
+        write = self.ring.write_pos
+        self.ring._header[_CURSORS + self.slot] = min(write, max(position, write - self.ring.capacity))
+
+    def release(self):
+        self.ring._header[_CURSORS + self.slot] = FREE
+
+    def report(self):
+        return (f"reader {self.slot}: lag {self.lag() / self.ring.rate * 1000:.0f}ms "
+                f"(max {self.max_lag / self.ring.rate * 1000:.0f}ms), "
+                f"{self.overruns} overruns, {self.samples_lost / self.ring.rate:.2f}s lost")
+
+
+def _drop(parts, n):
+    """parts without their first n samples"""
+    kept = []
+    for part in parts:
+        if n < len(part):
+            kept.append(part[n:])
+        n = max(0, n - len(part))
+    return kept
+
+
+# ─── Demo ─────────────────────────────────────────────────────────────────────
+# `python ring.py` writes noise in 20 ms periods while a fast and a slow
+# reader consume it; the slow one overruns and is caught up.
+
+def demo(seconds=3.0):
+    ring = AudioRing(seconds=0.5)
+    fast, slow = ring.reader(), ring.reader()
+    period = SAMPLE_RATE // 50
+    audio = np.random.default_rng(0).integers(-8000, 8000, int(seconds * SAMPLE_RATE), dtype=np.int16)
+    got = []
+    try:
+        for i in range(0, len(audio), period):
+            ring.write(audio[i:i + period].tobytes())
+            got.extend(fast.read(period))
+            if i % (period * 40) == 0:
+                slow.read(ring.capacity)
+        ok = np.array_equal(np.concatenate(got), audio)
+        print(f"fast reader intact: {ok}")
+        print(fast.report())
+        print(slow.report())
+    finally:
+        fast.release()
+        slow.release()
+        ring.close()
+
+
+if __name__ == "__main__":
+    demo(float(sys.argv[1]) if len(sys.argv) > 1 else 3.0)
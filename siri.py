@@ -1,32 +1,41 @@
 import os
-import re
 import time
 import sys
-import serial
 import threading
-from google.cloud import speech
-from dotenv import load_dotenv
-import deepl
-from openai import OpenAI
+import startup
+import commands
+import recognition
+import engines
+import audio
+from vad import VoiceActivityDetector
+import blackbox
+import tracing
+import metrics
+import profiler
+import clients
+import wakeword
 
-# Load environment variables
-load_dotenv()
-os.environ["GOOGLE_APPLICATION_CREDENTIALS"] = os.path.join(os.getcwd(), "googleKey.json")
-deepl_client = deepl.Translator(os.getenv("DEEPL_API_KEY"))
+# Service clients, built on first use
+deepl_client = clients.Lazy(clients.translator)
 
 # Arduino connection setup
 arduino_port = None  # Will be set during setup
 arduino_connected = False
 
 # Language selection
-target_language = input("Enter target language (e.g., 'ES' for Spanish, 'FR' for French): ").strip().upper()
+target_language = None  # set by main(): --lang, $TARGET_LANGUAGE or a prompt
 streaming_active = True
 
+# Assistant-only mode: nothing is streamed to the cloud until the on-device
+# wake word detector hears "hey sentient"; each session then answers one question
+ASSISTANT_ONLY = os.getenv("ASSISTANT_ONLY", "0") == "1"
+
 def setup_arduino():
     """Connect to Arduino Nano"""
+    import serial
     global arduino_port, arduino_connected
     
-    port = "/dev/cu.usbserial-10"
+    port = os.getenv("ARDUINO_PORT", "/dev/cu.usbserial-10")
     
     # Try to connect to any available port
     try:
@@ -64,6 +73,9 @@ def send_to_arduino(message):
         # Format message for Arduino (keep it short)
         formatted_message = f"{message[:50]}\n"  # Limit length and add newline
         arduino_port.write(formatted_message.encode())
+        metrics.inc("serial_bytes_total", len(formatted_message.encode()), direction="tx")
+        tracing.serial_write(formatted_message.strip())
+        blackbox.record("serial", payload=formatted_message.strip())
         return True
     except Exception as e:
         print(f"Arduino communication error: {e}")
@@ -77,9 +89,13 @@ def arduino_reader_thread():
     while arduino_connected and streaming_active:
         try:
             if arduino_port.in_waiting:
-                response = arduino_port.readline().decode('utf-8', errors='ignore').strip()
+                raw = arduino_port.readline()
+                metrics.inc("serial_bytes_total", len(raw), direction="rx")
+                response = raw.decode('utf-8', errors='ignore').strip()
                 if response:
                     print(f"📟 Arduino: {response}")
+                    if response.startswith("ACK:"):
+                        tracing.serial_ack(response[4:])
         except Exception as e:
             print(f"Error reading from Arduino: {e}")
             arduino_connected = False
@@ -99,76 +115,60 @@ def translate_text(text, target_language):
         return ""
 
     try:
+        tracing.mark("translation_requested")
         result = deepl_client.translate_text(text, target_lang=target_language)
+        tracing.mark("translation_returned")
+        blackbox.record("translation", source=text, text=result.text)
         return result.text
     except Exception as e:
         print(f"Translation error: {e}")
+        blackbox.record("translation_error", source=text, error=str(e))
         return "(Translation error)"
 
-llm = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+llm = clients.Lazy(clients.llm)
 def ask_openai_question(question):
     """Ask an OpenAI LLM question"""
     if not question or question.isspace():
         return "(Empty question detected)"
         
     try:
+        tracing.mark("llm_requested")
         response = llm.chat.completions.create(
             model="gpt-4o-mini",
             messages=[{"role": "user", "content": question}],
             temperature=0.7,
             max_tokens=150
         )
+        tracing.mark("llm_first_token")
         answer = response.choices[0].message.content.strip()
         return answer
     except Exception as e:
         print(f"OpenAI API error: {e}")
         return f"(OpenAI Error: {str(e)})"
 
-def stream_speech_to_text():
-    """Stream audio to Google Cloud Speech-to-Text API with Arduino integration"""
-    client = speech.SpeechClient()
-
-    config = speech.RecognitionConfig(
-        encoding=speech.RecognitionConfig.AudioEncoding.LINEAR16,
-        sample_rate_hertz=16000,
-        language_code="en-US", 
-        enable_automatic_punctuation=True,
-    )
-
-    streaming_config = speech.StreamingRecognitionConfig(
-        config=config,
-        interim_results=True 
-    )
-
-    def audio_generator():
-        import pyaudio
-
-        audio_interface = pyaudio.PyAudio()
-        audio_stream = audio_interface.open(
-            format=pyaudio.paInt16,
-            channels=1,
-            rate=16000,
-            input=True,
-            frames_per_buffer=1024,
-            stream_callback=None
-        )
-
-        time.sleep(0.5)
-        print("Stream active. Start speaking...")
+# The microphone stays open across recognition sessions; the VAD holds back
+# silence so only speech is uploaded
+mic = audio.Microphone()
+vad = VoiceActivityDetector()
+wake = None  # the wake word detector, loaded by main() when ASSISTANT_ONLY
 
-        while streaming_active:
-            data = audio_stream.read(4096, exception_on_overflow=False)
-            yield data
+def answer_question(question):
+    """Ask the LLM and show/send the answer"""
+    openai_response = ask_openai_question(question)
+    print("\n>>> OpenAI LLM Response:")
+    print(f"Question: {question}")
+    print(f"Answer: {openai_response}")
 
-        audio_stream.stop_stream()
-        audio_stream.close()
-        audio_interface.terminate()
+    # Send OpenAI response to Arduino
+    send_to_arduino(f"A:{openai_response[:50]}")  # Send with 'A:' prefix for AI response
 
-    audio_generator_instance = audio_generator()
-    requests = (speech.StreamingRecognizeRequest(audio_content=content)
-                for content in audio_generator_instance)
+def stream_speech_to_text():
+    """Stream audio to Google Cloud Speech-to-Text API with Arduino integration"""
+    global streaming_active
+    session_mode = "assistant" if ASSISTANT_ONLY else "idle"
 
-    responses = client.streaming_recognize(streaming_config, requests)
+    session_open = True
+    chunks = mic.chunks(lambda: streaming_active and session_open)
 
     last_transcript = ""
     last_update_time = time.time()
@@ -180,12 +180,18 @@ def stream_speech_to_text():
         print(">>> Listening in real-time (Press Ctrl+C to stop)...")
         print("Speak now...")
 
-        for response in responses:
-            if not response.results:
-                continue
-
-            result = response.results[0]
-            transcript = result.alternatives[0].transcript
+        # Only open the recognition stream once someone speaks (or, in
+        # assistant-only mode, says the wake word); the VAD gate ends it again
+        # after a long silence
+        if ASSISTANT_ONLY:
+            print("Say 'Hey Sentient' to ask a question...")
+            if not wake.wait(chunks):
+                return
+            print(">>> Wake word heard, listening for your question...")
+        elif not vad.wait_for_speech(chunks):
+            return
+        for result in engines.stream(session_mode, vad.gate(chunks), vad):
+            transcript = result.text
 
             current_time = time.time()
             if (transcript != last_transcript and 
@@ -199,19 +205,20 @@ def stream_speech_to_text():
                 if result.is_final:
                     send_to_arduino(f"T:{transcript[:50]}")  # Send with 'T:' prefix for transcript
                 
-                trigger_pattern = r'^\s*hey\s*,?\s*sentient\b'
-                if re.search(trigger_pattern, transcript, re.IGNORECASE):
+                cmd = commands.route("idle", transcript)
+                if session_mode == "assistant":
+                    # the wake word was heard locally; the whole utterance is the question
+                    if result.is_final:
+                        question = cmd.slots["question"] if cmd.intent == "hey_sentient" else transcript
+                        if question.strip():
+                            answer_question(question.strip())
+                        return
+                elif cmd.intent == "hey_sentient":
                     if result.is_final:
-                        openai_question = re.sub(trigger_pattern, '', transcript, flags=re.IGNORECASE).strip()[2:]
+                        openai_question = cmd.slots["question"].strip()
                         
                         if openai_question:
-                            openai_response = ask_openai_question(openai_question)
-                            print("\n>>> OpenAI LLM Response:")
-                            print(f"Question: {openai_question}")
-                            print(f"Answer: {openai_response}")
-                            
-                            # Send OpenAI response to Arduino
-                            send_to_arduino(f"A:{openai_response[:50]}")  # Send with 'A:' prefix for AI response
+                            answer_question(openai_question)
                         else:
                             print("\n>>> Waiting for question after 'Hey Sentient'...")
                 else:
@@ -227,23 +234,41 @@ def stream_speech_to_text():
 
     except KeyboardInterrupt:
         print("\nStream closed by user.")
+        streaming_active = False
     except Exception as e:
         print(f"Error in streaming: {e}")
         import traceback
         traceback.print_exc()  
-    finally:
-        global streaming_active
         streaming_active = False
+    finally:
+        session_open = False
 
 def main():
-    global arduino_connected
+    global target_language, arduino_connected, wake
+    startup.mark("imports")
+    startup.configure()
+    args = startup.parser("Speech translation with the Sentient assistant on the Arduino display").parse_args()
+    target_language = startup.target_language(args.lang)
+    engine = engines.select(args.recognizer)
+    startup.mark("configuration")
     
     print("Google Cloud Speech-to-Text & Translation with Arduino Integration")
     print("-------------------------------------------------------------")
     print(f"Source language: English | Target language: {target_language}")
     
-    # Setup Arduino connection
-    arduino_connected = setup_arduino()
+    # the Arduino's reset, the mic and the service connections warm up at once
+    tasks = {
+        "display": setup_arduino,
+        "mic": mic.open,
+        "speech": engine.warm_up,
+        "deepl": lambda: startup.connect(deepl_client, "get_usage"),
+        "openai": lambda: startup.connect(llm, "models.list"),
+    }
+    if ASSISTANT_ONLY:
+        tasks["wake word"] = wakeword.WakeWordDetector.from_dir
+    ready = startup.warm_up(tasks)
+    arduino_connected = bool(ready["display"])
+    wake = ready.get("wake word")
     
     if arduino_connected:
         # Start Arduino reader thread
@@ -253,13 +278,17 @@ def main():
         
         # Send initial message
         send_to_arduino(f"LANG:{target_language}")
-    
-    print("Starting in 3 seconds...")
-    time.sleep(3)
+    print(startup.report())
 
+    blackbox.start(mic)
+    tracing.start()
+    metrics.serve()
+    profiler.watch("serial input buffer", lambda: arduino_port.in_waiting if arduino_connected else 0)
+    profiler.install()
     try:
         clear_console()
-        stream_speech_to_text()
+        while streaming_active:
+            stream_speech_to_text()
     except KeyboardInterrupt:
         print("\nProgram terminated by user.")
     except Exception as e:
@@ -270,6 +299,15 @@ def main():
         if arduino_connected and arduino_port:
             send_to_arduino("QUIT")
             arduino_port.close()
+        blackbox.stop()
+        mic.close()
+        print(vad.report())
+        print(recognition.report())
+        print(mic.report())
+        print(tracing.report())
+        tracing.stop()
+        if wake:
+            print(wake.report())
         print("Program finished.")
 
 if __name__ == "__main__":
@@ -0,0 +1,369 @@
+import os
+import sys
+import time
+import random
+import argparse
+import itertools
+import threading
+import collections
+import numpy as np
+import replay
+
+# ─── Soak Test ────────────────────────────────────────────────────────────────
+# Runs a script's real stream_speech_to_text loop for hours against an
+# endless synthetic conversation: captions to translate, "hey sentient"
+# turns, and whole Wordle / rock-paper-scissors / number games, each phrase
+# as word-by-word interims and a final. Pauses between phrases are sometimes
+# long enough for the VAD to end the stream, so sessions keep restarting.
+#
+#   python soak.py display.py --duration 4h --speed 50
+#
+# Everything runs on replay.py's fakes and virtual clock, paced at --speed
+# times real time (0 runs flat out). Every --sample-every wall seconds the
+# driver records RSS, thread count, open file descriptors and the wall time
+# the script spent handling each final result. At the end the last quarter
+# of the run is compared with the first quarter (after --warmup) and the run
+# fails if any of them kept growing past its slack:
+#
+#   rss         +16 MB       threads      +1
+#   open fds    +2           dispatch p50 +50% and at least +1 ms
+
+_real_sleep = time.sleep
+
+CAPTIONS = [
+    "hello there how are you",
+    "I was thinking we could grab lunch after class today",
+    "where is the engineering research center",
+    "this demo translates everything I say",
+    "the library closes at midnight on weekdays",
+    "can you say that one more time",
+]
+QUESTIONS = [
+    "what time is it",
+    "what's the weather like in Boulder",
+    "tell me a joke",
+    "how far is the student union from here",
+]
+LETTERS = "EARIOTNSLCUDPMHGBFYWKVXZJQ"
+MOVES = ["rock", "paper", "scissors", "rack", "sisters"]
+NUMBERS = ["fifty", "twenty five", "seventy five", "forty two", "ninety", "thirteen", "sixty one"]
+
+# name -> weight
+SCENARIOS = {"caption": 5, "conversation": 2, "wordle": 1, "rps": 1, "number": 1}
+
+
+# ─── Synthetic Conversation ───────────────────────────────────────────────────
+class SyntheticTranscripts:
+    """An endless timeline of phrases, read by the fake mic and the fake recognizer"""
+
+    def __init__(self, seed=0, word_seconds=0.3, scenarios=SCENARIOS, start=1.0):
+        self.rng = random.Random(seed)
+        self.word_seconds = word_seconds
+        self.scenarios = scenarios
+        self._phrases = self._plan()
+        self._utterances = {}  # index -> (start, end, phrase), kept until both readers pass it
+        self._made = 0
+        self._next_start = start
+        self._cursors = {"mic": 0, "recognizer": 0}
+
+    def _plan(self):
+        rng = self.rng
+        names, weights = list(self.scenarios), list(self.scenarios.values())
+        while True:
+            scenario = rng.choices(names, weights)[0]
+            if scenario == "caption":
+                yield rng.choice(CAPTIONS)
+            elif scenario == "conversation":
+                yield f"hey sentient {rng.choice(QUESTIONS)}"
+                for _ in range(rng.randint(0, 2)):
+                    yield rng.choice(QUESTIONS)
+                yield "bye sentient"
+            elif scenario == "wordle":
+                yield "play wordle"
+                yield from rng.sample(LETTERS, rng.randint(3, 9))
+                yield "stop"
+            elif scenario == "rps":
+                yield "play rock paper scissors"
+                yield from rng.choices(MOVES, k=rng.randint(2, 5))
+                yield "stop"
+            else:
+                yield "play number"
+                yield from rng.sample(NUMBERS, rng.randint(2, 5))
+                yield "stop"
+
+    def _utterance(self, index):
+        while self._made <= index:
+            phrase = next(self._phrases)
+            start = self._next_start
+            end = start + self.word_seconds * len(phrase.split()) + 0.2
+            self._utterances[self._made] = (start, end, phrase)
+            self._made += 1
+            # a third of the pauses outlast the VAD's idle timeout and end the stream
+            self._next_start = end + (self.rng.uniform(5.5, 8.0) if self.rng.random() < 0.33
+                                      else self.rng.uniform(1.2, 3.0))
+        return self._utterances[index]
+
+    def _advance(self, reader, index):
+        self._cursors[reader] = index
+        oldest = min(self._cursors.values())
+        for stale in [i for i in self._utterances if i < oldest]:
+            del self._utterances[stale]
+
+    def speaking(self, t):
+        """True while a phrase is being spoken at t (seconds, non-decreasing)"""
+        index = self._cursors["mic"]
+        while self._utterance(index)[1] < t:
+            index += 1
+        self._advance("mic", index)
+        return self._utterance(index)[0] <= t
+
+    def responses(self):
+        """Endless recognizer results in replay's response format"""
+        for index in itertools.count():
+            start, end, phrase = self._utterance(index)
+            self._advance("recognizer", index)
+            words = phrase.split()
+            for k in range(1, len(words)):
+                yield {"at": start + k * self.word_seconds, "transcript": " ".join(words[:k]),
+                       "is_final": False, "stability": 0.8}
+            yield {"at": end + 0.3, "transcript": phrase, "is_final": True, "stability": 0.0}
+
+
+class PacedClock(replay.VirtualClock):
+    """Virtual clock that keeps at most speed x ahead of the wall clock"""
+
+    def __init__(self, speed):
+        super().__init__()
+        self.speed = speed
+        self.wall_start = time.perf_counter()
+
+    def _pace(self):
+        if self.speed:
+            ahead = self.wall_start + self.elapsed / self.speed - time.perf_counter()
+            if ahead > 0:
+                _real_sleep(ahead)
+
+    def sleep(self, seconds):
+        super().sleep(seconds)
+        self._pace()
+
+    def advance_to(self, elapsed):
+        super().advance_to(elapsed)
+        self._pace()
+
+
+class SyntheticMicrophone(replay._Tap):
+    """audio.Microphone interface: noise-floor silence, and louder noise while a phrase is spoken"""
+
+    def __init__(self, transcripts, clock, duration, on_chunk=None, chunk_ms=100, rate=16000):
+        self.transcripts = transcripts
+        self.clock = clock
+        self.duration = duration
+        self.on_chunk = on_chunk
+        self.rate = rate
+        self.chunk_seconds = chunk_ms / 1000.0
+        rng = np.random.default_rng(0)
+        n = rate * chunk_ms // 1000
+        self.silence = (rng.normal(0, 20, n)).astype(np.int16).tobytes()
+        self.speech = (rng.normal(0, 4000, n)).astype(np.int16).tobytes()
+        self.position = 0.0  # seconds handed out
+        self.active = False
+
+    @property
+    def exhausted(self):
+        return self.clock.elapsed >= self.duration
+
+    def chunks(self, is_open=lambda: True):
+        if not self.active:
+            self.active = True
+            self.position = self.clock.elapsed
+        while not self.exhausted and is_open():
+            speaking = self.transcripts.speaking(self.position)
+            self.position += self.chunk_seconds
+            self.clock.advance_to(self.position)
+            if self.on_chunk:
+                self.on_chunk()
+            yield self._captured(self.speech if speaking else self.silence)
+
+    def close(self):
+        self.active = False
+        self._close_ring()
+
+    def report(self):
+        return f"Mic: {self.position:.0f}s of synthetic audio"
+
+
+class _TimedRecognizer(replay._Recognizer):
+    """Also records how long the script takes to handle each final result"""
+
+    def __init__(self, responses, report):
+        super().__init__(responses, report)
+        self.dispatch = collections.deque(maxlen=10000)  # seconds, drained by the monitor
+        self.finals = 0
+
+    def _respond(self, config, requests):
+        for response in super()._respond(config, requests):
+            if not response.results[0].is_final:
+                yield response
+                continue
+            start = time.perf_counter()
+            try:
+                yield response
+            finally:
+                # also reached when the script closes the stream after a command
+                self.dispatch.append(time.perf_counter() - start)
+                self.finals += 1
+
+
+# ─── Resource Monitor ─────────────────────────────────────────────────────────
+def rss_mb():
+    """Resident set size; the peak where /proc is missing (macOS)"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1e6
+    except OSError:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 1e6 if sys.platform == "darwin" else peak / 1e3
+
+
+def open_fds():
+    for path in ("/proc/self/fd", "/dev/fd"):
+        if os.path.isdir(path):
+            return len(os.listdir(path))
+    return -1
+
+
+class Monitor:
+    FIELDS = ("wall_s", "virtual_s", "rss_mb", "threads", "fds", "finals", "dispatch_p50_ms", "dispatch_p99_ms")
+
+    def __init__(self, clock, recognizer, every=60.0, log=sys.stderr):
+        self.clock = clock
+        self.recognizer = recognizer
+        self.every = every
+        self.log = log
+        self.samples = []
+        self._last = time.perf_counter()
+        self._start = self._last
+
+    def poll(self):
+        if time.perf_counter() - self._last >= self.every:
+            self.sample()
+
+    def sample(self):
+        self._last = time.perf_counter()
+        dispatch = [self.recognizer.dispatch.popleft() * 1000.0 for _ in range(len(self.recognizer.dispatch))]
+        p50, p99 = np.percentile(dispatch, [50, 99]) if dispatch else (float("nan"), float("nan"))
+        row = (self._last - self._start, self.clock.elapsed, rss_mb(), threading.active_count(), open_fds(),
+               self.recognizer.finals, p50, p99)
+        self.samples.append(row)
+        print(f"[SOAK] {row[0] / 60:6.1f} min wall  {row[1] / 3600:6.2f} h virtual  rss {row[2]:7.1f} MB  "
+              f"threads {row[3]:3d}  fds {row[4]:4d}  finals {row[5]:6d}  dispatch p50 {p50:6.2f} ms  "
+              f"p99 {p99:6.2f} ms", file=self.log, flush=True)
+
+    def write_csv(self, path):
+        with open(path, "w") as f:
+            f.write(",".join(self.FIELDS) + "\n")
+            for row in self.samples:
+                f.write(",".join(f"{v:.3f}" if isinstance(v, float) else str(v) for v in row) + "\n")
+
+
+# (field, absolute slack, relative slack)
+LIMITS = {"rss_mb": (16.0, 0.0), "threads": (1, 0.0), "fds": (2, 0.0), "dispatch_p50_ms": (1.0, 0.5)}
+
+
+def verdict(samples, warmup=0.1, limits=LIMITS):
+    """List of (field, first, last, ok) comparing the first and last quarter after warm-up"""
+    rows = samples[int(len(samples) * warmup):]
+    if len(rows) < 4:
+        return []
+    quarter = max(1, len(rows) // 4)
+    results = []
+    for field, (absolute, relative) in limits.items():
+        column = Monitor.FIELDS.index(field)
+        first = [r[column] for r in rows[:quarter] if r[column] == r[column]]
+        last = [r[column] for r in rows[-quarter:] if r[column] == r[column]]
+        if not first or not last:
+            continue
+        if field.startswith("dispatch"):
+            # latency is noisy: compare medians rather than extremes
+            base, now = float(np.median(first)), float(np.median(last))
+        else:
+            # growth must hold for the whole last quarter, not one spike
+            base, now = max(first), min(last)
+        results.append((field, base, now, now <= base * (1 + relative) + absolute))
+    return results
+
+
+# ─── Runner ───────────────────────────────────────────────────────────────────
+def parse_duration(text):
+    units = {"s": 1, "m": 60, "h": 3600}
+    if text[-1] in units:
+        return float(text[:-1]) * units[text[-1]]
+    return float(text)
+
+
+def soak(script, duration=3600.0, speed=50.0, sample_every=60.0, warmup=0.1, seed=0, lang="ES",
+         deepl_latency=0.15, llm_latency=0.8, csv_path=None):
+    """Returns True when nothing grew without bound"""
+    clock = PacedClock(speed)
+    report = replay.Report(clock, keep=200)
+    transcripts = SyntheticTranscripts(seed)
+    recognizer = _TimedRecognizer(transcripts.responses(), report)
+    monitor = Monitor(clock, recognizer, sample_every)
+    virtual = duration * speed if speed else duration
+    mic = SyntheticMicrophone(transcripts, clock, virtual, on_chunk=monitor.poll)
+    random.seed(seed)
+
+    print(f"[SOAK] {os.path.basename(script)}: {virtual / 3600:.1f} h of conversation at "
+          f"{speed:g}x real time" if speed else f"[SOAK] {os.path.basename(script)}: flat out", file=sys.stderr)
+    stopped = None
+    with replay.offline(report, recognizer, lang, deepl_latency, llm_latency):
+        pipeline = replay.attach(replay.load_script(script), mic, lang)
+        for setup in ("establish_connection", "setup_arduino"):
+            if hasattr(pipeline, setup):
+                getattr(pipeline, setup)()
+        monitor.sample()
+        while not mic.exhausted:
+            if not getattr(pipeline, "streaming_active", True):
+                stopped = "the script stopped streaming (see the last events below)"
+                break
+            pipeline.stream_speech_to_text()
+        monitor.sample()
+
+    if csv_path:
+        monitor.write_csv(csv_path)
+    print(f"[SOAK] {recognizer.finals} finals, {report.counts.get('stream', 0) // 2} streams, "
+          f"{report.counts.get('translation', 0)} translations, {report.counts.get('llm', 0)} llm calls, "
+          f"{report.counts.get('serial', 0)} serial frames", file=sys.stderr)
+    ok = stopped is None
+    if stopped:
+        print(f"[SOAK] FAIL: {stopped}", file=sys.stderr)
+        print("\n".join(list(report.lines)[-20:]), file=sys.stderr)
+    checks = verdict(monitor.samples, warmup)
+    if not checks:
+        print("[SOAK] too few samples to judge growth; run longer or lower --sample-every", file=sys.stderr)
+    for field, first, last, passed in checks:
+        print(f"[SOAK] {field:<16} first quarter {first:9.2f}  last quarter {last:9.2f}  "
+              f"{'ok' if passed else 'GROWING'}", file=sys.stderr)
+        ok = ok and passed
+    print(f"[SOAK] {'PASS' if ok else 'FAIL'}", file=sys.stderr)
+    return ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Soak a script with endless synthetic speech")
+    parser.add_argument("script", help="display.py, siri.py, test.py, mic_to_text.py, ...")
+    parser.add_argument("--duration", default="1h", help="wall time, e.g. 90s, 30m, 4h (default %(default)s)")
+    parser.add_argument("--speed", type=float, default=50.0, help="times real time; 0 runs flat out for --duration of virtual time")
+    parser.add_argument("--sample-every", type=float, default=60.0, help="wall seconds between samples")
+    parser.add_argument("--warmup", type=float, default=0.1, help="fraction of samples ignored at the start")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--lang", default="ES")
+    parser.add_argument("--deepl-latency", type=float, default=0.15, help="virtual seconds per translation")
+    parser.add_argument("--llm-latency", type=float, default=0.8, help="virtual seconds per LLM call")
+    parser.add_argument("--csv", help="write the samples here")
+    args = parser.parse_args()
+    passed = soak(args.script, parse_duration(args.duration), args.speed, args.sample_every, args.warmup,
+                  args.seed, args.lang, args.deepl_latency, args.llm_latency, args.csv)
+    sys.exit(0 if passed else 1)
@@ -0,0 +1,522 @@
+import os
+import sys
+import time
+import queue
+import signal
+import collections
+import multiprocessing as mp
+import numpy as np
+import metrics
+import startup
+import tracing
+from ring import AudioRing
+
+# ─── Process-isolated Stages ──────────────────────────────────────────────────
+# display.py's headset split across four processes, so a burst of CPU in one
+# stage (decoding a long LLM reply, a heavier VAD, rendering) cannot hold the
+# GIL while the microphone needs reading:
+#
+#   capture     mic → VAD; speech (with pre-roll and hangover) is written to a
+#               shared-memory AudioRing, onset/idle ring positions go on a queue
+#   recognize   the ring → Google streaming → Headset.handle_transcript: the
+#               games run here, next to the recognizer that needs their mode
+#   translate   DeepL captions and "hey Sentient" answers
+#   link        frames → the serial display, with its ACKs
+#
+#   python stages.py                       run the headset this way
+#   python stages.py --bench 30 --burn-ms 300 --kill recognize
+#                                          on fakes: a CPU-heavy translate
+#                                          stage and a crashed recognizer
+#
+# Frames and work items are small tuples on multiprocessing queues; traces
+# travel as tracing snapshots, so the link stage's report covers whole
+# utterances. As in pipeline.py, game frames wait for room on a full link
+# queue while captions and their translations are dropped. The supervisor
+# restarts a stage that exits, after a back-off of up to STAGES_RESTART_MAX
+# seconds; the queues and the speech ring outlive it, but a restarted
+# recognize stage starts its games over. Each stage serves its metrics on
+# METRICS_PORT + its index (capture 0, recognize 1, translate 2, link 3).
+
+STAGES_RESTART_MAX = float(os.getenv("STAGES_RESTART_MAX", "30"))
+STAGES_RING_SECONDS = float(os.getenv("STAGES_RING_SECONDS", "10"))
+STAGES_LINK_QUEUE = int(os.getenv("STAGES_LINK_QUEUE", "16"))
+STAGES_TRANSLATE_QUEUE = int(os.getenv("STAGES_TRANSLATE_QUEUE", "2"))
+STAGES_QUESTION_QUEUE = int(os.getenv("STAGES_QUESTION_QUEUE", "2"))
+POLL = 0.01  # seconds between looks at the ring when it has nothing new
+
+
+def _log(text):
+    print(f"[STAGES] {text}", file=sys.stderr, flush=True)
+
+
+# ─── Queues ───────────────────────────────────────────────────────────────────
+def _snapshot():
+    trace = tracing.current()
+    return trace.as_dict() if trace is not None else None
+
+
+def _put(q, item, stop):
+    """Wait for room, unless the stages are stopping"""
+    while not stop.is_set():
+        try:
+            q.put(item, timeout=0.2)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def _offer(q, item, name, evict=False):
+    """Put without waiting: a full queue drops its oldest item (evict) or this one"""
+    try:
+        q.put_nowait(item)
+        return True
+    except queue.Full:
+        pass
+    metrics.inc("pipeline_dropped_total", queue=name)
+    if not evict:
+        return False
+    try:
+        q.get_nowait()
+        q.put_nowait(item)
+        return True
+    except (queue.Empty, queue.Full):
+        return False
+
+
+def _get(q, stop):
+    """Next item; None once the stages are stopping and the queue is empty"""
+    while True:
+        try:
+            return q.get(timeout=0.2)
+        except queue.Empty:
+            if stop.is_set():
+                return None
+
+
+# ─── Capture Stage ────────────────────────────────────────────────────────────
+class _Gaps:
+    """How late each chunk reached the capture loop, beyond its own duration"""
+
+    def __init__(self, rate=16000):
+        self.rate = rate
+        self.late_ms = collections.deque(maxlen=10000)
+
+    def watch(self, chunks):
+        last, duration = None, 0.0
+        for chunk in chunks:
+            now = time.perf_counter()
+            if last is not None:
+                self.late_ms.append(max(0.0, now - last - duration) * 1000.0)
+            last, duration = now, len(chunk) / 2 / self.rate
+            yield chunk
+
+    def report(self):
+        if not self.late_ms:
+            return "capture gaps: no chunks"
+        p50, p99 = np.percentile(self.late_ms, [50, 99])
+        return (f"capture gaps over {len(self.late_ms)} chunks: p50 {p50:.1f}ms "
+                f"p99 {p99:.1f}ms max {max(self.late_ms):.1f}ms")
+
+
+def capture(ring_name, events, in_speech, stop, mic=None):
+    """Mic → VAD; speech into the shared ring, ("onset"|"idle", ring position) on events"""
+    import audio
+    from vad import VoiceActivityDetector
+
+    mic = mic or audio.Microphone()
+    vad = VoiceActivityDetector()
+    ring = AudioRing(ring_name, create=False, child=True)
+    gaps = _Gaps(ring.rate)
+    chunks = gaps.watch(mic.chunks(lambda: not stop.is_set()))
+    try:
+        while vad.wait_for_speech(chunks):
+            events.put(("onset", ring.write_pos))
+            for chunk in vad.gate(chunks):
+                ring.write(chunk)
+                in_speech.value = vad.in_speech
+            in_speech.value = False
+            events.put(("idle", ring.write_pos))
+    finally:
+        mic.close()
+        ring.close()
+    return f"{vad.report()}\n{gaps.report()}"
+
+
+# ─── Recognize Stage ──────────────────────────────────────────────────────────
+class SpeechFeed:
+    """The Microphone and VAD interfaces a Headset uses, over the capture stage's speech ring"""
+
+    def __init__(self, ring_name, slot, events, in_speech, stop, chunk_ms=100):
+        self.ring = AudioRing(ring_name, create=False, child=True)
+        self.reader = self.ring.reader(slot)
+        self.events = events
+        self.stop = stop
+        self._in_speech = in_speech
+        self.chunk_frames = self.ring.rate * chunk_ms // 1000
+        self.pending = collections.deque()
+        self.open_from = None  # ring position where the current utterance started
+        self.idle_at = None    # and where the capture stage's VAD closed it
+        self.utterances = 0
+
+    def _pull(self):
+        while True:
+            try:
+                self.pending.append(self.events.get_nowait())
+            except queue.Empty:
+                return
+
+    @property
+    def in_speech(self):
+        return bool(self._in_speech.value)
+
+    def chunks(self, is_open=lambda: True):
+        """Speech chunks from the ring, ending where the capture stage closed the utterance"""
+        while is_open() and not self.stop.is_set():
+            self._pull()
+            if self.idle_at is None and self.pending and self.pending[0][0] == "idle":
+                self.idle_at = self.pending.popleft()[1]
+            available = self.reader.lag()
+            if self.idle_at is not None:
+                available = min(available, self.idle_at - self.reader.cursor)
+                if available <= 0:
+                    return
+            if available >= self.chunk_frames or (self.idle_at is not None and available > 0):
+                yield b"".join(view.tobytes() for view in self.reader.read(min(available, self.chunk_frames)))
+            else:
+                time.sleep(POLL)
+
+    def wait_for_speech(self, chunks):
+        """True once an utterance is open (a stream ended mid-utterance carries on)"""
+        while not self.stop.is_set():
+            if self.open_from is not None and self.idle_at is None:
+                return True
+            self._pull()
+            while self.pending:
+                kind, position = self.pending.popleft()
+                if kind == "onset":
+                    # the tail of an utterance nobody was listening to is skipped
+                    self.open_from, self.idle_at = position, None
+                    self.reader.seek(max(position, self.reader.cursor))
+                    self.utterances += 1
+                    return True
+            time.sleep(POLL)
+        return False
+
+    def gate(self, chunks):
+        yield from chunks
+
+    def close(self):
+        self.reader.release()
+        self.ring.close()
+
+    def report(self):
+        return f"Speech feed: {self.utterances} utterances, {self.reader.report()}"
+
+
+def recognize(ring_name, slot, events, in_speech, frames, translations, questions, stop, lang, recognizer=None):
+    """A Headset on the speech ring; its frames and translations go to the other stages"""
+    import catalog
+    import commands
+    import display
+    import engines
+    import recognition
+
+    feed = SpeechFeed(ring_name, slot, events, in_speech, stop)
+    headset = display.Headset(lang, mic=feed, engine=engines.select(recognizer), console=False)
+    catalog.prepare(lang, display.deepl_client)  # the game screens are made here, so translate them here
+    headset.vad = feed
+
+    def send_to_arduino(prefix, text=""):
+        _put(frames, (prefix, text, _snapshot()), stop)
+
+    def caption(txt):
+        trace = _snapshot()
+        _offer(frames, ("T:", txt, trace), "link")
+        _offer(translations, (txt, trace), "translations", evict=True)
+
+    def handle_transcript(txt, is_final):
+        mode = headset.current_mode()
+        end = display.Headset.handle_transcript(headset, txt, is_final)
+        if is_final and mode == "idle":
+            cmd = commands.route("idle", txt)
+            if cmd.intent == "hey_sentient" and cmd.slots.get("question"):
+                _offer(questions, (cmd.slots["question"], _snapshot()), "questions", evict=True)
+        return end
+
+    headset.send_to_arduino, headset.caption, headset.handle_transcript = send_to_arduino, caption, handle_transcript
+    try:
+        while not stop.is_set():
+            headset.stream_speech_to_text()
+    finally:
+        headset.streaming_active = False
+        summary = feed.report()
+        feed.close()
+    return f"{summary}\n{recognition.report()}\n{tracing.report()}"
+
+
+# ─── Translate Stage ──────────────────────────────────────────────────────────
+def _burn(ms):
+    """Pure-Python CPU work that holds the GIL (bench only)"""
+    end = time.perf_counter() + ms / 1000.0
+    while time.perf_counter() < end:
+        sum(i * i for i in range(500))
+
+
+def translate(translations, questions, frames, stop, lang, burn_ms=0.0):
+    """DeepL captions and LLM answers on one worker thread each"""
+    import threading
+    import blackbox
+    import clients
+    import pipeline
+
+    translator, llm = clients.translator(), clients.llm()
+    done = collections.Counter()
+
+    def translate_worker():
+        while (item := _get(translations, stop)) is not None:
+            text, trace = item
+            tracing.bind(tracing.adopt(trace))
+            if not text.strip():
+                continue
+            try:
+                tracing.mark("translation_requested")
+                translated = translator.translate_text(text, target_lang=lang).text
+                tracing.mark("translation_returned")
+                blackbox.record("translation", source=text, text=translated)
+            except Exception as e:
+                print(f"[ERROR] Translation: {e}")
+                blackbox.record("translation_error", source=text, error=str(e))
+                translated = "(Translation error)"
+            if burn_ms:
+                _burn(burn_ms)
+            print(f"Translation: {translated}")
+            _offer(frames, ("R:", translated, _snapshot()), "link")
+            done["translations"] += 1
+
+    def answer_worker():
+        while (item := _get(questions, stop)) is not None:
+            question, trace = item
+            tracing.bind(tracing.adopt(trace))
+            try:
+                tracing.mark("llm_requested")
+                parts = []
+                stream = llm.chat.completions.create(
+                    model=pipeline.LLM_MODEL, stream=True, max_tokens=150,
+                    messages=[{"role": "system", "content": pipeline.SYSTEM_PROMPT},
+                              {"role": "user", "content": question}])
+                for chunk in stream:
+                    delta = chunk.choices[0].delta.content if chunk.choices else None
+                    if delta:
+                        if not parts:
+                            tracing.mark("llm_first_token")
+                        parts.append(delta)
+            except Exception as e:
+                print(f"[ERROR] OpenAI: {e}")
+                continue
+            _put(frames, ("A:", "".join(parts).strip(), _snapshot()), stop)
+            done["answers"] += 1
+
+    workers = [threading.Thread(target=worker, name=worker.__name__, daemon=True)
+               for worker in (translate_worker, answer_worker)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return f"Translate: {done['translations']} translations, {done['answers']} answers"
+
+
+# ─── Link Stage ───────────────────────────────────────────────────────────────
+def link(frames, stop, lang, port=None):
+    """Writes frames to the display until the stages stop and the queue is drained"""
+    import display
+
+    headset = display.Headset(lang, port=port or display.ARDUINO_PORT, console=False)
+    if headset.establish_connection():
+        headset.send_to_arduino("LANG:", lang)
+    else:
+        print("[WARN] Arduino not responding; frames are dropped.")
+    written = 0
+    try:
+        while (item := _get(frames, stop)) is not None:
+            prefix, text, trace = item
+            tracing.bind(tracing.adopt(trace))
+            headset.send_to_arduino(prefix, text)
+            written += 1
+    finally:
+        if headset.arduino and headset.arduino.is_open:
+            headset.send_to_arduino("QUIT")
+            headset.arduino.close()
+    tracing.stop()
+    return f"Link: {written} frames to {headset.port}\n{tracing.report()}"
+
+
+# ─── Supervisor ───────────────────────────────────────────────────────────────
+def _stage(name, target, args, kwargs, reports, metrics_port):
+    # Ctrl-C reaches the whole process group; the supervisor stops stages through their stop event
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    for arg in args:
+        if hasattr(arg, "cancel_join_thread"):
+            # frames still buffered when a stage exits are not worth hanging its exit for
+            arg.cancel_join_thread()
+    metrics.serve(metrics_port)
+    tracing.start()
+    reports.put((name, target(*args, **kwargs)))
+
+
+class Supervisor:
+    """Runs each stage in its own process and restarts the ones that exit"""
+
+    def __init__(self, context=None, metrics_port=None):
+        # spawn: forking a process that holds gRPC or PyAudio threads is not safe
+        self.context = context or mp.get_context("spawn")
+        self.stop_event = self.context.Event()
+        self.reports = self.context.Queue()
+        self.metrics_port = metrics.METRICS_PORT if metrics_port is None else metrics_port
+        self.stages = {}  # name -> (target, args, kwargs)
+        self.processes = {}
+        self.restarts = collections.Counter()
+        self._started = {}
+        self._backoff = {}
+        self._restart_at = {}
+
+    def add(self, name, target, *args, **kwargs):
+        self.stages[name] = (target, args, kwargs)
+        self._backoff[name] = 1.0
+        self._start(name)
+
+    def _start(self, name):
+        target, args, kwargs = self.stages[name]
+        port = self.metrics_port + list(self.stages).index(name) if self.metrics_port else 0
+        process = self.context.Process(target=_stage, name=f"stage-{name}", daemon=True,
+                                       args=(name, target, args, kwargs, self.reports, port))
+        process.start()
+        self.processes[name] = process
+        self._started[name] = time.monotonic()
+
+    def poll(self):
+        """Schedule and perform restarts of stages that died"""
+        now = time.monotonic()
+        for name, process in list(self.processes.items()):
+            if process.is_alive() or self.stop_event.is_set():
+                continue
+            if name not in self._restart_at:
+                if now - self._started[name] > STAGES_RESTART_MAX:
+                    self._backoff[name] = 1.0  # it had been running fine
+                _log(f"{name} exited with code {process.exitcode}; restarting in {self._backoff[name]:g}s")
+                self._restart_at[name] = now + self._backoff[name]
+                self._backoff[name] = min(self._backoff[name] * 2, STAGES_RESTART_MAX)
+            elif now >= self._restart_at[name]:
+                del self._restart_at[name]
+                self.restarts[name] += 1
+                self._start(name)
+
+    def run(self, seconds=None):
+        """Supervise for seconds, or until Ctrl-C"""
+        end = None if seconds is None else time.monotonic() + seconds
+        try:
+            while end is None or time.monotonic() < end:
+                self.poll()
+                time.sleep(0.2)
+        except KeyboardInterrupt:
+            _log("stopping")
+
+    def stop(self, timeout=10.0):
+        """Let every stage finish; returns {stage: its report}"""
+        self.stop_event.set()
+        reports = {}
+        end = time.monotonic() + timeout
+        while time.monotonic() < end:
+            try:
+                name, text = self.reports.get(timeout=0.2)
+                reports[name] = text
+            except queue.Empty:
+                if not any(p.is_alive() for p in self.processes.values()):
+                    break
+        for name, process in self.processes.items():
+            process.join(timeout=max(0.0, end - time.monotonic()))
+            if process.is_alive():
+                _log(f"{name} did not stop; terminating it")
+                process.terminate()
+        return reports
+
+
+def build(supervisor, lang, port=None, mic=None, recognizer=None, burn_ms=0.0):
+    """The four stages and what connects them; returns the speech ring, which the caller closes"""
+    context, stop = supervisor.context, supervisor.stop_event
+    ring = AudioRing(seconds=STAGES_RING_SECONDS)
+    events = context.Queue()
+    frames = context.Queue(STAGES_LINK_QUEUE)
+    translations = context.Queue(STAGES_TRANSLATE_QUEUE)
+    questions = context.Queue(STAGES_QUESTION_QUEUE)
+    in_speech = context.Value("b", 0, lock=False)
+    supervisor.add("capture", capture, ring.name, events, in_speech, stop, mic=mic)
+    supervisor.add("recognize", recognize, ring.name, ring.claim(), events, in_speech, frames, translations, questions,
+                   stop, lang, recognizer=recognizer)
+    supervisor.add("translate", translate, translations, questions, frames, stop, lang, burn_ms=burn_ms)
+    supervisor.add("link", link, frames, stop, lang, port=port)
+    return ring
+
+
+def _print_reports(supervisor, reports):
+    for name in supervisor.stages:
+        print(f"── {name} ({supervisor.restarts[name]} restarts) ──", file=sys.stderr)
+        print(reports.get(name, "(no report: the stage did not exit cleanly)"), file=sys.stderr)
+
+
+# ─── Main ─────────────────────────────────────────────────────────────────────
+def main(args):
+    target_language = startup.target_language(args.lang)
+    print("Speech→Text→Translation→Arduino + Games (one process per stage)")
+    supervisor = Supervisor()
+    ring = build(supervisor, target_language, recognizer=args.recognizer)
+    try:
+        supervisor.run()
+    finally:
+        reports = supervisor.stop()
+        ring.close()
+    _print_reports(supervisor, reports)
+
+
+# ─── Bench ────────────────────────────────────────────────────────────────────
+def bench(seconds=30.0, burn_ms=0.0, kill=None, seed=0):
+    """The stages on replay.py's fakes and soak.py's synthetic speech, in real time"""
+    import replay
+    import soak
+
+    clock = replay.WallClock()
+    report = replay.Report(clock, keep=200)
+    transcripts = soak.SyntheticTranscripts(seed, start=1.0)
+    recognizer = replay._Recognizer(transcripts.responses(), report)
+    mic = soak.SyntheticMicrophone(transcripts, clock, duration=float("inf"))
+    with replay.offline(report, recognizer, deepl_latency=0.15, llm_latency=0.8):
+        # fork, so the stages inherit the fakes and the shared clock
+        supervisor = Supervisor(mp.get_context("fork"), metrics_port=0)
+        ring = build(supervisor, "ES", mic=mic, burn_ms=burn_ms)
+        try:
+            if kill:
+                supervisor.run(seconds / 2)
+                _log(f"killing {kill}")
+                supervisor.processes[kill].kill()
+                supervisor.run(seconds / 2)
+            else:
+                supervisor.run(seconds)
+        finally:
+            reports = supervisor.stop()
+            ring.close()
+    _print_reports(supervisor, reports)
+
+
+if __name__ == "__main__":
+    # the stages inherit the environment, .env included
+    startup.configure()
+    parser = startup.parser("display.py's headset with one process per stage")
+    parser.add_argument("--bench", type=float, metavar="SECONDS", help="run on fakes for SECONDS")
+    parser.add_argument("--burn-ms", type=float, default=0.0, help="CPU burnt per translation (bench)")
+    parser.add_argument("--kill", choices=["capture", "recognize", "translate", "link"],
+                        help="kill this stage halfway through (bench)")
+    args = parser.parse_args()
+    if args.bench:
+        bench(args.bench, args.burn_ms, args.kill)
+    else:
+        main(args)
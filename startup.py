@@ -0,0 +1,131 @@
+import os
+import sys
+import time
+import argparse
+import threading
+
+# ─── Cold Start ───────────────────────────────────────────────────────────────
+# The scripts import without side effects: no prompt, no SDK clients, no
+# sleeps. main() takes its settings from the command line or the environment
+# and then warms up everything slow at once, one thread per task:
+#
+#   mic       open PyAudio and let the device settle (0.5 s)
+#   display   open the serial port and wait out the Arduino's reset (2 s)
+#   speech    the recognizer engine: the Speech SDK, client and gRPC channel,
+#             or the local engine's model
+#   deepl     build the DeepL client and make one request over its connection
+#   openai    build the OpenAI client and make one request over its connection
+#
+# report() breaks the cold start down into imports, configuration, and the
+# warm-up's wall time next to what its tasks would take one after another.
+#
+#   TARGET_LANGUAGE=ES   or --lang ES: no language prompt
+#   RECOGNIZER=local     or --recognizer local: the engines.py engine
+#   WARMUP_CONNECT=0     build the clients without the first requests
+
+WARMUP_CONNECT = os.getenv("WARMUP_CONNECT", "1") == "1"
+LANGUAGE_PROMPT = "Enter target language (e.g., 'ES' for Spanish, 'FR' for French): "
+
+_last = time.perf_counter()  # scripts import this module first
+_phases = {}                 # phase -> seconds, in order
+_tasks = {}                  # warm-up task -> seconds
+_lock = threading.Lock()
+
+
+def mark(phase):
+    """Charge the time since the previous mark to phase"""
+    global _last
+    now = time.perf_counter()
+    _phases[phase] = _phases.get(phase, 0.0) + now - _last
+    _last = now
+
+
+# ─── Configuration ────────────────────────────────────────────────────────────
+def configure():
+    """Load .env, point Google at googleKey.json and fall back from an upload encoder that can't be built"""
+    from dotenv import load_dotenv
+    import encoder
+
+    load_dotenv()
+    credentials = os.path.join(os.getcwd(), "googleKey.json")
+    if os.path.exists(credentials):
+        os.environ.setdefault("GOOGLE_APPLICATION_CREDENTIALS", credentials)
+    encoder.check()
+
+
+def parser(description):
+    """The options every script shares"""
+    p = argparse.ArgumentParser(description=description)
+    p.add_argument("--lang", default=os.getenv("TARGET_LANGUAGE"),
+                   help="target language, e.g. ES or FR (default $TARGET_LANGUAGE, else asked)")
+    p.add_argument("--recognizer", default=os.getenv("RECOGNIZER", "google"), choices=["google", "local", "scripted"],
+                   help="speech recognizer engine, see engines.py (default $RECOGNIZER, else google)")
+    return p
+
+
+def target_language(given=None):
+    return (given or input(LANGUAGE_PROMPT)).strip().upper()
+
+
+# ─── Warm-up ──────────────────────────────────────────────────────────────────
+def connect(client, call, *args):
+    """Build a lazy client and, with WARMUP_CONNECT, make one cheap request to open its connection"""
+    client = client.get() if hasattr(client, "get") else client
+    if WARMUP_CONNECT:
+        fn = client
+        for name in call.split("."):
+            fn = getattr(fn, name)
+        fn(*args)
+    return client
+
+
+def warm_up(tasks):
+    """Run {name: fn} on one thread each; returns {name: result} (None where fn raised)"""
+    results = {}
+
+    def run(name, fn):
+        start = time.perf_counter()
+        try:
+            results[name] = fn()
+        except Exception as e:
+            results[name] = None
+            print(f"[STARTUP] {name} warm-up failed: {e}")
+        with _lock:
+            _tasks[name] = time.perf_counter() - start
+
+    threads = [threading.Thread(target=run, args=item, name=f"warm-up-{item[0]}", daemon=True)
+               for item in tasks.items()]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    mark("warm-up")
+    return results
+
+
+def report():
+    total = sum(_phases.values())
+    lines = [f"Cold start: {total:.2f}s to ready"]
+    for phase, seconds in _phases.items():
+        line = f"  {phase:<16} {seconds:6.2f}s"
+        if phase == "warm-up" and _tasks:
+            line += f" (one after another: {sum(_tasks.values()):.2f}s)"
+        lines.append(line)
+        if phase == "warm-up":
+            lines += [f"    {name:<14} {seconds:6.2f}s" for name, seconds in
+                      sorted(_tasks.items(), key=lambda item: -item[1])]
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    # what importing each entry point costs, in a fresh interpreter each
+    import subprocess
+
+    here = os.path.dirname(os.path.abspath(__file__))
+    for script in sys.argv[1:] or ["display", "siri", "test", "mic_to_text", "pipeline", "stages"]:
+        code = f"import time; t = time.perf_counter(); import {script}; print(time.perf_counter() - t)"
+        result = subprocess.run([sys.executable, "-c", code], cwd=here, capture_output=True, text=True,
+                                stdin=subprocess.DEVNULL)
+        took = f"{float(result.stdout.split()[-1]) * 1000:7.0f}ms" if result.returncode == 0 else \
+            "failed: " + (result.stderr.strip().splitlines() or ["?"])[-1]
+        print(f"import {script:<12} {took}")
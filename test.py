@@ -1,20 +1,29 @@
 import os
-import re
 import time
 import sys
 import random
-from google.cloud import speech
-from dotenv import load_dotenv
-import deepl
-from openai import OpenAI
-
-load_dotenv()
-os.environ["GOOGLE_APPLICATION_CREDENTIALS"] = os.path.join(os.getcwd(), "googleKey.json")
-deepl_client = deepl.Translator(os.getenv("DEEPL_API_KEY"))
+import startup
+import commands
+from normalize import extract_letter, extract_number
+from phonetic import PhoneticIndex, RPS_MOVES
+import recognition
+import engines
+import audio
+from vad import VoiceActivityDetector
+import blackbox
+import tracing
+import metrics
+import profiler
+import clients
+import wordle
+
+deepl_client = clients.Lazy(clients.translator)
 
 #language we want to translate to
-target_language = input("Enter target language (e.g., 'ES' for Spanish, 'FR' for French): ").strip().upper()
+target_language = None  # set by main(): --lang, $TARGET_LANGUAGE or a prompt
 streaming_active = True
+engine = None  # None: the run's engines.get()
+converses = True  # "hey sentient" opens a conversation here, so pipeline.py asks no one-off questions
 
 # Conversation state management
 conversation_active = False
@@ -56,6 +65,7 @@ campus_places = [
     "SCRIPPS INSTITUTION",
     "BIRCH AQUARIUM",
 ]
+campus_index = PhoneticIndex(campus_places)
 
 
 def clear_console():
@@ -71,10 +81,14 @@ def translate_text(text, target_language):
         return ""
 
     try:
+        tracing.mark("translation_requested")
         result = deepl_client.translate_text(text, target_lang=target_language)
+        tracing.mark("translation_returned")
+        blackbox.record("translation", source=text, text=result.text)
         return result.text
     except Exception as e:
         print(f"Translation error: {e}")
+        blackbox.record("translation_error", source=text, error=str(e))
         return "(Translation error)"
 
 #handle conversation with OpenAI LLM
@@ -85,7 +99,7 @@ def handle_conversation(user_input):
         return "(Empty input detected)"
     
     # Check for conversation end
-    if re.search(r'\s*(bye\s*,?\s*sentient|stop)\b', user_input, re.IGNORECASE):
+    if commands.route("conversation", user_input).intent == "end_conversation":
         conversation_active = False
         conversation_history = []
         return "Goodbye! It was nice talking to you."
@@ -99,12 +113,14 @@ def handle_conversation(user_input):
             {"role": "system", "content": "You are a helpful and friendly AI assistant named Sentient. Engage in natural conversation while being helpful and concise."}
         ] + conversation_history
         
+        tracing.mark("llm_requested")
         response = llm.chat.completions.create(
             model="gpt-4o-mini",
             messages=messages,
             temperature=0.7,
             max_tokens=150
         )
+        tracing.mark("llm_first_token")
         answer = response.choices[0].message.content.strip()
         
         # Add assistant's response to conversation history
@@ -120,72 +136,187 @@ def handle_conversation(user_input):
         return f"(OpenAI Error: {str(e)})"
 
 #ask an OpenAI LLM question if transcript starts with "Hey Sentient"
-llm = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+llm = clients.Lazy(clients.llm)
 def ask_openai_question(question):
     
     if not question or question.isspace():
         return "(Empty question detected)"
         
     try:
+        tracing.mark("llm_requested")
         response = llm.chat.completions.create(
             model="gpt-4o-mini",
             messages=[{"role": "user", "content": question}],
             temperature=0.7,
             max_tokens=150
         )
+        tracing.mark("llm_first_token")
         answer = response.choices[0].message.content.strip()
         return answer
     except Exception as e:
         print(f"OpenAI API error: {e}")
         return f"(OpenAI Error: {str(e)})"
 
-#attach microphone input to the Google Cloud Speech-to-Text API
-def stream_speech_to_text():
+def current_mode():
+    """Name of the command-router / recognition mode for the current state"""
+    if conversation_active:
+        return "conversation"
+    if wordle_active:
+        return "wordle"
+    if rps_active:
+        return "rps"
+    if number_game_active:
+        return "number"
+    return "idle"
+
+def phrases(mode):
+    """Hints beyond the mode's own (the session config follows the game mode)"""
+    return campus_places if mode == "wordle" else ()
+
+#shows a transcript's translation; pipeline.py swaps in its asyncio translate stage
+def caption(transcript):
+    print(f"Translation: {translate_text(transcript, target_language)}")
+
+#test.py has no display: the frames pipeline.py sends to one are printed instead
+def send_to_arduino(prefix, text=""):
+    if prefix == "R:":
+        print(f"Translation: {text}")
+
+def handle_transcript(transcript, is_final):
+    """Screen, translation, commands and game moves for one transcript"""
     global wordle_active, conversation_active, rps_active, number_game_active
-    client = speech.SpeechClient()
-
-    config = speech.RecognitionConfig(
-        encoding=speech.RecognitionConfig.AudioEncoding.LINEAR16,
-        sample_rate_hertz=16000,
-        language_code="en-US", 
-        enable_automatic_punctuation=True,
-    )
-
-    streaming_config = speech.StreamingRecognitionConfig(
-        config=config,
-        interim_results=True 
-    )
-
-    def audio_generator():
-        import pyaudio
-
-        audio_interface = pyaudio.PyAudio()
-        audio_stream = audio_interface.open(
-            format=pyaudio.paInt16,
-            channels=1,
-            rate=16000,
-            input=True,
-            frames_per_buffer=1024,
-            stream_callback=None
-        )
 
-        time.sleep(0.5)
+    clear_console()
+    print(">>> Listening in real-time (Press Ctrl+C to stop)...")
+    if conversation_active:
+        print(">>> In conversation with Sentient (say 'bye, sentient' or 'stop' to end)")
+    elif wordle_active:
+        print(">>> Playing Wordle! Say letters to guess (say 'stop' to quit)")
+        print(get_wordle_status())
+    elif rps_active:
+        print(">>> Playing Rock Paper Scissors! Say 'rock', 'paper', or 'scissors' (say 'stop' to quit)")
+        print(get_rps_status())
+    elif number_game_active:
+        print(">>> Playing Number Guessing Game! Say a number between 1-100 (say 'stop' to quit)")
+        print(get_number_game_status())
+    else:
+        print(">>> Say 'hey, sentient' to chat, 'play word' for Wordle, 'play rock' for RPS, or 'play number' for Number Game")
+    print(f"Transcription: {transcript}")
+
+    # Only translate and show translation if not in game or conversation
+    if not conversation_active and not wordle_active and not rps_active and not number_game_active:
+        caption(transcript)
+
+    # Handle different modes when transcript is final OR looks complete (ends with punctuation)
+    transcript_looks_complete = transcript.strip().endswith(('.', '!', '?'))
+    if is_final or transcript_looks_complete:
+        if wordle_active:
+            # Handle Wordle game
+            cmd = commands.route("wordle", transcript)
+
+            # Check if user wants to quit wordle
+            if cmd.intent == "stop":
+                wordle_active = False
+                print("\n>>> Wordle game ended. Say 'play word' to start a new game.")
+                metrics.inc("game_events_total", game="wordle", event="stop")
+            else:
+                # Extract a single letter, including spoken names like "bee" or "why"
+                letter = extract_letter(cmd.text)
+                letters = [letter] if letter else []
+
+                # Otherwise the player may be calling out the whole place
+                place = None if letters else wordle.heard_place(campus_index, cmd.text)
+
+                if letters:
+                    print(f">>> Extracted letter: '{letters[0]}'")
+                    guess_result = handle_wordle_guess(letters[0])
+                    print(f">>> {guess_result}")
+                    if not wordle_active:
+                        print("\n>>> Game ended. Say 'play word' to start a new game.")
+                elif place:
+                    print(f">>> Heard place: '{place.phrase}' (confidence {place.confidence:.2f})")
+                    guess_result = handle_wordle_solve(place.value)
+                    print(f">>> {guess_result}")
+                    if not wordle_active:
+                        print("\n>>> Game ended. Say 'play word' to start a new game.")
+                else:
+                    print(">>> Please say a single letter to guess!")
 
-        print("Stream active. Start speaking...")
+        elif rps_active:
+            # Handle Rock Paper Scissors game
+            cmd = commands.route("rps", transcript)
+
+            # Check if user wants to quit RPS
+            if cmd.intent == "stop":
+                rps_active = False
+                print("\n>>> Rock Paper Scissors game ended. Say 'play rock' to start a new game.")
+                metrics.inc("game_events_total", game="rps", event="stop")
+            else:
+                # Fuzzy match so "rack" or "sisters" still counts as a move
+                move = RPS_MOVES.resolve(cmd.text)
+                if move:
+                    move_result = handle_rps_move(move.value)
+                    print(f">>> {move_result}")
+                else:
+                    print(">>> Please say 'rock', 'paper', or 'scissors'!")
 
-        while streaming_active:
-            data = audio_stream.read(4096, exception_on_overflow=False)
-            yield data
+        elif number_game_active:
+            # Handle Number Guessing game
+            cmd = commands.route("number", transcript)
+
+            # Check if user wants to quit number game
+            if cmd.intent == "stop":
+                number_game_active = False
+                print("\n>>> Number guessing game ended. Say 'play number' to start a new game.")
+                metrics.inc("game_events_total", game="number", event="stop")
+            else:
+                # Process the guess
+                guess_result = handle_number_guess(transcript)
+                print(f">>> {guess_result}")
+
+        elif not conversation_active:
+            cmd = commands.route("idle", transcript)
+
+            # Check for wordle start
+            if cmd.intent == "start_wordle":
+                start_wordle_game()
+
+            # Check for RPS start
+            elif cmd.intent == "start_rps":
+                start_rps_game()
+
+            # Check for Number Game start
+            elif cmd.intent == "start_number":
+                start_number_game()
+
+            # Check for conversation start
+            elif cmd.intent == "hey_sentient":
+                conversation_active = True
+                print("\n>>> Starting conversation with Sentient...")
+                response = handle_conversation("Hello!")
+                print(f"Sentient: {response}")
+        else:
+            # Continue conversation
+            response = handle_conversation(transcript)
+            print(f"Sentient: {response}")
 
-        audio_stream.stop_stream()
-        audio_stream.close()
-        audio_interface.terminate()
+            # Check if conversation just ended
+            if not conversation_active:
+                print("\n>>> Conversation ended. Say 'Hey Sentient' to chat, 'play word' for Wordle, 'play rock' for RPS, or 'play number' for Number Game.")
 
-    audio_generator_instance = audio_generator()
-    requests = (speech.StreamingRecognizeRequest(audio_content=content)
-                for content in audio_generator_instance)
+#the microphone stays open across recognition sessions; the VAD holds back
+#silence so only speech is uploaded
+mic = audio.Microphone()
+vad = VoiceActivityDetector()
 
-    responses = client.streaming_recognize(streaming_config, requests)
+#attach microphone input to the Google Cloud Speech-to-Text API
+#one call is one recognition session; it returns when the mode changes so the
+#next session can use the config for that mode
+def stream_speech_to_text():
+    global streaming_active
+    session_mode = current_mode()
+    session_open = True
+    chunks = mic.chunks(lambda: streaming_active and session_open)
 
     last_transcript = ""
     last_update_time = time.time()
@@ -210,195 +341,41 @@ def stream_speech_to_text():
         else:
             print(">>> Say 'hey, sentient' to chat, 'play word' for Wordle, 'play rock' for RPS, or 'play number' for Number Game")
 
-        for response in responses:
-            if not response.results:
-                continue
-
-            result = response.results[0]
-            transcript = result.alternatives[0].transcript
+        # Only open the recognition stream once someone speaks; the VAD gate
+        # ends it again after a long silence
+        if not vad.wait_for_speech(chunks):
+            return
+        for result in engines.stream(session_mode, vad.gate(chunks), vad, phrases(session_mode), engine=engine):
+            transcript = result.text
 
             current_time = time.time()
             if (transcript != last_transcript and 
                 (result.is_final or current_time - last_update_time >= update_cooldown)):
-
-                clear_console()
-                print(">>> Listening in real-time (Press Ctrl+C to stop)...")
-                if conversation_active:
-                    print(">>> In conversation with Sentient (say 'bye, sentient' or 'stop' to end)")
-                elif wordle_active:
-                    print(">>> Playing Wordle! Say letters to guess (say 'stop' to quit)")
-                    print(get_wordle_status())
-                elif rps_active:
-                    print(">>> Playing Rock Paper Scissors! Say 'rock', 'paper', or 'scissors' (say 'stop' to quit)")
-                    print(get_rps_status())
-                elif number_game_active:
-                    print(">>> Playing Number Guessing Game! Say a number between 1-100 (say 'stop' to quit)")
-                    print(get_number_game_status())
-                else:
-                    print(">>> Say 'hey, sentient' to chat, 'play word' for Wordle, 'play rock' for RPS, or 'play number' for Number Game")
-                print(f"Transcription: {transcript}")
-
-                # Only translate and show translation if not in game or conversation
-                if not conversation_active and not wordle_active and not rps_active and not number_game_active:
-                    translated_text = translate_text(transcript, target_language)
-                    print(f"Translation: {translated_text}")
-
-                # Handle different modes when transcript is final OR looks complete (ends with punctuation)
-                transcript_looks_complete = transcript.strip().endswith(('.', '!', '?'))
-                if result.is_final or transcript_looks_complete:
-                    if wordle_active:
-                        # Handle Wordle game
-                        # Clean transcript for better matching
-                        cleaned_transcript = re.sub(r'[^\w\s]', '', transcript).strip()
-                        
-                        # Check if user wants to quit wordle
-                        if re.search(r'\s*(quit\s*game|stop)\b', cleaned_transcript, re.IGNORECASE):
-                            wordle_active = False
-                            print("\n>>> Wordle game ended. Say 'play word' to start a new game.")
-                        else:
-                            # Extract single letter from transcript
-                            # Remove punctuation and extra spaces, then look for single letters
-                            letters = re.findall(r'\b[A-Za-z]\b', cleaned_transcript)
-                            
-                            # Special handling for common speech recognition issues
-                            if not letters:
-                                # Handle cases like "I," -> "I"
-                                if cleaned_transcript.upper() in ['I', 'A', 'O', 'U', 'E']:
-                                    letters = [cleaned_transcript.upper()]
-                                # Handle common speech recognition substitutions
-                                elif cleaned_transcript.lower() in ['oh', 'owe']:
-                                    letters = ['O']
-                                elif cleaned_transcript.lower() in ['ay', 'eh']:
-                                    letters = ['A']
-                                elif cleaned_transcript.lower() in ['bee']:
-                                    letters = ['B']
-                                elif cleaned_transcript.lower() in ['see', 'sea']:
-                                    letters = ['C']
-                                elif cleaned_transcript.lower() in ['dee']:
-                                    letters = ['D']
-                                elif cleaned_transcript.lower() in ['gee']:
-                                    letters = ['G']
-                                elif cleaned_transcript.lower() in ['jay']:
-                                    letters = ['J']
-                                elif cleaned_transcript.lower() in ['kay']:
-                                    letters = ['K']
-                                elif cleaned_transcript.lower() in ['pee']:
-                                    letters = ['P']
-                                elif cleaned_transcript.lower() in ['cue', 'queue', 'que']:
-                                    letters = ['Q']
-                                elif cleaned_transcript.lower() in ['are']:
-                                    letters = ['R']
-                                elif cleaned_transcript.lower() in ['tea', 'tee']:
-                                    letters = ['T']
-                                elif cleaned_transcript.lower() in ['you', 'yu']:
-                                    letters = ['U']
-                                elif cleaned_transcript.lower() in ['vee']:
-                                    letters = ['V']
-                                elif cleaned_transcript.lower() in ['why']:
-                                    letters = ['Y']
-                                elif cleaned_transcript.lower() in ['zee']:
-                                    letters = ['Z']
-                                # Handle single letters with trailing punctuation in original transcript
-                                elif len(transcript.strip()) <= 3:
-                                    letter_match = re.search(r'([A-Za-z])', transcript)
-                                    if letter_match:
-                                        letters = [letter_match.group(1)]
-                            
-                            if letters:
-                                print(f">>> Extracted letter: '{letters[0]}'")
-                                guess_result = handle_wordle_guess(letters[0])
-                                print(f">>> {guess_result}")
-                                if not wordle_active:
-                                    print("\n>>> Game ended. Say 'play word' to start a new game.")
-                            else:
-                                print(">>> Please say a single letter to guess!")
-                                
-                    elif rps_active:
-                        # Handle Rock Paper Scissors game
-                        # Clean transcript for better matching
-                        cleaned_transcript = re.sub(r'[^\w\s]', '', transcript).strip()
-                        
-                        # Check if user wants to quit RPS
-                        if re.search(r'\s*stop\b', cleaned_transcript, re.IGNORECASE):
-                            rps_active = False
-                            print("\n>>> Rock Paper Scissors game ended. Say 'play rock' to start a new game.")
-                        else:
-                            # Check for RPS moves
-                            if re.search(r'\brock\b', cleaned_transcript, re.IGNORECASE):
-                                move_result = handle_rps_move("rock")
-                                print(f">>> {move_result}")
-                            elif re.search(r'\bpaper\b', cleaned_transcript, re.IGNORECASE):
-                                move_result = handle_rps_move("paper")
-                                print(f">>> {move_result}")
-                            elif re.search(r'\bscissors\b', cleaned_transcript, re.IGNORECASE):
-                                move_result = handle_rps_move("scissors")
-                                print(f">>> {move_result}")
-                            else:
-                                print(">>> Please say 'rock', 'paper', or 'scissors'!")
-                                
-                    elif number_game_active:
-                        # Handle Number Guessing game
-                        # Clean transcript for better matching
-                        cleaned_transcript = re.sub(r'[^\w\s]', '', transcript).strip()
-                        
-                        # Check if user wants to quit number game
-                        if re.search(r'\s*stop\b', cleaned_transcript, re.IGNORECASE):
-                            number_game_active = False
-                            print("\n>>> Number guessing game ended. Say 'play number' to start a new game.")
-                        else:
-                            # Process the guess
-                            guess_result = handle_number_guess(transcript)
-                            print(f">>> {guess_result}")
-                                
-                    elif not conversation_active:
-                        # Clean transcript for better matching
-                        cleaned_transcript = re.sub(r'[^\w\s]', '', transcript).strip()
-                        
-                        # Check for wordle start
-                        if re.search(r'\bplay\s+word\b', cleaned_transcript, re.IGNORECASE):
-                            start_wordle_game()
-                            
-                        # Check for RPS start
-                        elif re.search(r'\bplay\s+rock\b', cleaned_transcript, re.IGNORECASE):
-                            start_rps_game()
-                            
-                        # Check for Number Game start
-                        elif re.search(r'\bplay\s+number\b', cleaned_transcript, re.IGNORECASE):
-                            start_number_game()
-                            
-                        # Check for conversation start
-                        elif re.search(r'\s*hey\s*,?\s*sentient\b.?\s*', cleaned_transcript, re.IGNORECASE):
-                            conversation_active = True
-                            print("\n>>> Starting conversation with Sentient...")
-                            response = handle_conversation("Hello!")
-                            print(f"Sentient: {response}")
-                    else:
-                        # Continue conversation
-                        response = handle_conversation(transcript)
-                        print(f"Sentient: {response}")
-                      
-                        # Check if conversation just ended
-                        if not conversation_active:
-                            print("\n>>> Conversation ended. Say 'Hey Sentient' to chat, 'play word' for Wordle, 'play rock' for RPS, or 'play number' for Number Game.")
-
+                handle_transcript(transcript, result.is_final)
                 last_transcript = transcript
                 last_update_time = current_time
 
+                # Restart recognition with the config for the new mode
+                if current_mode() != session_mode:
+                    return
+
     except KeyboardInterrupt:
         print("\nStream closed by user.")
+        streaming_active = False
     except Exception as e:
         print(f"Error in streaming: {e}")
         import traceback
         traceback.print_exc()  
-    finally:
-        global streaming_active
         streaming_active = False
+    finally:
+        session_open = False
 
 def start_wordle_game():
     """Start a new Wordle game with a random campus place"""
     global wordle_active, wordle_word, wordle_guessed, wordle_strikes, wordle_display
     
     wordle_active = True
+    metrics.inc("game_events_total", game="wordle", event="start")
     wordle_word = random.choice(campus_places).upper()
     wordle_guessed = []
     wordle_strikes = 0
@@ -422,6 +399,7 @@ def handle_wordle_guess(letter):
         return f"You already guessed '{letter}'. Try another letter!"
     
     wordle_guessed.append(letter)
+    metrics.inc("game_events_total", game="wordle", event="move")
     
     if letter in wordle_word:
         # Update display with correct letter
@@ -432,6 +410,7 @@ def handle_wordle_guess(letter):
         # Check if word is complete
         if '_' not in wordle_display:
             wordle_active = False
+            metrics.inc("game_events_total", game="wordle", event="win")
             return f"🎉 CONGRATULATIONS! You guessed it: {wordle_word}"
         else:
             return f"Good guess! {' '.join(wordle_display)}"
@@ -439,10 +418,19 @@ def handle_wordle_guess(letter):
         wordle_strikes += 1
         if wordle_strikes >= wordle_max_strikes:
             wordle_active = False
+            metrics.inc("game_events_total", game="wordle", event="loss")
             return f"💀 Game Over! The word was: {wordle_word}"
         else:
             return f"Strike {wordle_strikes}/{wordle_max_strikes}! Letter '{letter}' not found. {' '.join(wordle_display)}"
 
+def handle_wordle_solve(place):
+    """Handle a guess of the whole campus place in Wordle game"""
+    global wordle_active, wordle_strikes, wordle_display
+    
+    solved = wordle.solve(wordle_word, wordle_display, wordle_strikes, wordle_max_strikes, place)
+    wordle_active, wordle_strikes, wordle_display = solved.active, solved.strikes, solved.board
+    return solved.result
+
 def get_wordle_status():
     """Get current Wordle game status"""
     if not wordle_active:
@@ -454,6 +442,7 @@ def start_rps_game():
     global rps_active, rps_user_score, rps_computer_score
     
     rps_active = True
+    metrics.inc("game_events_total", game="rps", event="start")
     rps_user_score = 0
     rps_computer_score = 0
     
@@ -475,6 +464,7 @@ def handle_rps_move(move):
         return "Invalid choice. Please say 'rock', 'paper', or 'scissors'."
     
     computer_choice = random.choice(options)
+    metrics.inc("game_events_total", game="rps", event="move")
     result_msg = f"You chose: {move} | Computer chose: {computer_choice}\n"
     
     if move == computer_choice:
@@ -494,9 +484,11 @@ def handle_rps_move(move):
     if rps_user_score >= 3:
         rps_active = False
         result_msg += "\n🎉 YOU WIN THE GAME! Say 'play rock' to play again."
+        metrics.inc("game_events_total", game="rps", event="win")
     elif rps_computer_score >= 3:
         rps_active = False
         result_msg += "\n💀 COMPUTER WINS THE GAME! Say 'play rock' to play again."
+        metrics.inc("game_events_total", game="rps", event="loss")
     else:
         result_msg += "\nSay your next move!"
     
@@ -508,34 +500,12 @@ def get_rps_status():
         return ""
     return f"RPS Score - You: {rps_user_score} | Computer: {rps_computer_score}"
 
-def extract_number(text):
-    """Extract a number from the spoken text"""
-    # Look for number words or digits
-    number_words = {
-        'one': '1', 'two': '2', 'three': '3', 'four': '4', 'five': '5',
-        'six': '6', 'seven': '7', 'eight': '8', 'nine': '9', 'ten': '10',
-        'eleven': '11', 'twelve': '12', 'thirteen': '13', 'fourteen': '14', 'fifteen': '15',
-        'sixteen': '16', 'seventeen': '17', 'eighteen': '18', 'nineteen': '19',
-        'twenty': '20', 'thirty': '30', 'forty': '40', 'fifty': '50',
-        'sixty': '60', 'seventy': '70', 'eighty': '80', 'ninety': '90'
-    }
-    
-    # Convert word numbers to digits
-    text_lower = text.lower()
-    for word, digit in number_words.items():
-        text_lower = text_lower.replace(word, digit)
-    
-    # Find any numbers in the text
-    numbers = re.findall(r'\d+', text_lower)
-    if numbers:
-        return int(numbers[0])
-    return None
-
 def start_number_game():
     """Start a new number guessing game"""
     global number_game_active, target_number, num_guesses
     
     number_game_active = True
+    metrics.inc("game_events_total", game="number", event="start")
     target_number = random.randint(1, 100)
     num_guesses = 0
     
@@ -556,6 +526,7 @@ def handle_number_guess(guess_text):
         return "Please guess a number between 1 and 100."
     
     num_guesses += 1
+    metrics.inc("game_events_total", game="number", event="move")
     
     if guess < target_number:
         return f"{guess} is too low! Try a higher number. (Guess #{num_guesses})"
@@ -563,6 +534,7 @@ def handle_number_guess(guess_text):
         return f"{guess} is too high! Try a lower number. (Guess #{num_guesses})"
     else:
         number_game_active = False
+        metrics.inc("game_events_total", game="number", event="win")
         return f"🎉 Congratulations! You found the number {target_number} in {num_guesses} guesses! Say 'play number' to start a new game."
 
 def get_number_game_status():
@@ -572,16 +544,36 @@ def get_number_game_status():
     return f"Number Game - Guesses: {num_guesses} | Range: 1-100"
 
 def main():
+    global target_language
+    startup.mark("imports")
+    startup.configure()
+    args = startup.parser("Real-time translator with games and the Sentient assistant").parse_args()
+    target_language = startup.target_language(args.lang)
+    engine = engines.select(args.recognizer)
+    startup.mark("configuration")
+
     print("Google Cloud Speech-to-Text & Translation - Real-time Translator")
     print("-------------------------------------------------------------")
     print(f"Source language: English | Target language: {target_language}")
     print("Make sure your Google Cloud credentials are properly set up.")
-    print("Starting in 3 seconds...")
-    time.sleep(3)
-
+    # the mic, the Speech client and the service connections warm up at once
+    startup.warm_up({
+        "mic": mic.open,
+        "speech": engine.warm_up,
+        "deepl": lambda: startup.connect(deepl_client, "get_usage"),
+        "openai": lambda: startup.connect(llm, "models.list"),
+    })
+    print(startup.report())
+
+    blackbox.start(mic)
+    tracing.start()
+    metrics.serve()
+    profiler.watch("conversation_history", lambda: conversation_history)
+    profiler.install()
     try:
         clear_console()
-        stream_speech_to_text()
+        while streaming_active:
+            stream_speech_to_text()
     except KeyboardInterrupt:
         print("\nProgram terminated by user.")
     except Exception as e:
@@ -590,6 +582,13 @@ def main():
         import traceback
         traceback.print_exc() 
     finally:
+        blackbox.stop()
+        mic.close()
+        print(recognition.report())
+        print(vad.report())
+        print(mic.report())
+        print(tracing.report())
+        tracing.stop()
         print("Program finished.")
 
 if __name__ == "__main__":
@@ -0,0 +1,201 @@
+import os
+import sys
+import json
+import time
+import signal
+import itertools
+import threading
+from collections import deque
+
+import numpy as np
+
+# ─── Per-utterance Tracing ────────────────────────────────────────────────────
+# Every utterance gets a trace ID and a wall-clock timestamp per pipeline
+# stage, so "how long from when I stop speaking to when the translation is on
+# the display?" has an answer:
+#
+#   audio                 first chunk of the utterance sent to the recognizer
+#   speech_end            last chunk the VAD classified as speech
+#   first_interim, final  recognizer results
+#   translation_requested, translation_returned
+#   llm_requested, llm_first_token
+#   serial_write, ack     Arduino send and its ACK:<line>
+#
+# Recognition sessions open traces from their audio and results; the thread
+# that handles a result carries its trace, so translate/LLM/serial helpers
+# just call mark(). Later occurrences of a downstream stage overwrite earlier
+# ones, so a trace ends up describing the final result's translation and send
+# rather than the interims'. Across processes (stages.py) a trace travels as
+# its as_dict(), and adopt() folds it into the receiving process's copy.
+#
+#   kill -USR2 <pid>   print the stage histograms while running
+#   TRACE_DIR=traces   where stop() writes the traces and histograms
+#   TRACE_KEEP=5000    traces kept in memory
+
+TRACE_DIR = os.getenv("TRACE_DIR", "traces")
+TRACE_KEEP = int(os.getenv("TRACE_KEEP", "5000"))
+
+# (label, from stage, to stage)
+INTERVALS = [
+    ("audio -> first interim", "audio", "first_interim"),
+    ("speech end -> final", "speech_end", "final"),
+    ("final -> translation", "final", "translation_returned"),
+    ("translation call", "translation_requested", "translation_returned"),
+    ("llm first token", "llm_requested", "llm_first_token"),
+    ("final -> serial write", "final", "serial_write"),
+    ("serial write -> ACK", "serial_write", "ack"),
+    ("speech end -> displayed", "speech_end", "ack"),
+]
+
+_traces = deque(maxlen=TRACE_KEEP)
+_ids = itertools.count(1)
+_local = threading.local()
+_awaiting_ack = {}  # serial payload -> trace, for ACKs read on another thread
+_adopted = {}       # trace id in another process -> local trace
+
+
+class Trace:
+    __slots__ = ("id", "mode", "marks")
+
+    def __init__(self, mode):
+        self.id = next(_ids)
+        self.mode = mode
+        self.marks = {}
+        _traces.append(self)
+
+    def mark(self, stage, at=None):
+        self.marks[stage] = time.time() if at is None else at
+
+    def as_dict(self):
+        return {"id": self.id, "mode": self.mode, **{k: round(v, 4) for k, v in self.marks.items()}}
+
+
+class Session:
+    """Splits one recognition stream into utterance traces"""
+
+    def __init__(self, mode):
+        self.mode = mode
+        self._open = None  # the utterance currently receiving audio
+        self._lock = threading.Lock()
+
+    def audio(self, chunks, vad=None):
+        """Pass chunks through, stamping utterance start and the last speech chunk"""
+        for chunk in chunks:
+            now = time.time()
+            with self._lock:
+                if self._open is None:
+                    self._open = Trace(self.mode)
+                    self._open.mark("audio", now)
+                if vad is None or vad.in_speech:
+                    self._open.mark("speech_end", now)
+            yield chunk
+
+    def result(self, is_final):
+        """Stamp a recognizer result and make its trace current on this thread"""
+        now = time.time()
+        with self._lock:
+            trace = self._open
+            if trace is None:
+                trace = self._open = Trace(self.mode)
+            trace.marks.setdefault("first_interim", now)
+            if is_final:
+                trace.mark("final", now)
+                self._open = None
+        _local.trace = trace
+        return trace
+
+
+def current():
+    return getattr(_local, "trace", None)
+
+
+def bind(trace):
+    """Make trace current on this thread, for work handed over from another one"""
+    _local.trace = trace
+
+
+def adopt(snapshot):
+    """The local trace for an as_dict() made in another process (one per id); None passes through"""
+    if snapshot is None:
+        return None
+    trace = _adopted.get(snapshot["id"])
+    if trace is None:
+        if len(_adopted) > 256:
+            _adopted.clear()
+        trace = _adopted[snapshot["id"]] = Trace(snapshot["mode"])
+    trace.marks.update({k: v for k, v in snapshot.items() if k not in ("id", "mode")})
+    return trace
+
+
+def mark(stage):
+    trace = current()
+    if trace is not None:
+        trace.mark(stage)
+
+
+def serial_write(payload):
+    trace = current()
+    if trace is not None:
+        trace.mark("serial_write")
+        if len(_awaiting_ack) > 256:
+            _awaiting_ack.clear()
+        _awaiting_ack[payload] = trace
+
+
+def serial_ack(payload):
+    trace = _awaiting_ack.pop(payload, None) or current()
+    if trace is not None:
+        trace.mark("ack")
+
+
+# ─── Histograms ───────────────────────────────────────────────────────────────
+def intervals(traces=None):
+    """Milliseconds per interval label across the traces"""
+    out = {label: [] for label, _, _ in INTERVALS}
+    for trace in list(_traces) if traces is None else traces:
+        marks = trace.marks
+        for label, start, end in INTERVALS:
+            if start in marks and end in marks and marks[end] >= marks[start]:
+                out[label].append((marks[end] - marks[start]) * 1000.0)
+    return out
+
+
+def summary():
+    stats = {}
+    for label, values in intervals().items():
+        if values:
+            p50, p95, p99 = np.percentile(values, [50, 95, 99])
+            stats[label] = {"n": len(values), "p50": p50, "p95": p95, "p99": p99, "max": max(values)}
+    return stats
+
+
+def report():
+    lines = [f"Latency over {len(_traces)} utterances (ms)",
+             "stage                          n      p50      p95      p99      max"]
+    for label, s in summary().items():
+        lines.append(f"{label:<26} {s['n']:>6} {s['p50']:>8.0f} {s['p95']:>8.0f} {s['p99']:>8.0f} {s['max']:>8.0f}")
+    return "\n".join(lines)
+
+
+# ─── Lifecycle ────────────────────────────────────────────────────────────────
+def _print_report(*_):
+    print(report(), file=sys.stderr)
+
+
+def start():
+    if hasattr(signal, "SIGUSR2"):
+        signal.signal(signal.SIGUSR2, _print_report)
+
+
+def write(out_dir=TRACE_DIR):
+    """Write every kept trace and the histograms to a JSON file; returns its path"""
+    os.makedirs(out_dir, exist_ok=True)
+    path = os.path.join(out_dir, f"trace_{time.strftime('%Y%m%d_%H%M%S')}.json")
+    with open(path, "w") as f:
+        json.dump({"summary": summary(), "traces": [t.as_dict() for t in list(_traces)]}, f, indent=1)
+    return path
+
+
+def stop():
+    if _traces:
+        print(f"[TRACE] wrote {len(_traces)} utterance traces to {write()}")
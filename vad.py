@@ -0,0 +1,142 @@
+import collections
+import numpy as np
+
+# ─── Voice Activity Detection ─────────────────────────────────────────────────
+# Sits between the microphone and the StreamingRecognizeRequest generator. Each
+# chunk is split into short frames and classified in one vectorized pass using
+# frame energy (against a tracked noise floor) plus zero-crossing rate, so
+# quiet fricatives ("s", "f") at a word onset still count as speech.
+#
+# Silence is held back instead of being uploaded. A hangover keeps the tail of
+# an utterance flowing so the recognizer's endpointer can finalize, a pre-roll
+# replays the audio just before an onset so the first phoneme is not clipped
+# (only an onset found by wait_for_speech() in the same session: a gate opened
+# some other way, e.g. by the wake word, starts without it),
+# and after idle_after seconds of silence the gate ends the stream so the
+# caller can close the recognition session until the next speech.
+
+SAMPLE_RATE = 16000
+
+
+class VoiceActivityDetector:
+    """Energy + zero-crossing VAD gate for 16-bit mono PCM chunks"""
+
+    def __init__(self, rate=SAMPLE_RATE, frame_ms=20, margin_db=10.0, min_db=-55.0,
+                 zcr_fricative=0.25, min_speech_frames=2, hangover_ms=800,
+                 pre_roll_ms=300, idle_after=5.0):
+        self.rate = rate
+        self.frame_len = int(rate * frame_ms / 1000)
+        self.margin_db = margin_db
+        self.min_db = min_db
+        self.zcr_fricative = zcr_fricative
+        self.min_speech_frames = min_speech_frames
+        self.hangover = int(rate * hangover_ms / 1000)
+        self.pre_roll_samples = int(rate * pre_roll_ms / 1000)
+        self.idle_after = int(rate * idle_after)
+
+        self.noise_floor_db = -60.0
+        self._pre_roll = collections.deque()
+        self._pre_roll_len = 0
+        self._onset = False  # wait_for_speech() found speech for the next gate()
+        self._since_speech = None  # samples since the last speech chunk
+        self.samples_seen = 0
+        self.samples_sent = 0
+
+    # ── classification ──
+    def is_speech(self, chunk):
+        """Classify one chunk of int16 PCM bytes, updating the noise floor"""
+        x = np.frombuffer(chunk, dtype=np.int16)
+        n_frames = len(x) // self.frame_len
+        if n_frames == 0:
+            return False
+        frames = x[:n_frames * self.frame_len].reshape(n_frames, self.frame_len).astype(np.float32) / 32768.0
+
+        energy_db = 10.0 * np.log10(np.mean(frames * frames, axis=1) + 1e-10)
+        signs = np.signbit(frames)
+        zcr = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / (self.frame_len - 1)
+
+        threshold = max(self.noise_floor_db + self.margin_db, self.min_db)
+        voiced = energy_db > threshold
+        fricative = (energy_db > threshold - 6.0) & (zcr > self.zcr_fricative)
+        # a 20 ms chunk is a single frame, so it cannot need two
+        speech = np.count_nonzero(voiced | fricative) >= min(self.min_speech_frames, n_frames)
+
+        if not speech:
+            # track the floor down quickly and up slowly
+            quiet = float(np.percentile(energy_db, 20))
+            if quiet < self.noise_floor_db:
+                self.noise_floor_db = quiet
+            else:
+                self.noise_floor_db += 0.05 * (quiet - self.noise_floor_db)
+        return speech
+
+    @property
+    def in_speech(self):
+        """True while the last chunk seen by gate() was speech"""
+        return self._since_speech == 0
+
+    # ── gating ──
+    def _hold(self, chunk):
+        self._pre_roll.append(chunk)
+        self._pre_roll_len += len(chunk) // 2
+        while self._pre_roll and self._pre_roll_len - len(self._pre_roll[0]) // 2 >= self.pre_roll_samples:
+            self._pre_roll_len -= len(self._pre_roll.popleft()) // 2
+
+    def _release(self):
+        held = list(self._pre_roll)
+        self._pre_roll.clear()
+        self._pre_roll_len = 0
+        return held
+
+    def wait_for_speech(self, chunks):
+        """Consume chunks until speech starts; the onset is replayed by gate()"""
+        self._release()  # whatever an earlier session held back is stale now
+        self._onset = False
+        for chunk in chunks:
+            self.samples_seen += len(chunk) // 2
+            self._hold(chunk)
+            if self.is_speech(chunk):
+                self._since_speech = 0
+                self._onset = True
+                return True
+        return False
+
+    def gate(self, chunks):
+        """Yield speech chunks (with pre-roll and hangover) until a long silence"""
+        held, onset, self._onset = self._release(), self._onset, False
+        for chunk in held if onset else ():
+            self.samples_sent += len(chunk) // 2
+            yield chunk
+        if self._since_speech is None:
+            self._since_speech = self.hangover
+        for chunk in chunks:
+            n = len(chunk) // 2
+            self.samples_seen += n
+            if self.is_speech(chunk):
+                for held in self._release():
+                    self.samples_sent += len(held) // 2
+                    yield held
+                self._since_speech = 0
+            else:
+                self._since_speech += n
+            if self._since_speech <= self.hangover:
+                self.samples_sent += n
+                yield chunk
+            else:
+                self._hold(chunk)
+                if self._since_speech >= self.idle_after:
+                    self._since_speech = None
+                    return
+
+    # ── reporting ──
+    def suppressed_fraction(self):
+        if not self.samples_seen:
+            return 0.0
+        return 1.0 - self.samples_sent / self.samples_seen
+
+    def report(self):
+        seen = self.samples_seen / self.rate
+        sent = self.samples_sent / self.rate
+        return (f"VAD: {seen:.1f}s captured, {sent:.1f}s uploaded, "
+                f"{self.suppressed_fraction() * 100:.1f}% suppressed "
+                f"(noise floor {self.noise_floor_db:.1f} dBFS)")
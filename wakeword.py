@@ -0,0 +1,285 @@
+import os
+import sys
+import glob
+import time
+import wave
+from functools import lru_cache
+import numpy as np
+
+# ─── Wake Word Detection ──────────────────────────────────────────────────────
+# "hey sentient" is spotted on the CPU so that, in assistant-only mode, no
+# audio leaves the device until someone addresses the assistant. A handful of
+# enrolled recordings of the wake word are turned into MFCC templates; the
+# last ~2 s of captured audio is compared against every template with a
+# subsequence DTW whose step pattern only looks back whole rows, so each row
+# of the cost matrix is one NumPy operation. A score below the threshold
+# fires the detector.
+#
+#   WAKEWORD_DIR=wakeword        enrolled templates (*.wav, 16 kHz mono)
+#   WAKEWORD_THRESHOLD=<float>   override the threshold derived from templates
+#
+#   python wakeword.py enroll [dir] [takes]     record templates from the mic
+#   python wakeword.py eval <testset_dir> [dir]  latency / false accepts
+#
+# A test set holds positive/*.wav clips that end with the wake word and
+# negative/*.wav recordings of ambient speech without it.
+
+SAMPLE_RATE = 16000
+WAKEWORD_DIR = os.getenv("WAKEWORD_DIR", "wakeword")
+FRAME_MS, HOP_MS = 25, 10
+N_FFT, N_MELS, N_MFCC = 512, 26, 13
+
+
+@lru_cache(maxsize=None)
+def _mel_filterbank(rate=SAMPLE_RATE, n_fft=N_FFT, n_mels=N_MELS):
+    def hz_to_mel(hz):
+        return 2595.0 * np.log10(1.0 + hz / 700.0)
+
+    mels = np.linspace(hz_to_mel(60.0), hz_to_mel(rate / 2), n_mels + 2)
+    bins = np.floor((n_fft + 1) * 700.0 * (10 ** (mels / 2595.0) - 1) / rate).astype(int)
+    fbank = np.zeros((n_mels, n_fft // 2 + 1), dtype=np.float32)
+    for m in range(1, n_mels + 1):
+        left, center, right = bins[m - 1], bins[m], bins[m + 1]
+        fbank[m - 1, left:center] = (np.arange(left, center) - left) / max(center - left, 1)
+        fbank[m - 1, center:right] = (right - np.arange(center, right)) / max(right - center, 1)
+    return fbank
+
+
+@lru_cache(maxsize=None)
+def _dct_matrix(n_mels=N_MELS, n_mfcc=N_MFCC):
+    k = np.arange(n_mfcc)[:, None]
+    n = np.arange(n_mels)[None, :]
+    return np.cos(np.pi * k * (2 * n + 1) / (2 * n_mels)).astype(np.float32)
+
+
+def mfcc(x, rate=SAMPLE_RATE):
+    """Unit-length MFCC vectors (c1..c12) for every 10 ms hop of float audio"""
+    frame_len = rate * FRAME_MS // 1000
+    hop = rate * HOP_MS // 1000
+    n = 1 + (len(x) - frame_len) // hop
+    if n <= 0:
+        return np.zeros((0, N_MFCC - 1), dtype=np.float32)
+    emphasized = np.append(x[:1], x[1:] - 0.97 * x[:-1]).astype(np.float32)
+    idx = np.arange(frame_len)[None, :] + hop * np.arange(n)[:, None]
+    frames = emphasized[idx] * np.hamming(frame_len).astype(np.float32)
+    power = np.abs(np.fft.rfft(frames, N_FFT)) ** 2 / N_FFT
+    log_mel = np.log(power @ _mel_filterbank(rate).T + 1e-10)
+    cep = (log_mel @ _dct_matrix().T)[:, 1:]
+    return cep / (np.linalg.norm(cep, axis=1, keepdims=True) + 1e-10)
+
+
+def subsequence_cost(template, window):
+    """Best normalized DTW cost of template against any stretch of window, and where it ends"""
+    T, W = len(template), len(window)
+    if T == 0 or W < 2:
+        return np.inf, 0
+    d = 1.0 - template @ window.T  # cosine distance, (T, W)
+    prev2 = np.full(W, np.inf, dtype=np.float32)
+    prev = d[0].copy()  # free start anywhere in the window
+    for i in range(1, T):
+        best = np.full(W, np.inf, dtype=np.float32)
+        best[1:] = prev[:-1]                                          # (1, 1)
+        best[2:] = np.minimum(best[2:], prev[:-2])                    # (1, 2): skip a window frame
+        best[1:] = np.minimum(best[1:], prev2[:-1] + d[i - 1, :-1])   # (2, 1): both template rows count
+        prev2, prev = prev, d[i] + best
+    end = int(np.argmin(prev))
+    return float(prev[end]) / T, end
+
+
+def _read_wav(path):
+    with wave.open(path, "rb") as wav:
+        if wav.getframerate() != SAMPLE_RATE or wav.getnchannels() != 1 or wav.getsampwidth() != 2:
+            raise ValueError(f"{path}: expected a 16 kHz mono 16-bit WAV")
+        return np.frombuffer(wav.readframes(wav.getnframes()), dtype=np.int16).astype(np.float32) / 32768.0
+
+
+def _loud_span(x, rate=SAMPLE_RATE, floor_db=-40.0):
+    """(start, end) samples of the audio within floor_db of the clip's loudest 10 ms"""
+    hop = rate // 100
+    n = len(x) // hop
+    if n == 0:
+        return 0, len(x)
+    level = 10 * np.log10(np.mean(x[:n * hop].reshape(n, hop) ** 2, axis=1) + 1e-10)
+    loud = np.flatnonzero(level > level.max() + floor_db)
+    return int(loud[0]) * hop, (int(loud[-1]) + 1) * hop
+
+
+def _trim(x):
+    start, end = _loud_span(x)
+    return x[start:end]
+
+
+class WakeWordDetector:
+    """Streaming template matcher over 16-bit mono PCM chunks"""
+
+    def __init__(self, templates, threshold=None, rate=SAMPLE_RATE, min_db=-50.0, refractory=1.0):
+        if not templates:
+            raise ValueError("wake word detector needs at least one template")
+        self.rate = rate
+        self.templates = [mfcc(t, rate) for t in templates]
+        self.threshold = threshold if threshold is not None else self._derive_threshold()
+        longest = max(len(t) for t in templates)
+        # the (1, 2) step lets a spoken wake word run up to twice the template length
+        self.window = int(min(2 * longest, longest + 1.0 * rate)) + rate * FRAME_MS // 1000
+        self.min_db = min_db
+        self.refractory = int(refractory * rate)
+        self._buffer = np.zeros(0, dtype=np.float32)
+        self._quiet_until = 0
+        self.samples_seen = 0
+        self.last_score = np.inf
+        self.detections = 0
+        self.cpu_seconds = 0.0
+
+    @classmethod
+    def from_dir(cls, path=WAKEWORD_DIR, **kwargs):
+        paths = sorted(glob.glob(os.path.join(path, "*.wav")))
+        if not paths:
+            raise FileNotFoundError(f"no wake word templates in {path!r}; run `python wakeword.py enroll`")
+        if "threshold" not in kwargs and os.getenv("WAKEWORD_THRESHOLD"):
+            kwargs["threshold"] = float(os.getenv("WAKEWORD_THRESHOLD"))
+        return cls([_trim(_read_wav(p)) for p in paths], **kwargs)
+
+    def _derive_threshold(self):
+        """Geometric mean of a genuine score (one take against another) and an
+        impostor score (a take against a time-reversed take: same spectra, wrong order)"""
+        impostor = min(subsequence_cost(a, b[::-1].copy())[0] for a in self.templates for b in self.templates)
+        if len(self.templates) < 2:
+            return impostor / 4
+        genuine = float(np.percentile([subsequence_cost(a, b)[0] for i, a in enumerate(self.templates)
+                                       for j, b in enumerate(self.templates) if i != j], 90))
+        return float(np.sqrt(genuine * impostor))
+
+    def score(self, x):
+        """Lowest template cost for float audio x"""
+        features = mfcc(x, self.rate)
+        return min(subsequence_cost(t, features)[0] for t in self.templates)
+
+    def feed(self, chunk):
+        """Add one chunk of int16 PCM bytes; True when the wake word just ended"""
+        start = time.process_time()
+        x = np.frombuffer(chunk, dtype=np.int16).astype(np.float32) / 32768.0
+        self.samples_seen += len(x)
+        self._buffer = np.concatenate((self._buffer, x))[-self.window:]
+        self.last_score = np.inf
+        fired = False
+        recent = self._buffer[-self.rate // 2:]
+        loud = 10 * np.log10(np.mean(recent * recent) + 1e-10) > self.min_db
+        if self.samples_seen >= self._quiet_until and loud:
+            self.last_score = self.score(self._buffer)
+            if self.last_score < self.threshold:
+                fired = True
+                self.detections += 1
+                self._quiet_until = self.samples_seen + self.refractory
+                self._buffer = np.zeros(0, dtype=np.float32)
+        self.cpu_seconds += time.process_time() - start
+        return fired
+
+    def wait(self, chunks):
+        """Consume chunks until the wake word is heard; False if the chunks run out"""
+        for chunk in chunks:
+            if self.feed(chunk):
+                return True
+        return False
+
+    def report(self):
+        seen = self.samples_seen / self.rate
+        cpu = self.cpu_seconds / seen * 1000 if seen else 0.0
+        return (f"Wake word: {self.detections} detections in {seen:.1f}s, "
+                f"{cpu:.1f}ms CPU per second of audio (threshold {self.threshold:.3f})")
+
+
+# ─── Enrollment ───────────────────────────────────────────────────────────────
+def enroll(path=WAKEWORD_DIR, takes=5, seconds=2.0):
+    import audio
+    from vad import VoiceActivityDetector
+
+    os.makedirs(path, exist_ok=True)
+    mic = audio.Microphone()
+    vad = VoiceActivityDetector()
+    try:
+        for take in range(takes):
+            print(f"[{take + 1}/{takes}] say 'hey sentient'...")
+            chunks = mic.chunks()
+            vad.wait_for_speech(chunks)
+            recorded = b""
+            for chunk in vad.gate(chunks):
+                recorded += chunk
+                if len(recorded) >= seconds * SAMPLE_RATE * 2:
+                    break
+            x = _trim(np.frombuffer(recorded, dtype=np.int16).astype(np.float32) / 32768.0)
+            out = os.path.join(path, f"template_{int(time.time())}_{take}.wav")
+            with wave.open(out, "wb") as wav:
+                wav.setnchannels(1)
+                wav.setsampwidth(2)
+                wav.setframerate(SAMPLE_RATE)
+                wav.writeframes((x * 32768.0).astype(np.int16).tobytes())
+            print(f"    saved {out} ({len(x) / SAMPLE_RATE:.2f}s)")
+    finally:
+        mic.close()
+    detector = WakeWordDetector.from_dir(path)
+    print(f"derived threshold {detector.threshold:.3f} from {len(detector.templates)} templates")
+
+
+# ─── Evaluation ───────────────────────────────────────────────────────────────
+# Each clip is fed in CHUNK_MS chunks exactly as the live mic would. Latency
+# is measured from the end of the wake word (the last loud 10 ms of a
+# positive clip) to the end of the chunk that fired. Scores are recorded per
+# chunk, so one pass gives results for a sweep of thresholds.
+
+def _score_trace(detector, x, chunk):
+    trace = []
+    for i in range(0, len(x), chunk):
+        detector._buffer = np.concatenate((detector._buffer, x[i:i + chunk]))[-detector.window:]
+        trace.append((min(i + chunk, len(x)), detector.score(detector._buffer)))
+    detector._buffer = np.zeros(0, dtype=np.float32)
+    return trace
+
+
+def evaluate(testset, path=WAKEWORD_DIR, chunk_ms=100):
+    detector = WakeWordDetector.from_dir(path)
+    chunk = SAMPLE_RATE * chunk_ms // 1000
+    positives, negatives = [], []
+    start = time.process_time()
+    audio_secs = 0.0
+    for kind, traces in (("positive", positives), ("negative", negatives)):
+        for p in sorted(glob.glob(os.path.join(testset, kind, "*.wav"))):
+            x = _read_wav(p)
+            audio_secs += len(x) / SAMPLE_RATE
+            keyword_end = _loud_span(x)[1]
+            traces.append((keyword_end, _score_trace(detector, x, chunk)))
+    cpu = time.process_time() - start
+    neg_hours = sum(trace[-1][0] for _, trace in negatives if trace) / SAMPLE_RATE / 3600
+
+    print(f"{len(positives)} positive / {len(negatives)} negative clips, "
+          f"{cpu / max(audio_secs, 1e-9) * 1000:.1f}ms CPU per second of audio")
+    print("threshold  detected  latency p50  latency p95  false accepts/hour")
+    derived = detector.threshold
+    for th in sorted({round(derived * f, 3) for f in (0.5, 0.7, 1.0, 1.4, 2.0)}):
+        latencies = []
+        for keyword_end, trace in positives:
+            hit = next((pos for pos, s in trace if s < th and pos >= keyword_end - chunk), None)
+            if hit is not None:
+                latencies.append((hit - keyword_end) / SAMPLE_RATE)
+        false_accepts = 0
+        for _, trace in negatives:
+            quiet_until = 0
+            for pos, s in trace:
+                if pos >= quiet_until and s < th:
+                    false_accepts += 1
+                    quiet_until = pos + detector.refractory
+        rate = len(latencies) / len(positives) * 100 if positives else 0.0
+        p50 = np.percentile(latencies, 50) * 1000 if latencies else float("nan")
+        p95 = np.percentile(latencies, 95) * 1000 if latencies else float("nan")
+        fa = false_accepts / neg_hours if neg_hours else float("nan")
+        mark = " *" if th == round(derived, 3) else ""
+        print(f"{th:>9.3f} {rate:>8.0f}% {p50:>10.0f}ms {p95:>10.0f}ms {fa:>19.1f}{mark}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) >= 2 and sys.argv[1] == "enroll":
+        enroll(sys.argv[2] if len(sys.argv) > 2 else WAKEWORD_DIR, int(sys.argv[3]) if len(sys.argv) > 3 else 5)
+    elif len(sys.argv) >= 3 and sys.argv[1] == "eval":
+        evaluate(sys.argv[2], sys.argv[3] if len(sys.argv) > 3 else WAKEWORD_DIR)
+    else:
+        print("usage: python wakeword.py enroll [dir] [takes] | eval <testset_dir> [dir]")
+        sys.exit(1)
@@ -0,0 +1,38 @@
+import os
+from collections import namedtuple
+import metrics
+
+# ─── Wordle Solve ─────────────────────────────────────────────────────────────
+# A whole-place guess in the campus Wordle, shared by display.py and test.py.
+# A wrong solve costs a strike and a right one ends the game, so an utterance
+# only counts as a solve attempt when it matches a place with at least
+# WORDLE_SOLVE_CONFIDENCE, stricter than the index's own threshold: "err" is
+# not a guess of ERC.
+#
+#   WORDLE_SOLVE_CONFIDENCE=0.9
+
+WORDLE_SOLVE_CONFIDENCE = float(os.getenv("WORDLE_SOLVE_CONFIDENCE", "0.9"))
+
+# the game state after the guess, the message and the screen (catalog key, fields)
+Solve = namedtuple("Solve", ["active", "strikes", "board", "result", "screen", "fields"])
+
+
+def heard_place(index, transcript):
+    """The place a transcript names, when the match is sure enough to spend a strike on"""
+    return index.resolve(transcript, threshold=max(index.threshold, WORDLE_SOLVE_CONFIDENCE))
+
+
+def solve(word, board, strikes, max_strikes, place):
+    """Score a guess of the whole place against the word"""
+    metrics.inc("game_events_total", game="wordle", event="move")
+    if place.upper() == word:
+        metrics.inc("game_events_total", game="wordle", event="win")
+        return Solve(False, strikes, list(word), f"🎉 CONGRATULATIONS! You guessed it: {word}",
+                     "wordle_won", {"word": word})
+
+    strikes += 1
+    if strikes >= max_strikes:
+        metrics.inc("game_events_total", game="wordle", event="loss")
+        return Solve(False, strikes, board, f"💀 Game Over! The word was: {word}", "wordle_lost", {"word": word})
+    return Solve(True, strikes, board, f"Strike {strikes}/{max_strikes}! It's not {place}. {' '.join(board)}",
+                 "wordle_strike", {"strikes": strikes, "board": ' '.join(board)})